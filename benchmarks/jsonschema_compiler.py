@@ -0,0 +1,65 @@
+"""
+Compares `CompiledDraft4Validator` against the interpreted `GramediaDraft4Validator`.
+
+    python benchmarks/jsonschema_compiler.py [--number 2000]
+"""
+import argparse
+import timeit
+
+from gramedia.common.jsonschema import CorJsonResolver, DEFAULT_BASE_URL, GramediaDraft4Validator
+from gramedia.common.jsonschema_compiler import CompiledDraft4Validator
+
+SCHEMA = {
+    'type': 'object',
+    'required': ['id', 'title', 'authors', 'prices'],
+    'additionalProperties': False,
+    'definitions': {
+        'price': {
+            'type': 'object',
+            'required': ['currency', 'amount'],
+            'properties': {
+                'currency': {'enum': ['IDR', 'USD']},
+                'amount': {'type': 'number', 'minimum': 0},
+            },
+        },
+    },
+    'properties': {
+        'id': {'type': 'integer', 'minimum': 1},
+        'title': {'type': 'string', 'minLength': 1, 'maxLength': 250},
+        'slug': {'type': 'string', 'pattern': '^[a-z0-9-]+$'},
+        'authors': {'type': 'array', 'minItems': 1, 'uniqueItems': True, 'items': {'type': 'string'}},
+        'prices': {'type': 'array', 'items': {'$ref': '#/definitions/price'}},
+        'meta': {'type': ['object', 'null'], 'additionalProperties': {'type': 'string'}},
+    },
+}
+
+DOCUMENT = {
+    'id': 42,
+    'title': 'Laskar Pelangi',
+    'slug': 'laskar-pelangi',
+    'authors': ['Andrea Hirata'],
+    'prices': [{'currency': 'IDR', 'amount': 89000}, {'currency': 'USD', 'amount': 5.99}] * 5,
+    'meta': {'language': 'id', 'format': 'epub'},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--number', type=int, default=2000)
+    args = parser.parse_args()
+
+    interpreted = GramediaDraft4Validator(SCHEMA, CorJsonResolver(DEFAULT_BASE_URL, SCHEMA))
+    compiled = CompiledDraft4Validator(SCHEMA, CorJsonResolver(DEFAULT_BASE_URL, SCHEMA))
+    assert interpreted.is_valid(DOCUMENT) and compiled.is_valid(DOCUMENT)
+
+    results = {}
+    for name, validator in (('interpreted', interpreted), ('compiled', compiled)):
+        seconds = min(timeit.repeat(lambda: validator.validate(DOCUMENT), number=args.number, repeat=5))
+        results[name] = seconds
+        print(f'{name:>12}: {seconds / args.number * 1e6:8.1f} µs per document')
+
+    print(f'     speedup: {results["interpreted"] / results["compiled"]:8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
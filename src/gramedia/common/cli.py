@@ -1,11 +1,21 @@
+import logging
+import sys
+import time
 from datetime import datetime, timedelta
-from humanize import naturaltime
+from typing import Iterable, TextIO
+
+from humanize import naturaltime, naturaldelta
+
+logger = logging.getLogger('gramedia')
 
 
 def print_progress_bar(iteration: int, total: int, starting_time=None, decimals=1, length=50, fill='█') -> None:
     """ Call in a loop to create terminal progress bar.
 
     Shamelessly stolen from: https://stackoverflow.com/questions/3173320/text-progress-bar-in-the-console
+
+    .. note::
+        This redraws on every call.  For long loops, prefer `ProgressReporter`.
     """
     percent = ("{0:." + str(decimals) + "f}").format(100 * (iteration / float(total)))
     filled_length = int(length * iteration // total)
@@ -16,10 +26,11 @@ def print_progress_bar(iteration: int, total: int, starting_time=None, decimals=
         runtime = naturaltime(datetime.now() - starting_time)
 
     ending_time = ''
+    per_second = 0
     if starting_time:
         seconds_from_start = (datetime.now() - starting_time).total_seconds()
-        per_second = int(iteration / seconds_from_start)
         try:
+            per_second = int(iteration / seconds_from_start)
             ending_time = naturaltime(timedelta(seconds=(-1 * ((total-iteration) / per_second))))
         except (TypeError, ZeroDivisionError):
             ending_time = '???'
@@ -32,3 +43,155 @@ def print_progress_bar(iteration: int, total: int, starting_time=None, decimals=
     # Print New Line on Complete
     if iteration == total:
         print()
+
+
+class ProgressReporter:
+    """ Reports progress of a long-running loop, without slowing the loop down.
+
+    Wraps any iterable (including generators), or can be updated manually.  The display is redrawn at most
+    `max_refresh_per_second` times per second, no matter how often it's updated.  The rate is an
+    exponentially-weighted moving average, so the ETA follows recent throughput.  When the total is unknown,
+    only the count and rate are shown.
+
+    When the output stream is not a TTY (e.g. in a container's logs), a log line is written to the
+    'gramedia' logger every `log_interval` seconds instead of drawing a bar.
+
+    .. code-block:: python
+
+        for row in ProgressReporter(read_rows(), total=row_count, label='Importing'):
+            process(row)
+
+        with ProgressReporter(total=1000000) as progress:
+            for batch in batches:
+                process(batch)
+                progress.update(len(batch))
+    """
+
+    def __init__(self,
+                 iterable: Iterable = None,
+                 total: int = None,
+                 label: str = '',
+                 max_refresh_per_second: float = 4,
+                 smoothing: float = 0.3,
+                 log_interval: float = 10,
+                 length: int = 50,
+                 fill: str = '█',
+                 stream: TextIO = None):
+        """
+        :param iterable: Optional iterable to wrap.
+        :param total: Expected number of items, defaults to `len(iterable)` when available.
+        :param label: Shown before the progress.
+        :param max_refresh_per_second: Upper bound on how often the bar is redrawn.
+        :param smoothing: Weight given to the most recent rate measurement, between 0 and 1.
+        :param log_interval: Seconds between log lines, when the stream is not a TTY.
+        :param stream: Where to draw the bar, defaults to stdout.
+        """
+        if total is None and iterable is not None and hasattr(iterable, '__len__'):
+            total = len(iterable)
+
+        self.iterable = iterable
+        self.total = total
+        self.label = label
+        self.smoothing = smoothing
+        self.length = length
+        self.fill = fill
+        self.stream = stream if stream is not None else sys.stdout
+
+        isatty = getattr(self.stream, 'isatty', None)
+        self.interactive = bool(isatty and isatty())
+        self.min_interval = 1 / max_refresh_per_second if self.interactive else log_interval
+
+        self.count = 0
+        self.rate = None
+        self.started = time.monotonic()
+        self._last_refresh = self.started
+        self._last_count = 0
+        self._last_width = 0
+        self._closed = False
+
+    def __iter__(self):
+        count = 0
+        try:
+            for item in self.iterable:
+                yield item
+                count += 1
+                now = time.monotonic()
+                if now - self._last_refresh >= self.min_interval:
+                    self.count += count
+                    count = 0
+                    self.refresh(now)
+        finally:
+            self.count += count
+            self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def update(self, n: int = 1) -> None:
+        self.count += n
+        now = time.monotonic()
+        if now - self._last_refresh >= self.min_interval:
+            self.refresh(now)
+
+    def refresh(self, now: float = None) -> None:
+        """ Updates the rate estimate and redraws (or logs) the current progress.
+        """
+        now = now if now is not None else time.monotonic()
+        elapsed = now - self._last_refresh
+        if elapsed > 0:
+            current_rate = (self.count - self._last_count) / elapsed
+            if self.rate is None:
+                self.rate = current_rate
+            else:
+                self.rate = self.smoothing * current_rate + (1 - self.smoothing) * self.rate
+        self._last_refresh = now
+        self._last_count = self.count
+
+        if self.interactive:
+            line = self.format()
+            # pad with spaces to cover a longer, previously drawn line.
+            self.stream.write(f'\r{line.ljust(self._last_width)}')
+            self.stream.flush()
+            self._last_width = len(line)
+        else:
+            logger.info(self.format())
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self.refresh()
+        if self.interactive:
+            self.stream.write('\n')
+            self.stream.flush()
+
+    @property
+    def eta(self):
+        """ Estimated seconds remaining, or None if unknown.
+        """
+        if not self.total or not self.rate:
+            return None
+        return max(self.total - self.count, 0) / self.rate
+
+    def format(self) -> str:
+        rate = f'{self.rate:.0f}/per sec' if self.rate is not None else '?/per sec'
+        elapsed = naturaldelta(timedelta(seconds=time.monotonic() - self.started))
+        prefix = f'{self.label} ' if self.label else ''
+
+        if not self.total:
+            return f'{prefix}{self.count} [Elapsed: {elapsed} Rate: {rate}]'
+
+        fraction = min(self.count / self.total, 1)
+        eta = self.eta
+        remaining = naturaldelta(timedelta(seconds=eta)) if eta is not None else '???'
+        if not self.interactive:
+            return (f'{prefix}{self.count}/{self.total} ({100 * fraction:.1f}%) '
+                    f'[Elapsed: {elapsed} Rate: {rate} Remaining: {remaining}]')
+
+        filled_length = int(self.length * fraction)
+        bar = self.fill * filled_length + '-' * (self.length - filled_length)
+        return (f'{prefix}{self.count} |{bar}| {100 * fraction:.1f}% {self.total} '
+                f'[Elapsed: {elapsed} Rate: {rate} Remaining: {remaining}]')
@@ -3,8 +3,26 @@ Generic HTTP Utilities
 ======================
 
 Helper classes to make working with HTTP-related headers a little bit easier.
+
+`LinkHeaderPageIterator` consumes APIs paginated with `Link` headers (e.g. by
+`gramedia.django.drf.LinkHeaderPagination`), yielding the items of every page:
+
+.. code-block:: python
+
+    from gramedia.common.http import LinkHeaderPageIterator
+
+    for book in LinkHeaderPageIterator('https://catalogue.example.com/books/?per_page=250'):
+        ...
+
+The next page is fetched while the current one is being processed.  When the first response has an
+`X-Total-Results` header and a `rel="last"` link, the remaining pages are fetched concurrently instead
+(`max_workers` at a time), and still yielded in order.  Requests go over a pooled `requests` session
+(install the `http` extra), or any other transport.
 """
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
+from typing import Callable, Iterator, Mapping
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 import re
 
 
@@ -98,3 +116,141 @@ class MalformedLinkHeader(Exception):
     """ Raised when an HTTP link header is in an invalid format.
     """
     pass
+
+
+class PageResponse(object):
+    """ A page of results, as returned by transports: its decoded items and its headers.
+    """
+    def __init__(self, items: list, headers: Mapping[str, str]):
+        self.items = items
+        # header names are case-insensitive.
+        self.headers = {name.lower(): value for name, value in headers.items()}
+
+    @property
+    def links(self) -> LinkHeaderParser:
+        link_header = self.headers.get('link')
+        return LinkHeaderParser(link_header) if link_header else None
+
+    @property
+    def total_results(self) -> int:
+        total = self.headers.get('x-total-results')
+        return int(total) if total is not None else None
+
+
+class RequestsPageTransport(object):
+    """ Fetches pages over a pooled `requests` session, reusing connections between pages.
+
+    Transports are callables taking `(url, timeout)` and returning a `PageResponse`, raising for unsuccessful
+    responses.
+    """
+    def __init__(self, pool_size: int = 10, headers: Mapping[str, str] = None):
+        # imported here, so the rest of this module doesn't need requests installed.
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+        for prefix in ('http://', 'https://', ):
+            self.session.mount(prefix, HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+
+    def __call__(self, url: str, timeout: float) -> PageResponse:
+        response = self.session.get(url, timeout=timeout)
+        response.raise_for_status()
+        return PageResponse(response.json(), response.headers)
+
+
+def _page_param(next_url: str, last_url: str):
+    """ Finds the query parameter holding the page number, from the `next` and `last` urls, and the number of
+    the last page.  Returns (None, None) if they don't differ by exactly one numeric parameter.
+    """
+    next_query = dict(parse_qsl(urlsplit(next_url).query))
+    last_query = dict(parse_qsl(urlsplit(last_url).query))
+    differing = [name for name in last_query if next_query.get(name) != last_query[name]]
+    if len(differing) != 1 or not last_query[differing[0]].isdigit():
+        return None, None
+    return differing[0], int(last_query[differing[0]])
+
+
+def _page_url(url: str, param: str, number: int) -> str:
+    parts = urlsplit(url)
+    query = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True) if name != param]
+    query.append((param, str(number)))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+class LinkHeaderPageIterator(object):
+    """ Iterates over the items of every page of a `Link` header paginated API (see the module's documentation).
+
+    :param url: Url of the first page.
+    :param transport: Callable fetching a page, see `RequestsPageTransport` (the default).  Tests can give a
+        stub returning `PageResponse` objects.
+    :param max_workers: Maximum number of pages fetched at the same time.
+    :param timeout: Timeout of a single request, in seconds.
+    """
+    def __init__(self,
+                 url: str,
+                 transport: Callable[[str, float], PageResponse] = None,
+                 max_workers: int = 4,
+                 timeout: float = 30):
+        self.url = url
+        self.transport = transport if transport is not None else RequestsPageTransport(pool_size=max_workers)
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.total_results = None
+
+    def __iter__(self) -> Iterator:
+        for page in self.pages():
+            yield from page.items
+
+    def fetch(self, url: str) -> PageResponse:
+        return self.transport(url, self.timeout)
+
+    def pages(self) -> Iterator[PageResponse]:
+        """ Yields every page, in order.
+        """
+        page = self.fetch(self.url)
+        self.total_results = page.total_results
+        links = page.links
+        next_link = links.get(LinkHeaderRel.next) if links else None
+        last_link = links.get(LinkHeaderRel.last) if links else None
+
+        # pages being fetched, cancelled when the caller stops iterating early.
+        pending = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            try:
+                if next_link is not None and last_link is not None and self.total_results is not None:
+                    param, last_page = _page_param(next_link.url, last_link.url)
+                    if param is not None:
+                        next_page = int(dict(parse_qsl(urlsplit(next_link.url).query))[param])
+                        yield page
+                        yield from self._concurrent_pages(executor, pending, last_link.url, param, next_page,
+                                                          last_page)
+                        return
+                yield from self._sequential_pages(executor, pending, page)
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _sequential_pages(self, executor, pending: list, page: PageResponse) -> Iterator[PageResponse]:
+        while page is not None:
+            links = page.links
+            next_link = links.get(LinkHeaderRel.next) if links else None
+            if next_link is not None:
+                pending.append(executor.submit(self.fetch, next_link.url))
+            yield page
+            page = pending.pop(0).result() if pending else None
+
+    def _concurrent_pages(self, executor, pending: list, url: str, param: str, first: int,
+                          last: int) -> Iterator[PageResponse]:
+        numbers = iter(range(first, last + 1))
+        # keep `max_workers` pages in flight, so memory stays bounded however many pages there are.
+        for number in numbers:
+            pending.append(executor.submit(self.fetch, _page_url(url, param, number)))
+            if len(pending) >= self.max_workers:
+                break
+        while pending:
+            page = pending.pop(0).result()
+            number = next(numbers, None)
+            if number is not None:
+                pending.append(executor.submit(self.fetch, _page_url(url, param, number)))
+            yield page
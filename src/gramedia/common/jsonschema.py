@@ -1,7 +1,74 @@
 import json
 import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Sequence, Union
 
-from jsonschema import RefResolver, validators
+from jsonschema import RefResolver, validators, ValidationError
+
+DEFAULT_BASE_URL = 'https://gramedia.com/static/schemas/'
+
+# maximum number of validators kept per thread by get_validator.
+VALIDATOR_CACHE_SIZE = 128
+
+
+class SchemaFileCache:
+    """ Keeps parsed JSON schema files in memory, keyed by their path.
+
+    Files are read and parsed once.  With `check_mtime`, each lookup also checks the file's modification time
+    and reloads it when it has changed (meant for development, as it costs a `stat` per lookup).  `check_mtime`
+    can also be a callable, asked on every lookup, such as `debug_enabled`.
+    """
+    def __init__(self, check_mtime: Union[bool, Callable[[], bool]] = False):
+        self.check_mtime = check_mtime
+        self._schemas = {}
+        self._lock = threading.Lock()
+
+    def checks_mtime(self) -> bool:
+        return bool(self.check_mtime()) if callable(self.check_mtime) else self.check_mtime
+
+    def load(self, path: str):
+        """ Returns the parsed schema at `path`, or None if there is no such file.
+        """
+        cached = self._schemas.get(path)
+        if cached is not None and not self.checks_mtime():
+            return cached[1]
+
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            mtime = None
+
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        schema = None
+        if mtime is not None:
+            with open(path) as fp:
+                schema = json.load(fp)
+
+        with self._lock:
+            self._schemas[path] = (mtime, schema)
+        return schema
+
+    def clear(self) -> None:
+        with self._lock:
+            self._schemas.clear()
+
+
+def debug_enabled() -> bool:
+    """ Whether `settings.DEBUG` is on, when running in a configured django project.
+    """
+    try:
+        from django.conf import settings
+    except ImportError:
+        return False
+    return settings.configured and bool(getattr(settings, 'DEBUG', False))
+
+
+# changed schema files are reloaded in development, like `gramedia.django.jsonschema.schema_registry` does.
+_schema_files = SchemaFileCache(check_mtime=debug_enabled)
 
 
 class CorJsonResolver(RefResolver):
@@ -22,9 +89,8 @@ class CorJsonResolver(RefResolver):
                 'static',
                 'schemas',
                 *everything_else)
-            if os.path.exists(expected_full_path):
-                with open(expected_full_path) as fp:
-                    json_schema = json.load(fp)
+            json_schema = _schema_files.load(expected_full_path)
+            if json_schema is not None:
                 return json_schema
         except Exception:
             return super(CorJsonResolver, self).resolve_remote(uri)
@@ -37,10 +103,83 @@ class GramediaDraft4Validator(validators.Draft4Validator):
         super(GramediaDraft4Validator, self).__init__(schema, resolver=resolver)
 
 
-def validate_gramedia_jsonschema(jsondoc: dict, schema: dict, base_url: str='https://gramedia.com/static/schemas/'):
+_validator_cache = threading.local()
+
+
+def get_validator(schema: dict, base_url: str = DEFAULT_BASE_URL,
+                  validator_class=GramediaDraft4Validator, resolver_class=CorJsonResolver):
+    """ Returns a validator for `schema`, reusing a previously built one for the same schema object.
+
+    Validators are cached by the identity of the schema dict (so schemas must not be modified after their
+    first use), base url and classes, per thread, as a resolver keeps state while resolving references.  Each
+    thread keeps at most `VALIDATOR_CACHE_SIZE` validators, dropping the least recently used.
+    """
+    cache = getattr(_validator_cache, 'validators', None)
+    if cache is None:
+        cache = _validator_cache.validators = OrderedDict()
+
+    key = (id(schema), base_url, validator_class, resolver_class)
+    entry = cache.get(key)
+    # the schema itself is kept in the entry, so its id can't be reused by another object while cached.
+    if entry is not None and entry[0] is schema:
+        cache.move_to_end(key)
+        return entry[1]
+
+    validator = validator_class(schema, resolver_class(base_url, schema))
+    cache[key] = (schema, validator)
+    if len(cache) > VALIDATOR_CACHE_SIZE:
+        cache.popitem(last=False)
+    return validator
+
+
+def validate_gramedia_jsonschema(jsondoc: dict, schema: dict, base_url: str=DEFAULT_BASE_URL):
     """ Validates a JSON schema using GDN's validator.  Where this differs is that it assumes any schemas that start
     with 'base_url' may be located on disk, and will try to locate them based on filename instead of via an HTTP
     url.
     """
-    resolver = CorJsonResolver(base_url, jsondoc)
-    GramediaDraft4Validator(schema, resolver).validate(jsondoc)
+    get_validator(schema, base_url).validate(jsondoc)
+
+
+def _validate_chunk(schema: dict, base_url: str, validator_class, resolver_class,
+                    start: int, docs: Sequence) -> Dict[int, List[ValidationError]]:
+    validator = get_validator(schema, base_url, validator_class, resolver_class)
+    errors = {}
+    for index, doc in enumerate(docs, start):
+        doc_errors = list(validator.iter_errors(doc))
+        if doc_errors:
+            errors[index] = doc_errors
+    return errors
+
+
+def validate_many(docs: Sequence, schema: dict, base_url: str = DEFAULT_BASE_URL,
+                  processes: int = None, chunk_size: int = 1000,
+                  validator_class=GramediaDraft4Validator,
+                  resolver_class=CorJsonResolver) -> Dict[int, List[ValidationError]]:
+    """ Validates many documents against the same schema, with a single validator.
+
+    Instead of raising on the first invalid document, every error of every document is collected.
+
+    :param docs: The documents to validate.
+    :param schema: The schema to validate them against.
+    :param base_url: See `validate_gramedia_jsonschema`.
+    :param processes: If given, batches larger than `chunk_size` are split into chunks of `chunk_size`
+        documents, validated across a pool of this many processes.
+    :param chunk_size: Number of documents per chunk sent to a worker process.
+    :param validator_class: Validator to use, see `get_validator`.
+    :param resolver_class: Reference resolver to use, see `get_validator`.
+    :return: A dict of document index -> list of `ValidationError`, only containing invalid documents.
+    """
+    docs = docs if isinstance(docs, Sequence) else list(docs)
+    if not processes or len(docs) <= chunk_size:
+        return _validate_chunk(schema, base_url, validator_class, resolver_class, 0, docs)
+
+    errors = {}
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [
+            pool.submit(_validate_chunk, schema, base_url, validator_class, resolver_class,
+                        start, docs[start:start + chunk_size])
+            for start in range(0, len(docs), chunk_size)
+        ]
+        for future in futures:
+            errors.update(future.result())
+    return errors
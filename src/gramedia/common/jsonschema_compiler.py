@@ -0,0 +1,429 @@
+"""
+Draft-4 Schema Compiler
+=======================
+
+`jsonschema`'s validators interpret the schema dict on every call, which makes validating hot payloads
+expensive.  `CompiledDraft4Validator` translates a Draft-4 schema (including any `$ref`s, resolved at
+compile time with the given resolver, e.g. `CorJsonResolver` or `DjangoSchemaResolver`) into plain
+Python functions that only answer "is this document valid?".
+
+Valid documents, by far the most common case, are therefore checked by the generated code alone.
+Errors for invalid documents are produced by the interpreted `GramediaDraft4Validator`, so their messages,
+paths and schema paths are exactly the same as before.
+
+.. code-block:: python
+
+    from gramedia.common.jsonschema import CorJsonResolver, get_validator
+    from gramedia.common.jsonschema_compiler import CompiledDraft4Validator
+
+    validator = CompiledDraft4Validator(schema, resolver=CorJsonResolver(base_url, schema))
+    validator.validate(document)
+
+    # or cached, like any other validator
+    get_validator(schema, base_url, validator_class=CompiledDraft4Validator).validate(document)
+
+    # resolving references from django's static files
+    get_validator(schema, base_url, CompiledDraft4Validator, DjangoSchemaResolver).validate(document)
+
+Schemas using something the compiler doesn't handle (e.g. unknown types) are validated by the
+interpreted validator instead; check `validator.compiled` to find out.
+"""
+import logging
+import numbers
+import re
+from collections import deque
+
+from jsonschema import RefResolver
+from jsonschema._utils import uniq, unbool
+
+from gramedia.common.jsonschema import GramediaDraft4Validator
+
+logger = logging.getLogger('gramedia')
+
+_TYPE_CHECKS = {
+    'array': 'isinstance({0}, list)',
+    'boolean': 'isinstance({0}, bool)',
+    'integer': '(isinstance({0}, int) and not isinstance({0}, bool))',
+    'null': '{0} is None',
+    'number': '(isinstance({0}, _Number) and not isinstance({0}, bool))',
+    'object': 'isinstance({0}, dict)',
+    'string': 'isinstance({0}, str)',
+}
+
+
+class UnsupportedSchema(Exception):
+    """ Raised when a schema uses something the compiler can't translate.
+    """
+    pass
+
+
+def _in_enum(instance, enums) -> bool:
+    # same comparison as jsonschema's 'enum' validator, where True/False are not equal to 1/0.
+    if instance == 0 or instance == 1:
+        unbooled = unbool(instance)
+        return not all(unbooled != unbool(each) for each in enums)
+    return instance in enums
+
+
+def _multiple_of_failed(instance, divisor) -> bool:
+    if isinstance(divisor, float):
+        quotient = instance / divisor
+        return int(quotient) != quotient
+    return bool(instance % divisor)
+
+
+class _Writer:
+    def __init__(self):
+        self.lines = []
+        self.depth = 1
+
+    def line(self, text: str) -> None:
+        self.lines.append('    ' * self.depth + text)
+
+    def indent(self):
+        writer = self
+
+        class _Indent:
+            def __enter__(self):
+                writer.depth += 1
+
+            def __exit__(self, *args):
+                writer.depth -= 1
+
+        return _Indent()
+
+
+class Draft4Compiler:
+    """ Generates the source of a validity-checking function for a Draft-4 schema.
+
+    Each (sub)schema becomes one function, named `_v<n>`, which returns True when a value is valid against it.
+    `$ref`s are resolved once, at compile time, and recursive references simply become recursive calls.
+    """
+
+    def __init__(self, resolver: RefResolver, format_checker=None):
+        self.resolver = resolver
+        self.format_checker = format_checker
+        self.namespace = {
+            '_Number': numbers.Number,
+            '_uniq': uniq,
+            '_in_enum': _in_enum,
+            '_multiple_of_failed': _multiple_of_failed,
+            '_format_checker': format_checker,
+        }
+        self._functions = {}
+        self._queue = deque()
+        self._constants = 0
+        self.source = ''
+
+    def compile(self, schema):
+        """ Returns a function which takes a document, and returns whether it is valid against `schema`.
+        """
+        root = self.function_for(schema)
+        sources = []
+        while self._queue:
+            name, subschema, scope = self._queue.popleft()
+            self.resolver.push_scope(scope)
+            try:
+                sources.append(self.emit_function(name, subschema))
+            finally:
+                self.resolver.pop_scope()
+
+        self.source = '\n\n'.join(sources) + '\n'
+        exec(compile(self.source, '<compiled jsonschema>', 'exec'), self.namespace)
+        return self.namespace[root]
+
+    def constant(self, value) -> str:
+        name = f'_c{self._constants}'
+        self._constants += 1
+        self.namespace[name] = value
+        return name
+
+    def function_for(self, schema) -> str:
+        """ Name of the function validating `schema` in the current resolution scope, queueing it for
+        generation if needed.
+        """
+        key = (id(schema), self.resolver.resolution_scope)
+        name = self._functions.get(key)
+        if name is None:
+            name = self._functions[key] = f'_v{len(self._functions)}'
+            # keep the schema referenced, so its id stays unique while compiling.
+            self.constant(schema)
+            self._queue.append((name, schema, self.resolver.resolution_scope))
+        return name
+
+    def emit_function(self, name: str, schema) -> str:
+        writer = _Writer()
+
+        if schema is True:
+            writer.line('return True')
+        elif schema is False:
+            writer.line('return False')
+        elif not isinstance(schema, dict):
+            raise UnsupportedSchema(f'Schemas must be objects or booleans, not {schema!r}')
+        else:
+            scope = schema.get('id', '')
+            if scope:
+                self.resolver.push_scope(scope)
+            try:
+                if '$ref' in schema:
+                    url, resolved = self.resolver.resolve(schema['$ref'])
+                    self.resolver.push_scope(url)
+                    try:
+                        writer.line(f'return {self.function_for(resolved)}(x)')
+                    finally:
+                        self.resolver.pop_scope()
+                else:
+                    self.emit_keywords(writer, schema)
+                    writer.line('return True')
+            finally:
+                if scope:
+                    self.resolver.pop_scope()
+
+        return f'def {name}(x):\n' + '\n'.join(writer.lines)
+
+    def emit_keywords(self, writer: _Writer, schema: dict) -> None:
+        if 'type' in schema:
+            types = schema['type'] if isinstance(schema['type'], list) else [schema['type']]
+            try:
+                checks = [_TYPE_CHECKS[type_name].format('x') for type_name in types]
+            except (KeyError, TypeError):
+                raise UnsupportedSchema(f'Unknown type in {types!r}')
+            writer.line(f'if not ({" or ".join(checks) or "False"}):')
+            with writer.indent():
+                writer.line('return False')
+
+        if 'enum' in schema:
+            writer.line(f'if not _in_enum(x, {self.constant(schema["enum"])}):')
+            with writer.indent():
+                writer.line('return False')
+
+        for keyword in ('allOf', 'anyOf', 'oneOf'):
+            if keyword in schema:
+                functions = [self.function_for(subschema) for subschema in schema[keyword]]
+                calls = [f'{function}(x)' for function in functions]
+                if keyword == 'allOf':
+                    condition = ' and '.join(calls) or 'True'
+                elif keyword == 'anyOf':
+                    condition = ' or '.join(calls) or 'False'
+                else:
+                    condition = f'sum(1 for f in ({", ".join(functions)}, ) if f(x)) == 1' if functions else 'False'
+                writer.line(f'if not ({condition}):')
+                with writer.indent():
+                    writer.line('return False')
+
+        if 'not' in schema:
+            writer.line(f'if {self.function_for(schema["not"])}(x):')
+            with writer.indent():
+                writer.line('return False')
+
+        self.emit_object_keywords(writer, schema)
+        self.emit_array_keywords(writer, schema)
+        self.emit_string_keywords(writer, schema)
+        self.emit_number_keywords(writer, schema)
+
+    def emit_object_keywords(self, writer: _Writer, schema: dict) -> None:
+        keywords = ('properties', 'patternProperties', 'additionalProperties', 'required',
+                    'minProperties', 'maxProperties', 'dependencies')
+        if not any(keyword in schema for keyword in keywords):
+            return
+
+        writer.line('if isinstance(x, dict):')
+        with writer.indent():
+            if 'minProperties' in schema:
+                writer.line(f'if len(x) < {schema["minProperties"]!r}:')
+                with writer.indent():
+                    writer.line('return False')
+            if 'maxProperties' in schema:
+                writer.line(f'if len(x) > {schema["maxProperties"]!r}:')
+                with writer.indent():
+                    writer.line('return False')
+
+            for prop in schema.get('required', []):
+                writer.line(f'if {prop!r} not in x:')
+                with writer.indent():
+                    writer.line('return False')
+
+            for prop, subschema in schema.get('properties', {}).items():
+                writer.line(f'if {prop!r} in x and not {self.function_for(subschema)}(x[{prop!r}]):')
+                with writer.indent():
+                    writer.line('return False')
+
+            for pattern, subschema in schema.get('patternProperties', {}).items():
+                regex = self.constant(re.compile(pattern))
+                writer.line('for k, v in x.items():')
+                with writer.indent():
+                    writer.line(f'if {regex}.search(k) and not {self.function_for(subschema)}(v):')
+                    with writer.indent():
+                        writer.line('return False')
+
+            additional = schema.get('additionalProperties', True)
+            if additional is not True and additional != {}:
+                known = self.constant(frozenset(schema.get('properties', {})))
+                patterns = '|'.join(schema.get('patternProperties', {}))
+                writer.line('for k in x:')
+                with writer.indent():
+                    condition = f'k not in {known}'
+                    if patterns:
+                        condition += f' and not {self.constant(re.compile(patterns))}.search(k)'
+                    writer.line(f'if {condition}:')
+                    with writer.indent():
+                        if isinstance(additional, dict):
+                            writer.line(f'if not {self.function_for(additional)}(x[k]):')
+                            with writer.indent():
+                                writer.line('return False')
+                        elif not additional:
+                            writer.line('return False')
+
+            for prop, dependency in schema.get('dependencies', {}).items():
+                writer.line(f'if {prop!r} in x:')
+                with writer.indent():
+                    if isinstance(dependency, list):
+                        for each in dependency:
+                            writer.line(f'if {each!r} not in x:')
+                            with writer.indent():
+                                writer.line('return False')
+                    else:
+                        writer.line(f'if not {self.function_for(dependency)}(x):')
+                        with writer.indent():
+                            writer.line('return False')
+
+    def emit_array_keywords(self, writer: _Writer, schema: dict) -> None:
+        keywords = ('items', 'additionalItems', 'minItems', 'maxItems', 'uniqueItems')
+        if not any(keyword in schema for keyword in keywords):
+            return
+
+        writer.line('if isinstance(x, list):')
+        with writer.indent():
+            if 'minItems' in schema:
+                writer.line(f'if len(x) < {schema["minItems"]!r}:')
+                with writer.indent():
+                    writer.line('return False')
+            if 'maxItems' in schema:
+                writer.line(f'if len(x) > {schema["maxItems"]!r}:')
+                with writer.indent():
+                    writer.line('return False')
+            if schema.get('uniqueItems'):
+                writer.line('if not _uniq(x):')
+                with writer.indent():
+                    writer.line('return False')
+
+            items = schema.get('items', {})
+            if isinstance(items, dict):
+                if items:
+                    function = self.function_for(items)
+                    writer.line('for item in x:')
+                    with writer.indent():
+                        writer.line(f'if not {function}(item):')
+                        with writer.indent():
+                            writer.line('return False')
+            elif isinstance(items, list):
+                functions = [self.function_for(subschema) for subschema in items]
+                if functions:
+                    writer.line(f'for f, item in zip(({", ".join(functions)}, ), x):')
+                    with writer.indent():
+                        writer.line('if not f(item):')
+                        with writer.indent():
+                            writer.line('return False')
+
+                additional = schema.get('additionalItems', True)
+                if isinstance(additional, dict):
+                    writer.line(f'for item in x[{len(items)}:]:')
+                    with writer.indent():
+                        writer.line(f'if not {self.function_for(additional)}(item):')
+                        with writer.indent():
+                            writer.line('return False')
+                elif not additional:
+                    writer.line(f'if len(x) > {len(items)}:')
+                    with writer.indent():
+                        writer.line('return False')
+            else:
+                raise UnsupportedSchema(f'Unsupported items: {items!r}')
+
+    def emit_string_keywords(self, writer: _Writer, schema: dict) -> None:
+        if any(keyword in schema for keyword in ('minLength', 'maxLength', 'pattern')):
+            writer.line('if isinstance(x, str):')
+            with writer.indent():
+                if 'minLength' in schema:
+                    writer.line(f'if len(x) < {schema["minLength"]!r}:')
+                    with writer.indent():
+                        writer.line('return False')
+                if 'maxLength' in schema:
+                    writer.line(f'if len(x) > {schema["maxLength"]!r}:')
+                    with writer.indent():
+                        writer.line('return False')
+                if 'pattern' in schema:
+                    writer.line(f'if not {self.constant(re.compile(schema["pattern"]))}.search(x):')
+                    with writer.indent():
+                        writer.line('return False')
+
+        if 'format' in schema and self.format_checker is not None:
+            # formats apply to any type the checker knows about, not only strings.
+            writer.line(f'if not _format_checker.conforms(x, {schema["format"]!r}):')
+            with writer.indent():
+                writer.line('return False')
+
+    def emit_number_keywords(self, writer: _Writer, schema: dict) -> None:
+        if not any(keyword in schema for keyword in ('minimum', 'maximum', 'multipleOf')):
+            return
+
+        writer.line('if isinstance(x, _Number) and not isinstance(x, bool):')
+        with writer.indent():
+            if 'minimum' in schema:
+                operator = '<=' if schema.get('exclusiveMinimum', False) else '<'
+                writer.line(f'if x {operator} {self.constant(schema["minimum"])}:')
+                with writer.indent():
+                    writer.line('return False')
+            if 'maximum' in schema:
+                operator = '>=' if schema.get('exclusiveMaximum', False) else '>'
+                writer.line(f'if x {operator} {self.constant(schema["maximum"])}:')
+                with writer.indent():
+                    writer.line('return False')
+            if 'multipleOf' in schema:
+                writer.line(f'if _multiple_of_failed(x, {self.constant(schema["multipleOf"])}):')
+                with writer.indent():
+                    writer.line('return False')
+
+
+class CompiledDraft4Validator:
+    """ Draft-4 validator that checks documents with generated code, and reports errors exactly like
+    the interpreted `validator_class` would.
+
+    Takes the same arguments as `GramediaDraft4Validator`, so it can be given to `get_validator` as
+    `validator_class`.
+
+    :param schema: The schema to compile.
+    :param resolver: Resolver used for `$ref`s, both while compiling and when reporting errors.
+    :param format_checker: Optional `jsonschema.FormatChecker`.
+    :param validator_class: Interpreted validator used to report errors, and as a fallback when the schema
+        can't be compiled.
+    """
+
+    def __init__(self, schema, resolver: RefResolver = None, format_checker=None,
+                 validator_class=GramediaDraft4Validator):
+        self.schema = schema
+        self.resolver = resolver if resolver is not None else RefResolver.from_schema(
+            schema, id_of=validator_class.ID_OF)
+        self.interpreted = validator_class(schema, resolver=self.resolver)
+        self.interpreted.format_checker = format_checker
+
+        compiler = Draft4Compiler(self.resolver, format_checker)
+        try:
+            self._is_valid = compiler.compile(schema)
+            self.compiled = True
+        except UnsupportedSchema as exc:
+            logger.warning(f'Could not compile schema, falling back to the interpreted validator: {exc}')
+            self._is_valid = self.interpreted.is_valid
+            self.compiled = False
+        self.source = compiler.source
+
+    def is_valid(self, instance) -> bool:
+        return self._is_valid(instance)
+
+    def iter_errors(self, instance):
+        if self._is_valid(instance):
+            return iter(())
+        return self.interpreted.iter_errors(instance)
+
+    def validate(self, instance) -> None:
+        if not self._is_valid(instance):
+            self.interpreted.validate(instance)
@@ -0,0 +1,92 @@
+"""
+Payload Logging
+===============
+
+Helpers for logging messages with (possibly large) payloads on hot paths, e.g. every published event.
+
+.. code-block:: python
+
+    from gramedia.common.log import PayloadLogger
+
+    payload_logger = PayloadLogger(logging.getLogger('LOG'), max_length=1024, sample_rates={'book': 0.01})
+    payload_logger.info('book', 'QUEUE Publish %s:%s', 'book', 'changed', payload=data)
+
+- Formatting is lazy: nothing is formatted unless the line is actually emitted.
+- Payloads are cut to `max_length` characters.
+- Lines below `WARNING` are sampled per entity type: with a rate of `0.01`, about one `book` line in a hundred
+  is logged.  Entity types without a rate use `default_rate`.  Warnings and errors are always logged.
+"""
+import logging
+import random
+from typing import Dict
+
+_MISSING = object()
+
+
+class TruncatedPayload:
+    """ Formats a payload when it's logged, cut to `max_length` characters.
+    """
+    __slots__ = ('payload', 'max_length', )
+
+    def __init__(self, payload, max_length: int = None):
+        self.payload = payload
+        self.max_length = max_length
+
+    def __str__(self):
+        text = str(self.payload)
+        if self.max_length is None or len(text) <= self.max_length:
+            return text
+        return f'{text[:self.max_length]}... ({len(text)} characters)'
+
+
+class PayloadLogger:
+    """ Wraps a logger, adding payload truncation and per entity type sampling (see the module's documentation).
+
+    :param logger: The logger lines are sent to.
+    :param max_length: Maximum number of characters of the payload logged, None to log it whole.
+    :param sample_rates: Entity type -> fraction (0 to 1) of its lines that are logged.
+    :param default_rate: Fraction of lines logged for the other entity types.
+    """
+
+    def __init__(self,
+                 logger: logging.Logger,
+                 max_length: int = 1024,
+                 sample_rates: Dict[str, float] = None,
+                 default_rate: float = 1.0):
+        self.logger = logger
+        self.max_length = max_length
+        self.sample_rates = dict(sample_rates or {})
+        self.default_rate = default_rate
+
+    def is_sampled(self, entity_type: str) -> bool:
+        rate = self.sample_rates.get(entity_type, self.default_rate)
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+    def log(self, level: int, entity_type: str, msg: str, *args, payload=_MISSING, **kwargs) -> None:
+        """ Logs `msg % args`, followed by the truncated payload (if given).
+        """
+        if not self.logger.isEnabledFor(level):
+            return
+        if level < logging.WARNING and not self.is_sampled(entity_type):
+            return
+        if payload is not _MISSING:
+            msg, args = f'{msg} - %s', (*args, TruncatedPayload(payload, self.max_length))
+        # report the caller's location, not this method's.
+        kwargs.setdefault('stacklevel', 2)
+        self.logger.log(level, msg, *args, **kwargs)
+
+    def debug(self, entity_type: str, msg: str, *args, **kwargs) -> None:
+        kwargs.setdefault('stacklevel', 3)
+        self.log(logging.DEBUG, entity_type, msg, *args, **kwargs)
+
+    def info(self, entity_type: str, msg: str, *args, **kwargs) -> None:
+        kwargs.setdefault('stacklevel', 3)
+        self.log(logging.INFO, entity_type, msg, *args, **kwargs)
+
+    def warning(self, entity_type: str, msg: str, *args, **kwargs) -> None:
+        kwargs.setdefault('stacklevel', 3)
+        self.log(logging.WARNING, entity_type, msg, *args, **kwargs)
+
+    def error(self, entity_type: str, msg: str, *args, **kwargs) -> None:
+        kwargs.setdefault('stacklevel', 3)
+        self.log(logging.ERROR, entity_type, msg, *args, **kwargs)
@@ -1,8 +1,14 @@
 import logging
+import time
+from typing import Callable
+
 import django
 
 from autoslug import AutoSlugField
 from django.db import models
+from django.db.models import Q
+from django.db.models.deletion import Collector
+from django.db.models.signals import class_prepared
 from django.utils import timezone
 
 if django.VERSION >= (4, 0):
@@ -36,12 +42,34 @@ class TimestampedModel(models.Model):
         abstract = True
 
 
+class SoftDeletableQuerySet(models.QuerySet):
+    def active(self):
+        return self.filter(is_active=True)
+
+    def inactive(self):
+        return self.filter(is_active=False)
+
+
 class SoftDeletableModel(models.Model):
     """ A model, which when 'deleted' via an API interface, should be flagged as is_active = false, instead
     of actually being deleted from the database.
+
+    Set `soft_delete_index_fields` on a concrete subclass to get partial indexes (`WHERE is_active`) on
+    those columns.  Each entry is either a field name, or a tuple of field names for a composite index.
+
+    .. code-block:: python
+
+        class Book(SoftDeletableModel):
+            soft_delete_index_fields = ('slug', '-modified')
     """
     is_active = models.BooleanField(default=True)
 
+    objects = SoftDeletableQuerySet.as_manager()
+
+    soft_delete_index_fields = ()
+    soft_delete_condition = Q(is_active=True)
+    soft_delete_index_suffix = 'act'
+
     class Meta:
         abstract = True
 
@@ -75,11 +103,89 @@ class MarkDeletedQuerySet(models.QuerySet):
         logger = logging.getLogger('DELETE')
         logger.info('THIS MARK DELETE')
         return super(MarkDeletedQuerySet, self).update(deleted=timezone.now())
+    # like django's own delete(), not copied to the managers: `Model.objects.delete()` would empty the table.
+    delete.queryset_only = True
 
     def hard_delete(self):
         logger = logging.getLogger('HARDDELETE')
         logger.info('THIS MARK HARD DELETE')
         return super(MarkDeletedQuerySet, self).delete()
+    hard_delete.queryset_only = True
+
+    def delete_in_batches(self, batch_size: int = 1000, sleep: float = 0,
+                          progress: Callable[[int, int], None] = None, deleted_by: str = None) -> int:
+        """ Same as `delete()`, but marks rows as deleted in primary key ranges of at most `batch_size` rows,
+        so only one batch of rows is locked at a time.
+
+        :param batch_size: Maximum number of rows updated per statement.
+        :param sleep: Seconds to sleep between batches, to give replication and other writers some room.
+        :param progress: Optional callable, called after each batch with (rows processed, total rows).
+        :param deleted_by: Optionally recorded in `deleted_by`.
+        :return: The number of rows marked as deleted.
+        """
+        values = {'deleted': timezone.now()}
+        if deleted_by is not None:
+            values['deleted_by'] = deleted_by
+
+        logger = logging.getLogger('DELETE')
+        logger.info(f'MARK DELETE {self.model._meta.label} in batches of {batch_size}')
+        return self._process_in_batches(lambda batch: batch.update(**values), batch_size, sleep, progress)
+    delete_in_batches.queryset_only = True
+
+    def hard_delete_in_batches(self, batch_size: int = 1000, sleep: float = 0,
+                               progress: Callable[[int, int], None] = None) -> int:
+        """ Same as `hard_delete()`, but deletes rows in primary key ranges of at most `batch_size` rows.
+
+        When nothing needs django's deletion collector (no cascades, no delete signals) each batch is removed
+        with a single raw `DELETE`, without loading any rows.  Otherwise the collector only ever sees one
+        batch at a time, which keeps memory bounded.
+
+        :return: The number of rows of this queryset's model that were deleted.
+        """
+        fast = Collector(using=self.db).can_fast_delete(self)
+
+        def delete_batch(batch):
+            if fast:
+                return batch._raw_delete(batch.db)
+            deleted, per_model = models.QuerySet.delete(batch)
+            return per_model.get(self.model._meta.label, 0)
+
+        logger = logging.getLogger('HARDDELETE')
+        logger.info(
+            f'HARD DELETE {self.model._meta.label} in batches of {batch_size} '
+            f'({"raw" if fast else "collector"} delete)')
+        return self._process_in_batches(delete_batch, batch_size, sleep, progress)
+    hard_delete_in_batches.queryset_only = True
+
+    def _process_in_batches(self, operation, batch_size, sleep, progress) -> int:
+        """ Walks this queryset in primary key order, and applies `operation` to a queryset
+        covering each range of `batch_size` primary keys.
+        """
+        if self.query.is_sliced:
+            raise TypeError('Cannot use \'limit\' or \'offset\' with batched deletes.')
+
+        queryset = self.order_by()
+        total = queryset.count() if progress else None
+        processed = 0
+        last_pk = None
+
+        while True:
+            keys = queryset.order_by('pk')
+            if last_pk is not None:
+                keys = keys.filter(pk__gt=last_pk)
+            pks = list(keys.values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            last_pk = pks[-1]
+
+            processed += operation(queryset.filter(pk__gte=pks[0], pk__lte=last_pk))
+
+            if progress:
+                progress(processed, total)
+            if sleep and len(pks) == batch_size:
+                time.sleep(sleep)
+
+        return processed
 
     def alive(self):
         return self.filter(deleted=None)
@@ -88,19 +194,23 @@ class MarkDeletedQuerySet(models.QuerySet):
         return self.exclude(deleted=None)
 
 
-class MarkDeletedManager(models.Manager):
+class MarkDeletedManager(models.Manager.from_queryset(MarkDeletedQuerySet)):
     def __init__(self, *args, **kwargs):
         self.alive_only = kwargs.pop('alive_only', True)
         super(MarkDeletedManager, self).__init__(*args, **kwargs)
 
     def get_queryset(self):
         if self.alive_only:
-            return MarkDeletedQuerySet(self.model).filter(deleted=None)
-        return MarkDeletedQuerySet(self.model)
-
+            return MarkDeletedQuerySet(self.model, using=self._db).alive()
+        return MarkDeletedQuerySet(self.model, using=self._db)
 
 
 class MarkDeletedModel(models.Model):
+    """ A model that is flagged with a `deleted` timestamp instead of being removed from the database.
+
+    Set `soft_delete_index_fields` on a concrete subclass to get partial indexes (`WHERE deleted IS NULL`)
+    on those columns, matching the queries issued by the default `objects` manager.
+    """
     deleted = models.DateTimeField(
         _('deleted'),
         null=True,
@@ -116,5 +226,48 @@ class MarkDeletedModel(models.Model):
     objects = MarkDeletedManager()
     all_objects = MarkDeletedManager(alive_only=False)
 
+    soft_delete_index_fields = ()
+    soft_delete_condition = Q(deleted=None)
+    soft_delete_index_suffix = 'alv'
+
     class Meta:
         abstract = True
+
+
+SOFT_DELETE_MODELS = (SoftDeletableModel, MarkDeletedModel)
+
+
+def soft_delete_partial_indexes(model) -> list:
+    """ Builds the partial indexes requested by a model's `soft_delete_index_fields`.
+
+    Index names are derived from the table, columns and condition the same way django names
+    indexes, so they are stable across runs.
+    """
+    indexes = []
+    for base in SOFT_DELETE_MODELS:
+        if not issubclass(model, base):
+            continue
+        for fields in model.soft_delete_index_fields:
+            if isinstance(fields, str):
+                fields = (fields, )
+            index = models.Index(fields=list(fields), condition=base.soft_delete_condition, name='_')
+            index.suffix = base.soft_delete_index_suffix
+            index.set_name_with_model(model)
+            indexes.append(index)
+    return indexes
+
+
+def _add_soft_delete_indexes(sender, **kwargs):
+    if not issubclass(sender, SOFT_DELETE_MODELS) or sender._meta.abstract or sender._meta.proxy:
+        return
+
+    existing = {index.name for index in sender._meta.indexes}
+    missing = [index for index in soft_delete_partial_indexes(sender) if index.name not in existing]
+    if missing:
+        # assign a new list, as the current one may be shared with an inherited Meta.  Migrations only
+        # look at options that were declared, so the indexes must be recorded in original_attrs too.
+        sender._meta.indexes = [*sender._meta.indexes, *missing]
+        sender._meta.original_attrs['indexes'] = sender._meta.indexes
+
+
+class_prepared.connect(_add_soft_delete_indexes, dispatch_uid='gramedia_soft_delete_indexes')
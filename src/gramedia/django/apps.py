@@ -0,0 +1,19 @@
+from django.apps import AppConfig, apps
+
+
+class GramediaDjangoConfig(AppConfig):
+    """ Adding 'gramedia.django' to INSTALLED_APPS is optional, and only needed for the management commands,
+    the principal cache (see `gramedia.django.principal_cache`) and to keep the site registry current
+    (see `gramedia.django.sites`).
+    """
+    name = 'gramedia.django'
+    label = 'gramedia_django'
+    verbose_name = 'Gramedia Common'
+
+    def ready(self):
+        from gramedia.django import principal_cache
+        principal_cache.connect_signals()
+
+        if apps.is_installed('django.contrib.sites'):
+            from gramedia.django import sites
+            sites.connect_signals()
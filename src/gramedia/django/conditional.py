@@ -0,0 +1,111 @@
+"""
+Conditional Requests
+====================
+
+View mixins that answer `GET` requests with `304 Not Modified` when the client's copy is still current,
+without serializing or rendering anything.  Meant for models with a `modified` timestamp
+(e.g. `TimestampedModel`).
+
+.. code-block:: python
+
+    from gramedia.django.conditional import ConditionalListMixin, ConditionalRetrieveMixin
+
+    class BookViewSet(ConditionalListMixin, ConditionalRetrieveMixin, viewsets.ModelViewSet):
+        queryset = Book.objects.all()
+        serializer_class = BookSerializer
+
+Lists are validated with the latest `modified` and the number of rows of the filtered queryset (one aggregate
+query), detail views with the `modified` of their object.  The validators also depend on the full url
+(page, filters, ...), the language and site of the request, the requesting user and the accepted media type,
+so different representations never share an ETag.  Detail responses get `ETag` and `Last-Modified`
+headers, list responses only an `ETag` (next to the pagination's `Link` and `X-Total-Results`): the latest
+`modified` of a list doesn't change when any row but the newest is deleted, so `If-Modified-Since` can't
+tell whether a list is current.
+"""
+import hashlib
+from calendar import timegm
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from gramedia.django.request_context import get_request_language, get_request_site
+
+
+def _timestamp(value):
+    return timegm(value.utctimetuple()) if value is not None else None
+
+
+class ConditionalViewMixin:
+    """ Base for the conditional mixins.  `timestamp_field` is the name of the model's modification time.
+    """
+    timestamp_field = 'modified'
+
+    def get_etag_parts(self, request) -> list:
+        """ Everything besides the data that changes the representation.  Extend to add more.
+        """
+        try:
+            site = get_request_site(request).pk
+        except Exception:
+            site = None
+        user = request.user.pk if request.user and request.user.is_authenticated else None
+        return [
+            request.get_full_path(),
+            get_request_language(request),
+            site,
+            user,
+            request.META.get('HTTP_ACCEPT', ''),
+        ]
+
+    def make_etag(self, request, *parts) -> str:
+        value = '|'.join(str(part) for part in [*self.get_etag_parts(request), *parts])
+        return quote_etag(hashlib.md5(value.encode()).hexdigest())
+
+    def conditional_response(self, request, etag: str, last_modified):
+        """ Returns a `304` response if the client's copy matches, or None.
+        """
+        response = get_conditional_response(request, etag=etag, last_modified=_timestamp(last_modified))
+        if response is not None:
+            self.set_validators(response, etag, last_modified)
+        return response
+
+    def set_validators(self, response, etag: str, last_modified) -> None:
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(_timestamp(last_modified))
+
+
+class ConditionalListMixin(ConditionalViewMixin):
+    """ Conditional `GET` for list views, validated by `ETag` (`If-None-Match`) only.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        stats = queryset.order_by().aggregate(last_modified=Max(self.timestamp_field), count=Count('pk'))
+
+        etag = self.make_etag(request, stats['last_modified'], stats['count'])
+        response = self.conditional_response(request, etag, None)
+        if response is not None:
+            return response
+
+        response = super().list(request, *args, **kwargs)
+        self.set_validators(response, etag, None)
+        return response
+
+
+class ConditionalRetrieveMixin(ConditionalViewMixin):
+    """ Conditional `GET` for detail views.  The object is still fetched (so permissions are checked as usual),
+    but only serialized when the client's copy is out of date.
+    """
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        last_modified = getattr(instance, self.timestamp_field)
+
+        etag = self.make_etag(request, instance.pk, last_modified)
+        response = self.conditional_response(request, etag, last_modified)
+        if response is None:
+            response = Response(self.get_serializer(instance).data)
+            self.set_validators(response, etag, last_modified)
+        return response
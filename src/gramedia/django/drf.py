@@ -7,25 +7,28 @@ to provide for our use cases within our application.
 """
 import logging
 import time
+from functools import lru_cache
+from typing import Optional
+
 import django
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.contrib.sites.models import Site
-from django.contrib.sites.shortcuts import get_current_site
-from django.utils.translation import get_language_from_request
 from djangorestframework_camel_case.render import CamelCaseJSONRenderer
+from djangorestframework_camel_case.util import camel_to_underscore
 from rest_framework import serializers
 from rest_framework import pagination
-from rest_framework.exceptions import PermissionDenied
-from rest_framework.permissions import BasePermission
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.permissions import BasePermission, SAFE_METHODS
 from rest_framework.response import Response
 from rest_framework.utils.urls import replace_query_param
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.relations import HyperlinkedRelatedField, HyperlinkedIdentityField
 from rest_framework.serializers import HyperlinkedModelSerializer
 from gramedia.common.http import LinkHeaderField, LinkHeaderRel
+from gramedia.django.principal_cache import principal_cache, principal_cache_enabled
+from gramedia.django.query_plan import get_query_plan
 from gramedia.django.signalling import BasicRpcClient
-from gramedia.django.utils.helpers import get_user_agent
+from gramedia.django.request_context import get_request_language, get_request_site, get_request_user_agent
 from rest_framework_simplejwt.exceptions import AuthenticationFailed
 from rest_framework_simplejwt.exceptions import InvalidToken
 from rest_framework_simplejwt.settings import api_settings
@@ -37,6 +40,9 @@ else:
 
 logger = logging.getLogger('DRFCommon')
 
+# default `JWT_POS_CLAIMS_MAX_AGE`: seconds after which a token's POS claims are checked with IAM again.
+POS_CLAIMS_MAX_AGE = 900
+
 class LinkHeaderPagination(pagination.PageNumberPagination):
     """ Replaces the default pagination classes, provided by DRF, with one
     that returns pagination data as part of the HTTP Link header.
@@ -150,10 +156,50 @@ class IsAuthenticatedOrOptions(BasePermission):
             return request.user and request.user.is_authenticated()
 
 
+def get_owner_field(view) -> str:
+    """ Name of the foreign key to the owning user, set as `owner_field` on the view (defaults to 'user').
+    """
+    return getattr(view, 'owner_field', 'user')
+
+
 class IsOwner(BasePermission):
+    """ Allows access if the view's queryset matches exactly one row, and that row is owned by
+    the requesting user.
+
+    Only the owner's id is fetched, never the full row.  Anonymous users, and rows without an owner,
+    are always denied.
+    """
     def has_permission(self, request, view):
-        if view.queryset.get().user == request.user:
-            return True
+        if not (request.user and request.user.is_authenticated):
+            return False
+        owner_ids = list(view.queryset.values_list(get_owner_field(view), flat=True)[:2])
+        return len(owner_ids) == 1 and owner_ids[0] is not None and owner_ids[0] == request.user.pk
+
+
+class IsObjectOwner(BasePermission):
+    """ Object-level ownership check, which compares the owner id of the object the view has already
+    fetched with `get_object()`, so it costs no extra queries.
+    """
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.is_authenticated)
+
+    def has_object_permission(self, request, view, obj):
+        if not (request.user and request.user.is_authenticated):
+            return False
+        owner_id = getattr(obj, obj._meta.get_field(get_owner_field(view)).attname)
+        return owner_id is not None and owner_id == request.user.pk
+
+
+class OwnerFilterBackend:
+    """ Filter backend that limits a view's queryset to rows owned by the requesting user.
+
+    Because DRF applies filter backends in `get_object()` as well, detail views get their ownership
+    check folded into the same query that fetches the object (non-owners get a 404).
+    """
+    def filter_queryset(self, request, queryset, view):
+        if not (request.user and request.user.is_authenticated):
+            return queryset.none()
+        return queryset.filter(**{get_owner_field(view): request.user.pk})
 
 
 class SummarizedListMixin:
@@ -167,10 +213,12 @@ class SummarizedListMixin:
             return self.serializer_class
 
 
+@lru_cache(maxsize=None)
 def create_summary_serializer(serializer_cls):
     """ Creates a 'summary serializer' for a given standard serializer class.
 
-    This is intended for list endpoints, and shortens the serializer class to only send back a 'title' and an 'href'
+    This is intended for list endpoints, and shortens the serializer class to only send back a 'title' and an 'href'.
+    The class is created once per serializer class.
 
     :param serializer_cls:
     :return:
@@ -187,6 +235,96 @@ def create_summary_serializer(serializer_cls):
     return SummarySerializer
 
 
+@lru_cache(maxsize=256)
+def create_sparse_serializer(serializer_cls, fields: tuple):
+    """ Creates a serializer class with only some of `serializer_cls`'s fields.
+
+    Classes are cached (up to 256 of them), so asking for the same fields again returns the same class.
+
+    :param serializer_cls: A model serializer class.
+    :param fields: Names of the fields to keep, in the order they should be rendered.
+    """
+
+    class SparseSerializer(serializer_cls):
+        class Meta(serializer_cls.Meta):
+            pass
+
+    SparseSerializer.Meta.fields = fields
+    SparseSerializer.Meta.exclude = None
+    SparseSerializer._declared_fields = {
+        name: field for name, field in serializer_cls._declared_fields.items() if name in fields
+    }
+    SparseSerializer.__name__ = f'Sparse{serializer_cls.__name__}'
+    return SparseSerializer
+
+
+@lru_cache(maxsize=None)
+def _serializer_field_names(serializer_cls) -> tuple:
+    return tuple(serializer_cls().fields)
+
+
+class SparseFieldsMixin:
+    """ Lets clients choose the fields they need, with `?fields=name,href` or `?exclude=description`
+    (camelCase or snake_case), for `GET` requests.
+
+    Only the fields listed in the serializer's `Meta.sparse_fields` can be chosen or excluded, anything else is
+    a `400`.  The serializer's other fields (e.g. `href`) are always included, with either parameter:
+    `?fields=name` renders `name` and every field missing from `Meta.sparse_fields`.  Serializers without
+    `Meta.sparse_fields` ignore these parameters.
+
+    The queryset is trimmed to match (see `gramedia.django.query_plan`), so columns and relations of the
+    fields left out aren't loaded.
+    """
+    fields_query_param = 'fields'
+    exclude_query_param = 'exclude'
+
+    def _query_param_names(self, param: str) -> Optional[list]:
+        value = self.request.query_params.get(param)
+        if value is None:
+            return None
+        return [camel_to_underscore(name.strip()) for name in value.split(',') if name.strip()]
+
+    def get_sparse_fields(self, serializer_cls):
+        """ Returns the names of the fields requested, in the serializer's order, or None for all of them.
+        """
+        allowed = getattr(getattr(serializer_cls, 'Meta', None), 'sparse_fields', None)
+        if allowed is None or self.request.method not in SAFE_METHODS:
+            return None
+
+        fields = self._query_param_names(self.fields_query_param)
+        exclude = self._query_param_names(self.exclude_query_param)
+        if fields is None and exclude is None:
+            return None
+
+        errors = {}
+        for param, names in ((self.fields_query_param, fields), (self.exclude_query_param, exclude)):
+            unknown = [name for name in names or () if name not in allowed]
+            if unknown:
+                errors[param] = [f'Unknown field(s): {", ".join(unknown)}.  Choose from: {", ".join(allowed)}.']
+        if errors:
+            raise ValidationError(errors)
+
+        return tuple(
+            name for name in _serializer_field_names(serializer_cls)
+            if (fields is None or name in fields or name not in allowed) and name not in (exclude or ())
+        )
+
+    def get_serializer_class(self):
+        serializer_cls = super().get_serializer_class()
+        fields = self.get_sparse_fields(serializer_cls)
+        if fields is None:
+            return serializer_cls
+        return create_sparse_serializer(serializer_cls, fields)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        serializer_cls = super().get_serializer_class()
+        fields = self.get_sparse_fields(serializer_cls)
+        if fields is None:
+            return queryset
+        return get_query_plan(create_sparse_serializer(serializer_cls, fields), queryset.model).apply(queryset)
+
+
 class SummaryCamelCaseRenderer(CamelCaseJSONRenderer):
     """ Just like the CamelCaseJSONRenderer, but replaces any MultiLang fields (or things that
     LOOK like multilang fields) and replaces them with a string representing the user's current language.
@@ -212,34 +350,34 @@ class SummaryCamelCaseRenderer(CamelCaseJSONRenderer):
     format = 'json'
 
     def render(self, data, accepted_media_type=None, renderer_context=None):
-        # TODO: this is ugly as sin.. needs refactored heavily.
+        enabled_languages = sorted([t[0] for t in settings.LANGUAGES])
+        preferred_language = None
+
+        def translate(element):
+            nonlocal preferred_language
+            for k, v in element.items():
+                if isinstance(v, dict) and enabled_languages == sorted(v.keys()):
+                    if preferred_language is None:
+                        preferred_language = self.get_preferred_language(renderer_context)
+                    element[k] = v[preferred_language[:2]]  # make if something like en-US, just get 'en'
+
         if isinstance(data, list):
             for element in data:
-                enabled_languages = sorted([t[0] for t in settings.LANGUAGES])
-                for k, v in element.items():
-                    if isinstance(v, dict) and enabled_languages == sorted(v.keys()):
-                        preferred_language = settings.LANGUAGE_CODE
-                        try:
-                            preferred_language = get_language_from_request(renderer_context['request'])
-                        except Exception:
-                            pass
-                        element[k] = v[preferred_language[:2]]  # make if something like en-US, just get 'en'
+                translate(element)
         elif isinstance(data, dict):
-            enabled_languages = sorted([t[0] for t in settings.LANGUAGES])
-            for k, v in data.items():
-                if isinstance(v, dict) and enabled_languages == sorted(v.keys()):
-                    preferred_language = settings.LANGUAGE_CODE
-                    try:
-                        preferred_language = get_language_from_request(renderer_context['request'])
-                    except Exception:
-                        pass
-                    data[k] = v[preferred_language[:2]]  # make if something like en-US, just get 'en'
+            translate(data)
         return super(SummaryCamelCaseRenderer, self).render(
             data,
             accepted_media_type=accepted_media_type,
             renderer_context=renderer_context
         )
 
+    def get_preferred_language(self, renderer_context) -> str:
+        try:
+            return get_request_language(renderer_context['request'])
+        except Exception:
+            return settings.LANGUAGE_CODE
+
 
 class FullCamelCaseRenderer(CamelCaseJSONRenderer):
     media_type = 'application/json'
@@ -254,27 +392,33 @@ class CurrentSiteSerializerMixin:
     """
 
     def create(self, validated_data):
-        validated_data['site'] = get_current_site(self.context['request'])
+        validated_data['site'] = get_request_site(self.context['request'])
         return super().create(validated_data)
 
     def update(self, instance, validated_data):
-        validated_data['site'] = get_current_site(self.context['request'])
+        validated_data['site'] = get_request_site(self.context['request'])
         return super().update(instance, validated_data)
 
 
 class CurrentSiteViewSetMixin:
 
     def get_queryset(self):
-        site = get_current_site(self.request)
-        return self.queryset.filter(site=site)
+        return self.queryset.filter(site=self.current_site)
 
     @property
     def current_site(self):
-        return get_current_site(self.request)
+        return get_request_site(self.request)
 
 
 class JWTNusantaraAuthentication(JWTAuthentication):
+    """ JWT authentication that also checks the token was issued for the current site.
+
+    If the `JWT_PRINCIPAL_CACHE` setting is enabled, the resolved user is cached per token
+    (see :mod:`gramedia.django.principal_cache`), and repeat requests with the same token skip
+    token validation, the site checks and loading the user.
+    """
     request = None
+    site = None
 
     def authenticate(self, request):
         header = self.get_header(request)
@@ -288,9 +432,47 @@ class JWTNusantaraAuthentication(JWTAuthentication):
         if raw_token is None:
             return None
 
+        use_cache = principal_cache_enabled()
+        if use_cache:
+            principal = self.get_cached_principal(raw_token)
+            if principal is not None:
+                user = self.get_principal_user(principal)
+                self.authorize_pos_user(user, self.site, principal.validated_token)
+                return user, principal.validated_token
+
         validated_token = self.get_validated_token(raw_token)
+        user = self.get_user(validated_token)
+
+        if use_cache:
+            principal_cache.set(raw_token, validated_token, user, self.site)
 
-        return self.get_user(validated_token), validated_token
+        return user, validated_token
+
+    def get_cached_principal(self, raw_token):
+        """ Returns the cached principal for this token, if it is still usable on the current site.
+        """
+        principal = principal_cache.get(raw_token)
+        if principal is None:
+            return None
+
+        self.site = self.get_current_site()
+        if self.site is None or principal.site_id != self.site.pk:
+            return None
+
+        if not principal.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        return principal
+
+    def get_principal_user(self, principal):
+        """ Returns a new instance of a cached principal's user, without querying the database.
+        """
+        return principal.make_user()
+
+    def get_current_site(self):
+        if self.request:
+            return get_request_site(self.request)
+        return None
 
     def get_user(self, validated_token):
         """
@@ -306,9 +488,7 @@ class JWTNusantaraAuthentication(JWTAuthentication):
         except KeyError:
             raise InvalidToken(_('Token contained no recognizable site identification'))
 
-        site = None
-        if self.request:
-            site = Site.objects.get_current(self.request)
+        site = self.site = self.get_current_site()
         if site is None:
             raise AuthenticationFailed(_('Site not found'), code='user_not_found')
         if user_site != site.domain:
@@ -322,35 +502,79 @@ class JWTNusantaraAuthentication(JWTAuthentication):
         if not user.is_active:
             raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
 
-        if get_user_agent(self.request).device_name == 'Bhisma POS':
-            IAM_POS_USER_RPC = f"{settings.CLUSTER_PREFIX}iam_pos_user_rpc"  # iam_user_rpc
-            publish = BasicRpcClient(routing=IAM_POS_USER_RPC)
-            logger.info(f'Calling RPC Client {IAM_POS_USER_RPC}')
-            rpc_response = publish.call(
-                message={
-                    "email": user.email
-                },
-                event_type='pos_user_rpc',
-                entity_type='pos_user_rpc',
-                site=site
-            )
-            logger.info(f'End call RPC Client {IAM_POS_USER_RPC}')
-            logger.debug(rpc_response)
+        self.authorize_pos_user(user, site, validated_token)
 
+        return user
 
-            data = rpc_response.get('data')
+    def authorize_pos_user(self, user, site, validated_token):
+        """ Requests coming from a POS device must belong to a staff member allowed to use
+        the POS at the warehouse given in the 'Warehouse' header.
 
-            if not data.get('is_staff', False):
-                raise PermissionDenied(_('Unauthorized employee access'), code='unauthorized_employee')
+        By default these facts are fetched from IAM over RPC.  With `JWT_POS_AUTHORIZATION = 'claims'`
+        they are read from the token's own `is_staff`, `can_use_pos` and `warehouses` claims instead,
+        falling back to the RPC only when those claims are missing, or older (by `iat`) than
+        `JWT_POS_CLAIMS_MAX_AGE` seconds (default 900, None to trust claims for the token's whole lifetime).
+        An IAM lookup that finds nothing denies access.
+        """
+        if get_request_user_agent(self.request).device_name != 'Bhisma POS':
+            return
 
-            if not data.get('can_use_pos', False):
-                raise PermissionDenied(_('Unauthorized POS access'), code='unauthorized_pos_user')
+        data = None
+        if getattr(settings, 'JWT_POS_AUTHORIZATION', 'rpc') == 'claims':
+            data = self.get_pos_claims(validated_token)
+        if data is None:
+            data = self.get_pos_user_from_iam(user, site) or {}
 
-            warehouse = self.request.META.get('HTTP_WAREHOUSE', '')
-            if warehouse not in data.get('warehouses', []):
-                raise PermissionDenied(_('Unauthorized POS warehouse'), code='unauthorized_pos_warehouse')
+        if not data.get('is_staff', False):
+            raise PermissionDenied(_('Unauthorized employee access'), code='unauthorized_employee')
 
-        return user
+        if not data.get('can_use_pos', False):
+            raise PermissionDenied(_('Unauthorized POS access'), code='unauthorized_pos_user')
+
+        warehouse = self.request.META.get('HTTP_WAREHOUSE', '')
+        if warehouse not in data.get('warehouses', []):
+            raise PermissionDenied(_('Unauthorized POS warehouse'), code='unauthorized_pos_warehouse')
+
+    def get_pos_claims(self, validated_token):
+        """ Returns the POS authorization claims from a token, or None if they are missing or stale.
+        """
+        claims = {}
+        for claim in ('is_staff', 'can_use_pos', 'warehouses'):
+            try:
+                claims[claim] = validated_token[claim]
+            except KeyError:
+                return None
+
+        if not isinstance(claims['warehouses'], (list, tuple)):
+            return None
+
+        max_age = getattr(settings, 'JWT_POS_CLAIMS_MAX_AGE', POS_CLAIMS_MAX_AGE)
+        if max_age is not None:
+            try:
+                issued_at = float(validated_token['iat'])
+            except (KeyError, TypeError, ValueError):
+                return None
+            if time.time() - issued_at > max_age:
+                return None
+
+        return claims
+
+    def get_pos_user_from_iam(self, user, site):
+        IAM_POS_USER_RPC = f"{settings.CLUSTER_PREFIX}iam_pos_user_rpc"  # iam_user_rpc
+        publish = BasicRpcClient(routing=IAM_POS_USER_RPC)
+        logger.info(f'Calling RPC Client {IAM_POS_USER_RPC}')
+        rpc_response = publish.call(
+            message={
+                "email": user.email
+            },
+            event_type='pos_user_rpc',
+            entity_type='pos_user_rpc',
+            site=site
+        )
+        logger.info(f'End call RPC Client {IAM_POS_USER_RPC}')
+        logger.debug(rpc_response)
+
+        return rpc_response.get('data') if rpc_response else None
 
 
 def is_normal_user(request):
@@ -1,8 +1,93 @@
 import json
 import os
+import threading
 
 from jsonschema import RefResolver, validators, RefResolutionError
-from jsonschema.compat import urlsplit, urldefrag
+from jsonschema.compat import urlsplit, urldefrag, urljoin
+
+from gramedia.common.jsonschema import (
+    SchemaFileCache, DEFAULT_BASE_URL, debug_enabled, get_validator, validate_many,
+)
+
+
+def _get_settings():
+    try:
+        from django.conf import settings
+    except ImportError:
+        raise RuntimeError(
+            "It doesn't look like you have django installed.  "
+            "You cannot use this DjangoSchemaResolver outside of a Django project.")
+    return settings
+
+
+class SchemaRegistry:
+    """ Index of every schema in the project's `<app>/static/schemas/` directories.
+
+    The directories are scanned once, on first use, into a name -> path map, and each schema is parsed
+    only once.  When `settings.DEBUG` is on, changed files are reloaded (based on their modification time)
+    and the directories are re-scanned when a schema can't be found, so new files are picked up too.
+
+    If two apps contain a schema with the same name, the one from the app listed first in `INSTALLED_APPS` wins.
+    """
+    def __init__(self):
+        self._paths = None
+        self._files = None
+        self._lock = threading.Lock()
+
+    @property
+    def debug(self) -> bool:
+        return bool(getattr(_get_settings(), 'DEBUG', False))
+
+    def scan(self) -> None:
+        settings = _get_settings()
+        paths = {}
+        for pkg in settings.INSTALLED_APPS:
+            schema_dir = os.path.join(settings.BASE_DIR, *pkg.split('.'), 'static', 'schemas')
+            try:
+                names = os.listdir(schema_dir)
+            except OSError:
+                continue
+            for name in names:
+                full_path = os.path.join(schema_dir, name)
+                if name not in paths and os.path.isfile(full_path):
+                    paths[name] = full_path
+
+        with self._lock:
+            self._paths = paths
+            if self._files is None:
+                self._files = SchemaFileCache(check_mtime=debug_enabled)
+
+    def names(self) -> list:
+        if self._paths is None:
+            self.scan()
+        return sorted(self._paths)
+
+    def find(self, schema_name: str):
+        """ Returns the full path of a schema by its file name, or None if there is no such schema.
+        """
+        if self._paths is None:
+            self.scan()
+        path = self._paths.get(schema_name)
+        if path is None and self.debug:
+            self.scan()
+            path = self._paths.get(schema_name)
+        return path
+
+    def get(self, schema_name: str):
+        """ Returns a parsed schema by its file name, or None if there is no such schema.
+        """
+        path = self.find(schema_name)
+        if path is None:
+            return None
+        return self._files.load(path)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._paths = None
+            self._files = None
+
+
+schema_registry = SchemaRegistry()
 
 
 def find_schema_path(schema_name: str):
@@ -24,17 +109,171 @@ def find_schema_path(schema_name: str):
     find_schema_path('i-dont-exist.json')
     > None
     """
-    try:
-        from django.conf import settings
-    except ImportError:
-        raise RuntimeError(
-            "It doesn't look like you have django installed.  "
-            "You cannot use this DjangoSchemaResolver outside of a Django project.")
+    return schema_registry.find(schema_name)
+
+
+# format of the files written by `build_schema_bundle`, bumped on incompatible changes.
+SCHEMA_BUNDLE_FORMAT = 1
+
+
+class SchemaBundleError(Exception):
+    """ Raised when a schema bundle can't be built (e.g. because of an unresolvable `$ref`) or loaded.
+    """
+    pass
+
+
+class _BundleBuildResolver(RefResolver):
+    """ Resolves remote references only from the schema registry, never from the network.
+    """
+    def resolve_remote(self, uri):
+        schema = schema_registry.get(urlsplit(uri).path.split('/')[-1])
+        if schema is None:
+            raise RefResolutionError(f'{uri} is not in any app\'s static/schemas directory')
+        return schema
 
-    for pkg in settings.INSTALLED_APPS:
-        full_path = os.path.join(settings.BASE_DIR, *pkg.split('.'), 'static', 'schemas', schema_name)
-        if os.path.exists(full_path):
-            return full_path
+
+class _BundleBuilder:
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+
+    def canonical_url(self, url: str) -> str:
+        """ Schema urls are resolved by their file name, so they are all stored under `base_url`.
+        """
+        document, fragment = urldefrag(url)
+        return f'{self.base_url}{urlsplit(document).path.split("/")[-1]}#{fragment}'
+
+    def dereference(self, name: str, schema):
+        document_url = f'{self.base_url}{name}'
+        resolver = _BundleBuildResolver(document_url, schema)
+        return self.inline(name, resolver, schema, document_url, frozenset([f'{document_url}#']))
+
+    def inline(self, name: str, resolver: RefResolver, node, scope: str, stack: frozenset):
+        """ Copies `node`, replacing `$ref`s with what they point to.  References back to a schema that's being
+        inlined (recursive schemas) are kept, as absolute urls pointing into the bundle's original documents.
+        """
+        if isinstance(node, list):
+            return [self.inline(name, resolver, item, scope, stack) for item in node]
+        if not isinstance(node, dict):
+            return node
+
+        if isinstance(node.get('id'), str):
+            scope = urljoin(scope, node['id'])
+
+        ref = node.get('$ref')
+        if isinstance(ref, str):
+            url = self.canonical_url(urljoin(scope, ref))
+            if url in stack:
+                return {'$ref': url}
+            try:
+                _, resolved = resolver.resolve(url)
+            except RefResolutionError as exc:
+                raise SchemaBundleError(f'{name}: unresolvable $ref {ref!r} ({exc})')
+            return self.inline(name, resolver, resolved, urldefrag(url)[0], stack | {url})
+
+        return {
+            key: value if key == 'enum' else self.inline(name, resolver, value, scope, stack)
+            for key, value in node.items()
+        }
+
+
+def build_schema_bundle(base_url: str = DEFAULT_BASE_URL, version: str = '') -> dict:
+    """ Collects every schema in the `schema_registry`, with all their `$ref`s inlined, into one dict that
+    can be saved as JSON and loaded with `SchemaBundle`.  The schemas are also kept as they are, for resolving
+    the references that can't be inlined (recursive schemas).
+
+    :raises SchemaBundleError: If any reference can't be resolved from the project's schemas.
+    """
+    builder = _BundleBuilder(base_url)
+    schemas, documents = {}, {}
+    for name in schema_registry.names():
+        try:
+            documents[name] = schema_registry.get(name)
+        except ValueError as exc:
+            raise SchemaBundleError(f'{name}: invalid JSON ({exc})')
+        schemas[name] = builder.dereference(name, documents[name])
+
+    return {
+        'format': SCHEMA_BUNDLE_FORMAT,
+        'version': version,
+        'base_url': base_url,
+        'schemas': schemas,
+        'documents': documents,
+    }
+
+
+class SchemaBundle:
+    """ Schemas loaded from a bundle written by the `build_schema_bundle` management command.
+
+    References left in the bundle (recursive schemas) are resolved from the bundle itself: looking up a schema never
+    reads a schema file or goes to the network.
+
+    .. code-block:: python
+
+        bundle = SchemaBundle.load('/app/schemas.bundle.json')
+        bundle.validator('banner-schema.json').validate(document)
+    """
+    def __init__(self, data: dict):
+        if data.get('format') != SCHEMA_BUNDLE_FORMAT:
+            raise SchemaBundleError(f'Unsupported schema bundle format: {data.get("format")!r}')
+        self.version = data['version']
+        self.base_url = data['base_url']
+        self.schemas = data['schemas']
+        self.documents = data['documents']
+        self.store = {f'{self.base_url}{name}': document for name, document in self.documents.items()}
+        self._validators = threading.local()
+
+    @classmethod
+    def load(cls, path: str) -> 'SchemaBundle':
+        try:
+            with open(path) as fp:
+                return cls(json.load(fp))
+        except (OSError, ValueError) as exc:
+            raise SchemaBundleError(f'Could not load schema bundle {path}: {exc}')
+
+    def get(self, schema_name: str):
+        """ Returns a schema by its file name, or None if it isn't in the bundle.
+        """
+        return self.schemas.get(schema_name)
+
+    def _missing(self, uri):
+        raise RefResolutionError(f'{uri} is not in schema bundle {self.version!r}')
+
+    def resolver(self, schema_name: str) -> RefResolver:
+        return RefResolver(
+            f'{self.base_url}{schema_name}', self.documents[schema_name], store=self.store,
+            handlers={'http': self._missing, 'https': self._missing, 'file': self._missing})
+
+    def validator(self, schema_name: str, validator_class=None):
+        """ Cached validator (per thread, like `get_validator`) for a schema in the bundle.
+
+        :param validator_class: Defaults to `DjangoDraft4Validator`.
+        """
+        validator_class = validator_class or DjangoDraft4Validator
+        cache = getattr(self._validators, 'validators', None)
+        if cache is None:
+            cache = self._validators.validators = {}
+        key = (schema_name, validator_class)
+        if key not in cache:
+            cache[key] = validator_class(self.schemas[schema_name], self.resolver(schema_name))
+        return cache[key]
+
+
+_bundle = None
+_bundle_lock = threading.Lock()
+
+
+def get_schema_bundle():
+    """ The bundle at `settings.JSONSCHEMA_BUNDLE`, loaded on first use, or None if that setting isn't set.
+    """
+    global _bundle
+    path = getattr(_get_settings(), 'JSONSCHEMA_BUNDLE', None)
+    if not path:
+        return None
+    if _bundle is None:
+        with _bundle_lock:
+            if _bundle is None:
+                _bundle = SchemaBundle.load(path)
+    return _bundle
 
 
 class DjangoSchemaResolver(RefResolver):
@@ -48,6 +287,9 @@ class DjangoSchemaResolver(RefResolver):
 
     Example:
     banners/static/schemas/banner-schema.json
+
+    When `settings.JSONSCHEMA_BUNDLE` is set, schemas are looked up in that bundle (see `build_schema_bundle`)
+    before the project's directories.
     """
 
     def resolve_from_url(self, uri):
@@ -55,10 +297,12 @@ class DjangoSchemaResolver(RefResolver):
         split_url = urlsplit(uri)
         if split_url.scheme in self.handlers:
             return self.handlers[split_url.scheme](uri)
-        full_path = find_schema_path(uri.split('/')[-1])
-        if full_path:
-            with open(full_path) as fp:
-                json_schema = json.load(fp)
+        schema_name = uri.split('/')[-1]
+        bundle = get_schema_bundle()
+        if bundle is not None and bundle.get(schema_name) is not None:
+            return self.resolve_fragment(bundle.get(schema_name), fragment)
+        if schema_registry.find(schema_name):
+            json_schema = schema_registry.get(schema_name)
             if not json_schema:
                 # TODO: fix exception method
                 raise RefResolutionError(
@@ -73,3 +317,16 @@ class DjangoSchemaResolver(RefResolver):
 class DjangoDraft4Validator(validators.Draft4Validator):
     def __init__(self, schema, resolver):
         super(DjangoDraft4Validator, self).__init__(schema, resolver=resolver)
+
+
+def get_django_validator(schema: dict, base_url: str = DEFAULT_BASE_URL) -> DjangoDraft4Validator:
+    """ Cached `DjangoDraft4Validator` for a schema, see `gramedia.common.jsonschema.get_validator`.
+    """
+    return get_validator(schema, base_url, DjangoDraft4Validator, DjangoSchemaResolver)
+
+
+def django_validate_many(docs, schema: dict, base_url: str = DEFAULT_BASE_URL, **kwargs) -> dict:
+    """ `gramedia.common.jsonschema.validate_many`, resolving references with `DjangoSchemaResolver`.
+    """
+    return validate_many(docs, schema, base_url,
+                         validator_class=DjangoDraft4Validator, resolver_class=DjangoSchemaResolver, **kwargs)
@@ -0,0 +1,40 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from gramedia.common.jsonschema import DEFAULT_BASE_URL
+from gramedia.django.jsonschema import SchemaBundleError, build_schema_bundle
+
+
+class Command(BaseCommand):
+    help = ("Writes every app's static/schemas, with their references inlined, to a single bundle file. "
+            "Fails if any reference can't be resolved.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=getattr(settings, 'JSONSCHEMA_BUNDLE', None),
+                            help='Where to write the bundle, defaults to settings.JSONSCHEMA_BUNDLE.')
+        parser.add_argument('--bundle-version', default='',
+                            help='Version stored in the bundle, e.g. a release tag or commit hash.')
+        parser.add_argument('--base-url', default=DEFAULT_BASE_URL,
+                            help='Base url the schemas refer to each other with.')
+
+    def handle(self, *args, **options):
+        output = options['output']
+        if not output:
+            raise CommandError('Give an --output path, or set JSONSCHEMA_BUNDLE.')
+
+        try:
+            bundle = build_schema_bundle(options['base_url'], options['bundle_version'])
+        except SchemaBundleError as exc:
+            raise CommandError(str(exc))
+
+        # written next to the destination first, so a running process never reads half a bundle.
+        tmp_path = f'{output}.tmp'
+        with open(tmp_path, 'w') as fp:
+            json.dump(bundle, fp, sort_keys=True, separators=(',', ':'))
+        os.replace(tmp_path, output)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {len(bundle["schemas"])} schema(s) to {output} (version {bundle["version"]!r}).'))
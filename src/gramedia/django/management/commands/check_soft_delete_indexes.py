@@ -0,0 +1,77 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db.migrations.loader import MigrationLoader
+from django.db.models import Q
+
+from gramedia.django.abstract_models import SoftDeletableModel, MarkDeletedModel
+
+SOFT_DELETE_FIELDS = (
+    (SoftDeletableModel, 'is_active'),
+    (MarkDeletedModel, 'deleted'),
+)
+
+
+def _condition_fields(condition: Q) -> set:
+    fields = set()
+    for child in condition.children:
+        if isinstance(child, Q):
+            fields |= _condition_fields(child)
+        else:
+            fields.add(child[0].split('__')[0])
+    return fields
+
+
+def find_soft_delete_index_problems(app_labels=None) -> list:
+    """ Returns a list of human-readable problems with soft-delete models' partial indexes:
+    models without any partial index on their soft delete column, and partial indexes that
+    have not been added to a migration yet.
+    """
+    migrated_state = MigrationLoader(None, ignore_no_migrations=True).project_state()
+    problems = []
+
+    for model in apps.get_models():
+        opts = model._meta
+        if opts.proxy or not opts.managed:
+            continue
+        if app_labels and opts.app_label not in app_labels:
+            continue
+
+        for base, field_name in SOFT_DELETE_FIELDS:
+            if not issubclass(model, base):
+                continue
+
+            partial_indexes = [
+                index for index in opts.indexes
+                if index.condition is not None and field_name in _condition_fields(index.condition)
+            ]
+            if not partial_indexes:
+                problems.append(
+                    f'{opts.label}: no partial index on rows filtered by {field_name!r}. '
+                    f'Set soft_delete_index_fields on the model.')
+                continue
+
+            model_state = migrated_state.models.get((opts.app_label, opts.model_name))
+            migrated = {index.name for index in model_state.options.get('indexes', [])} if model_state else set()
+            for index in partial_indexes:
+                if index.name not in migrated:
+                    problems.append(f'{opts.label}: index {index.name} is not in any migration. Run makemigrations.')
+
+    return problems
+
+
+class Command(BaseCommand):
+    help = 'Reports soft-deletable models that are missing partial indexes for their live rows.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('app_labels', nargs='*', help='Only check models from these apps.')
+        parser.add_argument('--fail', action='store_true', help='Exit with an error if any problems are found.')
+
+    def handle(self, *args, **options):
+        problems = find_soft_delete_index_problems(options['app_labels'])
+        for problem in problems:
+            self.stdout.write(self.style.WARNING(problem))
+
+        if not problems:
+            self.stdout.write(self.style.SUCCESS('All soft-delete models have partial indexes.'))
+        elif options['fail']:
+            raise CommandError(f'{len(problems)} soft-delete index problem(s) found.')
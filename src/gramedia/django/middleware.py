@@ -0,0 +1,78 @@
+"""
+Django Middleware
+=================
+
+.. code-block:: python
+
+    MIDDLEWARE = [
+        ...
+        'gramedia.django.middleware.CurrentSiteMiddleware',
+        'gramedia.django.middleware.RequestContextMiddleware',
+        'gramedia.django.middleware.ReadWriteRouterMiddleware',
+        ...
+    ]
+"""
+import logging
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import DatabaseError
+from django.utils.functional import SimpleLazyObject, lazy
+
+from gramedia.django.request_context import get_request_language, get_request_user_agent
+from gramedia.django.sites import site_registry, get_request_site
+from gramedia.django.utils.db import request_started, request_finished
+
+logger = logging.getLogger('gramedia')
+
+
+class CurrentSiteMiddleware:
+    """ Preloads the site registry at startup, then resolves the current site once per request
+    and stores it as `request.site`, where `get_request_site` (and everything that uses it) will find it.
+
+    Requests for unknown hosts are let through without `request.site`; code that needs the site will
+    raise `Site.DoesNotExist` when it asks for it.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        try:
+            site_registry.load()
+        except DatabaseError:
+            logger.warning('Could not preload the site registry, it will be loaded on first use.', exc_info=True)
+
+    def __call__(self, request):
+        try:
+            get_request_site(request)
+        except ObjectDoesNotExist:
+            pass
+        return self.get_response(request)
+
+
+class RequestContextMiddleware:
+    """ Adds `request.user_agent` and `request.language`, computed on first use only, and at most once per
+    request (see `gramedia.django.request_context`).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.user_agent = SimpleLazyObject(lambda: get_request_user_agent(request))
+        request.language = lazy(get_request_language, str)(request)
+        return self.get_response(request)
+
+
+class ReadWriteRouterMiddleware:
+    """ Pins database reads to 'default' for the rest of a request once that request has written anything,
+    when used with `gramedia.django.utils.db.ReadWriteRouter`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_started()
+        try:
+            return self.get_response(request)
+        finally:
+            request_finished()
@@ -0,0 +1,99 @@
+"""
+Multi-language Fields
+=====================
+
+Multi-language JSON fields (`{"en": "...", "id": "..."}`) are reduced to a single language by
+`SummaryCamelCaseRenderer`, after every translation has been loaded and serialized.  These mixins pick the
+language in the database instead, when that renderer is used, so only one translation is ever loaded.
+
+.. code-block:: python
+
+    from gramedia.django.multilang import MultilangProjectionMixin, MultilangProjectionSerializerMixin
+
+    class BookSerializer(MultilangProjectionSerializerMixin, serializers.ModelSerializer):
+        ...
+
+    # keep this mixin first, so its changes to the queryset are applied last.
+    class BookViewSet(MultilangProjectionMixin, viewsets.ModelViewSet):
+        multilang_fields = ('name', 'description', )
+        renderer_classes = (SummaryCamelCaseRenderer, FullCamelCaseRenderer, )
+
+The request's language is used (see `gramedia.django.request_context.get_request_language`), falling back to
+`LANGUAGE_CODE` for rows without that translation.
+"""
+from django.conf import settings
+from django.db.models.functions import Coalesce
+from rest_framework import serializers
+
+try:
+    from django.db.models.fields.json import KeyTextTransform
+except ImportError:  # django < 3.1
+    from django.contrib.postgres.fields.jsonb import KeyTextTransform
+
+from gramedia.django.drf import SummaryCamelCaseRenderer
+from gramedia.django.request_context import get_request_language
+
+# suffix of the annotations holding the projected translations.
+PROJECTION_SUFFIX = '_translated'
+
+
+def language_projection(field_name: str, language: str):
+    """ Expression for the `language` translation of a JSON field, or the `LANGUAGE_CODE` one if it's missing.
+    """
+    language, default = language[:2], settings.LANGUAGE_CODE[:2]
+    if language == default:
+        return KeyTextTransform(language, field_name)
+    return Coalesce(KeyTextTransform(language, field_name), KeyTextTransform(default, field_name))
+
+
+def project_language(queryset, field_names, language: str):
+    """ Annotates `queryset` with one translation of each multi-language field (as `<field>_translated`),
+    and stops loading the fields themselves.
+    """
+    queryset = queryset.annotate(**{
+        f'{name}{PROJECTION_SUFFIX}': language_projection(name, language) for name in field_names
+    })
+    return queryset.defer(*field_names)
+
+
+class MultilangProjectionMixin:
+    """ View mixin projecting `multilang_fields` to the request's language in the database, when the response
+    is rendered by `SummaryCamelCaseRenderer`.  The serializer must use `MultilangProjectionSerializerMixin`.
+    """
+    multilang_fields = ()
+
+    def projects_language(self) -> bool:
+        return (self.request.method == 'GET'
+                and isinstance(getattr(self.request, 'accepted_renderer', None), SummaryCamelCaseRenderer))
+
+    def get_projected_language(self) -> str:
+        try:
+            return get_request_language(self.request)
+        except Exception:
+            return settings.LANGUAGE_CODE
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if not self.multilang_fields or not self.projects_language():
+            return queryset
+        return project_language(queryset, self.multilang_fields, self.get_projected_language())
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.multilang_fields and self.projects_language():
+            context['projected_multilang_fields'] = self.multilang_fields
+        return context
+
+
+class MultilangProjectionSerializerMixin:
+    """ Serializes projected multi-language fields (see `MultilangProjectionMixin`) from their single
+    translation, under their own name.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        for name in self.context.get('projected_multilang_fields', ()):
+            if name in fields:
+                fields[name] = serializers.CharField(
+                    source=f'{name}{PROJECTION_SUFFIX}', read_only=True, allow_null=True)
+        return fields
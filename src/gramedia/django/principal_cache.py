@@ -0,0 +1,192 @@
+"""
+Authenticated Principal Cache
+=============================
+
+In-process cache of principals resolved by `JWTNusantaraAuthentication`.
+
+Entries are keyed by a hash of the raw token (the token itself is never stored as a key), and are
+only valid until the token's `exp` claim.  The user's column values are cached along with the site, and a
+fresh user instance is built from them for every request, without a query (its groups and permissions are
+still loaded on first use, as usual).  Saving or deleting a user, or changing their groups or permissions,
+drops every entry that was resolved for that user, so deactivations take effect on the very next request.
+Changes that don't send signals (`QuerySet.update()`, raw SQL, other processes) are only seen once the
+token expires or the entry is evicted.
+
+Enable it with the `JWT_PRINCIPAL_CACHE` setting.  'gramedia.django' must be in `INSTALLED_APPS`, as that
+is where the invalidation signals are connected:
+
+.. code-block:: python
+
+    JWT_PRINCIPAL_CACHE = True
+    JWT_PRINCIPAL_CACHE_MAX_ENTRIES = 10000  # optional
+"""
+import hashlib
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models.signals import m2m_changed, post_save, post_delete
+
+
+class CachedPrincipal:
+    """ A user's column values, the site they were authenticated against and their already validated token.
+    """
+    __slots__ = ('user_pk', 'is_active', 'user_db', 'user_fields', 'user_values', 'site_id', 'validated_token',
+                 'expires_at')
+
+    def __init__(self, user, site_id, validated_token, expires_at: float):
+        fields = [field.attname for field in user._meta.concrete_fields]
+        self.user_pk = user.pk
+        self.is_active = user.is_active
+        self.user_db = user._state.db
+        self.user_fields = tuple(fields)
+        self.user_values = tuple(getattr(user, name) for name in fields)
+        self.site_id = site_id
+        self.validated_token = validated_token
+        self.expires_at = expires_at
+
+    def make_user(self):
+        """ Returns a new user instance, as if it had just been loaded from the database.
+        """
+        return get_user_model().from_db(self.user_db, self.user_fields, self.user_values)
+
+    @property
+    def expired(self) -> bool:
+        return time.time() >= self.expires_at
+
+
+class PrincipalCache:
+    """ Thread-safe mapping of token hash -> `CachedPrincipal`.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries = {}
+        self._keys_by_user = defaultdict(set)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(raw_token) -> str:
+        if isinstance(raw_token, str):
+            raw_token = raw_token.encode()
+        return hashlib.sha256(raw_token).hexdigest()
+
+    def get(self, raw_token) -> CachedPrincipal:
+        """ Returns the cached principal for a raw token, or None if it's unknown or expired.
+        """
+        key = self.make_key(raw_token)
+        principal = self._entries.get(key)
+        if principal is not None and principal.expired:
+            with self._lock:
+                self._discard(key)
+            return None
+        return principal
+
+    def set(self, raw_token, validated_token, user, site) -> None:
+        try:
+            expires_at = float(validated_token['exp'])
+        except (KeyError, TypeError, ValueError):
+            # without an expiry we can't know how long it's safe to trust this token.
+            return
+
+        key = self.make_key(raw_token)
+        principal = CachedPrincipal(user, site.pk, validated_token, expires_at)
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.max_entries:
+                self._evict()
+            self._entries[key] = principal
+            self._keys_by_user[principal.user_pk].add(key)
+
+    def invalidate_user(self, user_pk) -> None:
+        """ Drops every entry resolved for the given user primary key.
+        """
+        with self._lock:
+            for key in self._keys_by_user.pop(user_pk, ()):
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _discard(self, key: str) -> None:
+        principal = self._entries.pop(key, None)
+        if principal is None:
+            return
+        user_keys = self._keys_by_user.get(principal.user_pk)
+        if user_keys is not None:
+            user_keys.discard(key)
+            if not user_keys:
+                del self._keys_by_user[principal.user_pk]
+
+    def _evict(self) -> None:
+        """ Make room for a new entry; expired entries go first, then the oldest one inserted.
+        """
+        now = time.time()
+        for key in [k for k, p in self._entries.items() if p.expires_at <= now]:
+            self._discard(key)
+        if len(self._entries) >= self.max_entries:
+            self._discard(next(iter(self._entries)))
+
+
+principal_cache = PrincipalCache(
+    max_entries=getattr(settings, 'JWT_PRINCIPAL_CACHE_MAX_ENTRIES', 10000)
+)
+
+
+_signals_connected = False
+
+
+def principal_cache_enabled() -> bool:
+    if not getattr(settings, 'JWT_PRINCIPAL_CACHE', False):
+        return False
+    if not _signals_connected:
+        raise ImproperlyConfigured("JWT_PRINCIPAL_CACHE needs 'gramedia.django' in INSTALLED_APPS.")
+    return True
+
+
+def _invalidate_user_principals(sender, instance, **kwargs):
+    principal_cache.invalidate_user(instance.pk)
+
+
+def _user_relations_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """ Groups or permissions were added to or removed from users.  From the user's side (`user.groups.add()`)
+    `instance` is the user, from the other side (`group.user_set.add()`) `pk_set` holds the users.
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear', 'pre_clear'):
+        return
+    if not reverse:
+        principal_cache.invalidate_user(instance.pk)
+    elif pk_set is not None:
+        for user_pk in pk_set:
+            principal_cache.invalidate_user(user_pk)
+    elif action == 'pre_clear':
+        # the cleared users aren't given, so drop everything.
+        principal_cache.clear()
+
+
+def connect_signals() -> None:
+    """ Connects the invalidation signals, called by `GramediaDjangoConfig.ready()`.
+    """
+    global _signals_connected
+    user_model = get_user_model()
+
+    post_save.connect(
+        _invalidate_user_principals, sender=user_model, dispatch_uid='gramedia_principal_cache_user_saved')
+    post_delete.connect(
+        _invalidate_user_principals, sender=user_model, dispatch_uid='gramedia_principal_cache_user_deleted')
+    for name in ('groups', 'user_permissions', ):
+        try:
+            through = user_model._meta.get_field(name).remote_field.through
+        except Exception:
+            # custom user models without PermissionsMixin.
+            continue
+        m2m_changed.connect(
+            _user_relations_changed, sender=through, dispatch_uid=f'gramedia_principal_cache_user_{name}_changed')
+    _signals_connected = True
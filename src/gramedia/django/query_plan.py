@@ -0,0 +1,292 @@
+"""
+Query Planning
+==============
+
+Works out the `select_related`, `prefetch_related` and `only()` a queryset needs, from the fields a serializer
+declares, so serializing a list doesn't run one query per row for every relation it follows (e.g. the
+related slugs of `HyperlinkedSlugField`, or `value.name` in `EntityHrefField`).
+
+.. code-block:: python
+
+    from gramedia.django.query_plan import QueryPlanMixin, plan_serializer
+
+    plan_serializer(BookSerializer).apply(Book.objects.all())
+
+    class BookViewSet(QueryPlanMixin, viewsets.ModelViewSet):
+        queryset = Book.objects.all()
+        serializer_class = BookSerializer
+
+With `settings.QUERY_PLAN_DEBUG` on, `QueryPlanMixin` also logs every query that ran more than once while
+handling a request, which is usually a relation that still isn't planned for.
+
+Relations are only followed through model fields: sources that are properties or methods (and
+`SerializerMethodField`s) are assumed to need the whole row, so `only()` isn't used for that model.
+"""
+import logging
+import re
+import weakref
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.relations import HyperlinkedRelatedField, ManyRelatedField, RelatedField, SlugRelatedField
+
+logger = logging.getLogger('DRFCommon')
+
+
+class QueryPlan:
+    """ What to load for one model: its `fields` (None for all of them), the relations to join
+    (`select_related`), and the ones to prefetch, each with their own plan.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.fields = set()
+        self.joins = {}
+        self.prefetches = {}
+
+    def __repr__(self):
+        select_related, prefetch_related, only = self.lookups()
+        return (f'<QueryPlan {self.model._meta.label} select_related={select_related} '
+                f'prefetch_related={[prefetch.prefetch_through for prefetch in prefetch_related]} only={only}>')
+
+    def add_field(self, name: str) -> None:
+        if self.fields is not None:
+            self.fields.add(name)
+
+    def load_all_fields(self) -> None:
+        self.fields = None
+
+    def join(self, name: str, model) -> 'QueryPlan':
+        self.add_field(name)
+        return self.joins.setdefault(name, QueryPlan(model))
+
+    def prefetch(self, name: str, model) -> 'QueryPlan':
+        return self.prefetches.setdefault(name, QueryPlan(model))
+
+    def lookups(self, prefix: str = ''):
+        """ Returns the `select_related` paths, `Prefetch` objects, and `only()` fields (or None, if all fields
+        are needed) for this plan.
+        """
+        select_related, prefetch_related = [], []
+        only = [f'{prefix}{name}' for name in sorted(self.fields)] if self.fields is not None else None
+
+        for name, plan in sorted(self.joins.items()):
+            select_related.append(f'{prefix}{name}')
+            joined_select, joined_prefetch, joined_only = plan.lookups(f'{prefix}{name}__')
+            select_related.extend(joined_select)
+            prefetch_related.extend(joined_prefetch)
+            if only is not None and joined_only is not None:
+                only.extend(joined_only)
+            elif only is not None:
+                # all of the joined model's fields are needed, while this one's are restricted: only() can't
+                # express that, so load everything.
+                only = None
+
+        for name, plan in sorted(self.prefetches.items()):
+            prefetch_related.append(Prefetch(f'{prefix}{name}', queryset=plan.apply(plan.model._default_manager.all())))
+
+        return select_related, prefetch_related, only
+
+    def apply(self, queryset):
+        select_related, prefetch_related, only = self.lookups()
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        if only:
+            queryset = queryset.only(*only)
+        return queryset
+
+
+def _serializer_fields(serializer):
+    if isinstance(serializer, type):
+        serializer = serializer(context={})
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    return serializer.fields.values()
+
+
+def _related_lookup_fields(field) -> list:
+    """ Fields of the related model that a relational field reads, besides its primary key.
+    """
+    if isinstance(field, HyperlinkedRelatedField):
+        fields = [] if field.lookup_field == 'pk' else [field.lookup_field]
+        # EntityHrefField, and any other field nesting a name next to the href.
+        if type(field).to_representation is not HyperlinkedRelatedField.to_representation:
+            fields.append('name')
+        return fields
+    if isinstance(field, SlugRelatedField):
+        return [field.slug_field]
+    return []
+
+
+def _add_lookup_fields(plan: QueryPlan, names: list) -> None:
+    """ Adds the fields a relational field reads to the related model's plan.  Names that aren't concrete
+    fields of that model (e.g. a `name` property, or a lookup through another relation) can't be given to
+    `only()`, so the whole row is loaded instead.
+    """
+    for name in names:
+        try:
+            model_field = plan.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            model_field = None
+        if model_field is None or not model_field.concrete or model_field.many_to_many:
+            plan.load_all_fields()
+            return
+        plan.add_field(model_field.name)
+
+
+def _plan_field(plan: QueryPlan, field) -> None:
+    if field.write_only:
+        return
+
+    if field.source == '*':
+        if isinstance(field, serializers.BaseSerializer):
+            _plan_serializer(plan, field)
+        elif isinstance(field, HyperlinkedRelatedField):
+            _add_lookup_fields(plan, _related_lookup_fields(field))
+        else:
+            plan.load_all_fields()
+        return
+
+    relational = isinstance(field, (RelatedField, ManyRelatedField, serializers.BaseSerializer))
+    child = field.child_relation if isinstance(field, ManyRelatedField) else field
+    attrs = field.source_attrs
+
+    for index, attr in enumerate(attrs):
+        last = index == len(attrs) - 1
+        try:
+            model_field = plan.model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            # a property or method, which may use any field.
+            plan.load_all_fields()
+            return
+
+        if not model_field.is_relation:
+            if last:
+                plan.add_field(model_field.attname)
+            else:
+                plan.load_all_fields()
+            return
+
+        related_model = model_field.related_model
+        if related_model is None:
+            # generic foreign keys can't be joined.
+            plan.load_all_fields()
+            return
+        if last and relational and not isinstance(child, serializers.BaseSerializer):
+            if (model_field.many_to_one or (model_field.one_to_one and model_field.concrete)) \
+                    and getattr(child, 'use_pk_only_optimization', lambda: False)():
+                # only the foreign key's value is needed.
+                plan.add_field(model_field.name)
+                return
+
+        if model_field.many_to_many or model_field.one_to_many:
+            plan = plan.prefetch(attr, related_model)
+            if model_field.one_to_many:
+                # the related rows are matched back to this one through their foreign key.
+                plan.add_field(model_field.field.name)
+        else:
+            plan = plan.join(attr, related_model)
+
+    if isinstance(child, serializers.BaseSerializer):
+        _plan_serializer(plan, child)
+    elif relational:
+        _add_lookup_fields(plan, _related_lookup_fields(child))
+    else:
+        # the field reads the related object itself, e.g. through its __str__.
+        plan.load_all_fields()
+
+
+def _plan_serializer(plan: QueryPlan, serializer) -> None:
+    for field in _serializer_fields(serializer):
+        if isinstance(field, serializers.SerializerMethodField):
+            plan.load_all_fields()
+        else:
+            _plan_field(plan, field)
+
+
+def plan_serializer(serializer, model=None) -> QueryPlan:
+    """ Works out what a (model) serializer class, or instance, needs loaded.
+
+    :param serializer: The serializer.
+    :param model: The model being serialized, defaults to the serializer's `Meta.model`.
+    """
+    if model is None:
+        serializer_class = serializer if isinstance(serializer, type) else type(serializer)
+        model = serializer_class.Meta.model
+    plan = QueryPlan(model)
+    _plan_serializer(plan, serializer)
+    return plan
+
+
+_plans = weakref.WeakKeyDictionary()
+
+
+def get_query_plan(serializer_class, model=None) -> QueryPlan:
+    """ `plan_serializer`, cached per serializer class.
+    """
+    plans = _plans.setdefault(serializer_class, {})
+    if model not in plans:
+        plans[model] = plan_serializer(serializer_class, model)
+    return plans[model]
+
+
+_literals = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+
+
+@contextmanager
+def log_repeated_queries(label: str, threshold: int = 2, using: str = None):
+    """ Logs a warning for every query (ignoring its parameters) run at least `threshold` times inside the block,
+    on the `using` database, or on any of them (e.g. reads sent to a replica by a router) by default.
+    """
+    counts = Counter()
+
+    def count_query(execute, sql, params, many, context):
+        counts[_literals.sub('?', sql)] += 1
+        return execute(sql, params, many, context)
+
+    with ExitStack() as stack:
+        for connection in ([connections[using]] if using else connections.all()):
+            stack.enter_context(connection.execute_wrapper(count_query))
+        yield counts
+
+    for sql, count in counts.most_common():
+        if count < threshold:
+            break
+        logger.warning(f'{label}: query ran {count} times, it may be missing from select/prefetch_related: {sql}')
+
+
+class QueryPlanMixin:
+    """ Applies the query plan of the view's serializer (see `plan_serializer`) to `get_queryset()`, for safe
+    (read-only) requests.  Other requests get the queryset unchanged: they look up the object to change,
+    whose deferred fields would each cost a query when it is saved or validated.
+
+    Set `query_plan_only = False` on the view to keep loading all fields, i.e. only add `select_related`
+    and `prefetch_related`.
+    """
+    query_plan_only = True
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        request = getattr(self, 'request', None)
+        if request is None or request.method not in SAFE_METHODS:
+            return queryset
+
+        plan = get_query_plan(self.get_serializer_class(), queryset.model)
+        if not self.query_plan_only:
+            select_related, prefetch_related, _ = plan.lookups()
+            return queryset.select_related(*select_related).prefetch_related(*prefetch_related)
+        return plan.apply(queryset)
+
+    def dispatch(self, request, *args, **kwargs):
+        if not getattr(settings, 'QUERY_PLAN_DEBUG', False):
+            return super().dispatch(request, *args, **kwargs)
+        with log_repeated_queries(f'{type(self).__name__} {request.method} {request.path}'):
+            return super().dispatch(request, *args, **kwargs)
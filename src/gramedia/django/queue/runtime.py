@@ -0,0 +1,194 @@
+"""
+Consumer Runtime
+================
+
+Runs message handlers (e.g. `process_security_auth_group_message`) on a pool of worker threads, instead of one
+message at a time.
+
+.. code-block:: python
+
+    from kombu import Connection, Exchange, Queue
+    from gramedia.django.queue.runtime import ConsumerRuntime
+    from gramedia.django.queue.security.access_group_user import process_security_auth_group_message
+
+    exchange = Exchange('security', type='topic')
+    runtime = ConsumerRuntime(
+        Connection(settings.BROKER_URL),
+        queues=[Queue('my-service-security', exchange, routing_key='access_group_user.*')],
+        handlers={'access_group_user.*': process_security_auth_group_message},
+        lanes=8,
+        prefetch_count=32,
+    )
+    runtime.run()
+
+Messages are routed by their routing key (AMQP topic patterns, with `*` and `#`, are allowed) to a handler,
+which is called with the decoded message body.
+
+Each message goes to one of `lanes` single-threaded workers, chosen by hashing its `identity`: messages about
+the same entity are handled one after the other, in the order they were received, while messages about other
+entities are handled in parallel.  Messages without an identity are spread over the lanes.
+
+Messages are acknowledged once their handler has finished (or rejected, if it raised), always from the
+consumer's own thread, as channels aren't thread-safe.  `prefetch_count` bounds how many unacknowledged
+messages the broker hands out, and so how many are queued in the lanes.  Django's database connections are
+closed when they are unusable or too old, before and after each handler, like django does for requests.
+"""
+import logging
+import queue
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+from typing import Callable, Dict, Sequence
+
+from django.db import close_old_connections
+from kombu import Connection, Queue
+from kombu.mixins import ConsumerMixin
+
+_logger = logging.getLogger('LOG')
+
+# number of routing keys whose matching topic pattern is remembered, per runtime.
+ROUTE_CACHE_SIZE = 1024
+
+
+def _topic_matches(pattern: list, words: list) -> bool:
+    """ AMQP topic matching: `*` matches exactly one word, `#` zero or more words.
+    """
+    if not pattern:
+        return not words
+    head, rest = pattern[0], pattern[1:]
+    if head == '#':
+        return any(_topic_matches(rest, words[index:]) for index in range(len(words) + 1))
+    return bool(words) and head in ('*', words[0]) and _topic_matches(rest, words[1:])
+
+
+class ConsumerRuntime(ConsumerMixin):
+    """ Consumes `queues`, dispatching each message to the handler for its routing key on a worker lane.
+
+    :param connection: Broker connection (any kombu transport, including `memory://` in tests).
+    :param queues: Queues to consume from.
+    :param handlers: Routing key (or topic pattern) -> callable taking the decoded message body.
+    :param lanes: Number of worker threads.  Messages with the same identity always use the same lane.
+    :param prefetch_count: Maximum number of unacknowledged messages, defaults to 4 per lane.
+    :param identity_key: Key of the message body identifying the entity the message is about.
+    :param requeue_on_error: Requeue messages whose handler raised, instead of rejecting them.
+    :param accept: Content types accepted.
+    :param ack_interval: Maximum delay, in seconds, between a handler finishing and its message being acknowledged.
+    """
+
+    def __init__(self,
+                 connection: Connection,
+                 queues: Sequence[Queue],
+                 handlers: Dict[str, Callable[[dict], None]],
+                 lanes: int = 4,
+                 prefetch_count: int = None,
+                 identity_key: str = 'identity',
+                 requeue_on_error: bool = False,
+                 accept: Sequence[str] = ('msgpack', 'json', ),
+                 ack_interval: float = 0.1):
+        self.connection = connection
+        self.queues = list(queues)
+        self.handlers = dict(handlers)
+        self._routes = {}
+        self._patterns = [(key.split('.'), handler) for key, handler in handlers.items()
+                          if '*' in key or '#' in key]
+        self.lanes = lanes
+        self.prefetch_count = prefetch_count if prefetch_count is not None else lanes * 4
+        self.identity_key = identity_key
+        self.requeue_on_error = requeue_on_error
+        self.accept = list(accept)
+        self.ack_interval = ack_interval
+
+        self._executors = [
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'consumer-lane-{lane}') for lane in range(lanes)
+        ]
+        self._round_robin = count()
+        self._finished = queue.Queue()
+        self._in_flight = 0
+
+    def get_consumers(self, Consumer, channel):
+        return [Consumer(queues=self.queues, callbacks=[self.on_message], accept=self.accept,
+                         prefetch_count=self.prefetch_count)]
+
+    def get_handler(self, routing_key: str):
+        """ Returns the handler for a routing key, or None.  Topic pattern matches are remembered for up to
+        `ROUTE_CACHE_SIZE` routing keys; misses aren't, as they can come with any routing key.
+        """
+        handler = self.handlers.get(routing_key) or self._routes.get(routing_key)
+        if handler is None and self._patterns:
+            words = routing_key.split('.')
+            handler = next((handler for pattern, handler in self._patterns if _topic_matches(pattern, words)), None)
+            if handler is not None and len(self._routes) < ROUTE_CACHE_SIZE:
+                self._routes[routing_key] = handler
+        return handler
+
+    def get_lane(self, body) -> int:
+        identity = body.get(self.identity_key) if isinstance(body, dict) else None
+        if identity is None:
+            return next(self._round_robin) % self.lanes
+        return zlib.crc32(str(identity).encode()) % self.lanes
+
+    def on_message(self, body, message) -> None:
+        routing_key = message.delivery_info.get('routing_key', '')
+        handler = self.get_handler(routing_key)
+        if handler is None:
+            _logger.error(f'No handler for routing key {routing_key}, rejecting the message.')
+            message.reject(requeue=False)
+            return
+
+        self._in_flight += 1
+        future = self._executors[self.get_lane(body)].submit(self.handle, handler, body)
+        future.add_done_callback(lambda done: self._finished.put((message, done)))
+
+    def handle(self, handler: Callable[[dict], None], body) -> None:
+        """ Runs a handler on a worker thread.
+        """
+        close_old_connections()
+        try:
+            handler(body)
+        finally:
+            close_old_connections()
+
+    def acknowledge_finished(self, block: bool = False) -> None:
+        """ Acknowledges (or rejects) the messages whose handler has finished.  Runs on the consumer's thread.
+        """
+        while self._in_flight:
+            try:
+                message, future = self._finished.get(block=block)
+            except queue.Empty:
+                return
+            self._in_flight -= 1
+
+            exc = future.exception()
+            try:
+                if exc is None:
+                    message.ack()
+                else:
+                    _logger.error(f'Handling message {message.delivery_tag} failed: {exc!r}',
+                                  exc_info=(type(exc), exc, exc.__traceback__))
+                    message.reject(requeue=self.requeue_on_error)
+            except self.connection.connection_errors + self.connection.channel_errors:
+                # the broker redelivers messages from a lost channel.
+                _logger.warning(f'Could not acknowledge message {message.delivery_tag}, the channel was lost.')
+
+    def on_iteration(self) -> None:
+        self.acknowledge_finished()
+
+    def consume(self, *args, **kwargs):
+        kwargs.setdefault('safety_interval', self.ack_interval)
+        return super().consume(*args, **kwargs)
+
+    def on_consume_end(self, connection, channel) -> None:
+        # finish the messages already handed to the lanes, while their channel is still open.
+        self.acknowledge_finished(block=True)
+
+    def stop(self) -> None:
+        """ Stops consuming, after the messages already received have been handled.  Safe to call from any
+        thread (e.g. a signal handler).
+        """
+        self.should_stop = True
+
+    def shutdown(self) -> None:
+        """ Stops the worker threads, once `run()` has returned.
+        """
+        for executor in self._executors:
+            executor.shutdown(wait=True)
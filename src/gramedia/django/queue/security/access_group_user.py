@@ -4,9 +4,9 @@ from urllib.parse import urlparse
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
-from django.contrib.sites.models import Site
 
-from gramedia.django.signalling import EventType
+from gramedia.django.signalling import EventType, get_payload_logger
+from gramedia.django.sites import site_registry
 
 _logger = logging.getLogger('LOG')
 _logger_audit = logging.getLogger('AUDIT')
@@ -19,12 +19,13 @@ __ALL__ = ['process_security_auth_group_message', ]
 
 
 def process_security_auth_group_message(message):
-    _logger.info(f'[*] {_LOGGER_KEY} Consuming Security Auth Group - User queue')
     event_type = message.get('event_type', '')
+    entity_type = message.get('entity_type', '')
     entity = message.get('data')
+    _logger_audit.info('%s Consuming %s:%s %s', _LOGGER_KEY, entity_type, event_type, message.get('identity'))
 
     identity_parts = urlparse(message.get('identity'))
-    site = Site.objects.get(domain=message.get('entity_site') or identity_parts.hostname)
+    site = site_registry.get_by_domain(message.get('entity_site') or identity_parts.hostname)
     customer_identity_parts = urlparse(message.get('customer'))
     customer_identity = os.path.basename(os.path.normpath(identity_parts.path))
     try:
@@ -40,7 +41,8 @@ def process_security_auth_group_message(message):
         _logger.exception(f'{_LOGGER_KEY} not find user {entity.get("customer")}')
         raise
 
-    _logger.info(f"{_LOGGER_KEY} Receive business {message}")
+    get_payload_logger().info(entity_type, '%s Receive business %s:%s', _LOGGER_KEY, entity_type, event_type,
+                              payload=entity)
     if user and access_group:
         if event_type == EventType.assigned.value:
             access_group.user_set.add(user)
@@ -0,0 +1,35 @@
+"""
+Request Context
+===============
+
+Accessors for values derived from a request, each computed at most once per request and stored on it:
+
+.. code-block:: python
+
+    from gramedia.django.request_context import get_request_language, get_request_site, get_request_user_agent
+
+    get_request_user_agent(request).device_name
+    get_request_language(request)
+    get_request_site(request)
+
+They work with both django `HttpRequest` and DRF `Request` objects (the value is stored on django's request,
+so it is shared between the two).  With `gramedia.django.middleware.RequestContextMiddleware` installed, the
+same values are also available, lazily, as `request.user_agent` and `request.language`.
+"""
+from django.utils.translation import get_language_from_request
+
+from gramedia.django.sites import get_request_site
+from gramedia.django.utils.helpers import get_user_agent as get_request_user_agent
+
+__all__ = ['get_request_language', 'get_request_site', 'get_request_user_agent']
+
+
+def get_request_language(request) -> str:
+    """ Returns the language of a request (see `django.utils.translation.get_language_from_request`), working
+    it out at most once per request.
+    """
+    request = getattr(request, '_request', request)
+    language = getattr(request, '_gramedia_language', None)
+    if language is None:
+        language = request._gramedia_language = get_language_from_request(request)
+    return language
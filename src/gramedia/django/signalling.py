@@ -1,6 +1,7 @@
 import logging
 import time
 from enum import Enum
+from functools import lru_cache
 from typing import Type
 
 import msgpack
@@ -11,12 +12,28 @@ from django.utils.timezone import now
 from kombu import Exchange, producers, Connection, Consumer, Producer, uuid, Queue
 from rest_framework.serializers import BaseSerializer
 
+from gramedia.common.log import PayloadLogger
 from gramedia.django.amqp_connection import get_publish_connection_and_channel
 
 _logger = logging.getLogger('LOG')
 _logger_audit = logging.getLogger('AUDIT')
 
 
+@lru_cache(maxsize=None)
+def get_payload_logger(logger: logging.Logger = _logger) -> PayloadLogger:
+    """ Logger for messages with payloads, configured by `settings.LOG_PAYLOAD_MAX_LENGTH` (default 1024
+    characters), `settings.LOG_PAYLOAD_SAMPLE_RATES` (entity type -> fraction of lines logged) and
+    `settings.LOG_PAYLOAD_DEFAULT_SAMPLE_RATE` (default 1, i.e. everything).  One is built per logger, the settings
+    are read once; call `get_payload_logger.cache_clear()` after changing them.
+    """
+    return PayloadLogger(
+        logger,
+        max_length=getattr(settings, 'LOG_PAYLOAD_MAX_LENGTH', 1024),
+        sample_rates=getattr(settings, 'LOG_PAYLOAD_SAMPLE_RATES', None),
+        default_rate=getattr(settings, 'LOG_PAYLOAD_DEFAULT_SAMPLE_RATE', 1.0),
+    )
+
+
 class EventType(Enum):
     created = 'created'
     changed = 'changed'
@@ -138,18 +155,22 @@ class BasicPublisher:
             else:
                 data = {}
 
+        identity = message_identity or self.get_identity(data)
         body = self.construct_message(
             data=data,
             entity_type=entity_type,
             event_type=event_type,
-            identity=message_identity,
+            identity=identity,
             user=user
         )
 
         with producers[self._connection].acquire(block=True, timeout=60) as producer:
             the_exchange = Exchange(name=self.exchange_name, type='topic', durable=True, channel=self._channel)
             try:
-                _logger.info(f'QUEUE Publish {self.site.domain}-{entity_type}:{event_type} - {data} ')
+                _logger_audit.info('QUEUE Publish %s-%s:%s %s', self.site.domain, entity_type, event_type.value,
+                                   identity)
+                get_payload_logger().info(entity_type, 'QUEUE Publish %s-%s:%s', self.site.domain, entity_type,
+                                          event_type.value, payload=data)
                 producer.publish(
                     body=body,
                     exchange=the_exchange,
@@ -184,8 +205,10 @@ class BasicRpcClient:
     def call(self, message: dict, event_type: str, entity_type: str, site: Site) -> any:
         self.response = None
         self.correlation_id = uuid()
+        payload_logger = get_payload_logger()
         with Producer(self.connection) as producer:
-            _logger.info(f'CELERY RPC call {site.domain} with {event_type} - {entity_type} {message} reply to {self.correlation_id}')
+            payload_logger.info(entity_type, 'CELERY RPC call %s with %s - %s reply to %s', site.domain, event_type,
+                                entity_type, self.correlation_id, payload=message)
             producer.publish(
                 {
                     "event_type": event_type,
@@ -204,13 +227,14 @@ class BasicRpcClient:
         with Consumer(self.connection,
                       on_message=self.on_response,
                       queues=[self.callback_queue], no_ack=True):
-            _logger.info(f'CELERY RPC call consume {site.domain} with {event_type} - {entity_type} {message} reply to {self.correlation_id}')
+            _logger.debug('CELERY RPC call consume %s reply to %s', site.domain, self.correlation_id)
             t_current = time.time()
             while self.response is None:
                 self.connection.drain_events(timeout=1)
                 # time.sleep(0.25)  # sleep for 250 milliseconds
                 # if time.time() >= t_current + 60000:
                 #     break
-        _logger.info(f'CELERY RPC call consume {site.domain} with response {self.response}')
+        payload_logger.info(entity_type, 'CELERY RPC call consume %s response to %s', site.domain,
+                            self.correlation_id, payload=self.response)
 
         return self.response
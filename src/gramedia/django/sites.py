@@ -0,0 +1,145 @@
+"""
+Site Registry
+=============
+
+Multi-tenant services resolve the current `Site` on nearly every request (and for every consumed
+message).  `SiteRegistry` keeps every `Site` row in memory, indexed by host and by id, so that
+resolution never needs to touch the database on the hot path.
+
+The registry is loaded once (by `gramedia.django.middleware.CurrentSiteMiddleware` at startup, or lazily
+on first use) and kept current by the `Site` save/delete signals, which are connected when 'gramedia.django'
+is in `INSTALLED_APPS`.  Sites created by *other* processes are picked up by reloading the registry when an
+unknown host is requested, at most once every `SITE_REGISTRY_RELOAD_INTERVAL` seconds (default 60).
+
+`django.contrib.sites` must be installed to use this module.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.db.models.signals import post_save, post_delete
+from django.http.request import split_domain_port
+
+
+class SiteRegistry:
+    """ In-process host -> Site index.
+    """
+
+    def __init__(self):
+        self._by_host = {}
+        self._by_id = {}
+        self._loaded = False
+        self._last_load = 0.0
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        """ (Re)loads every Site row from the database.
+        """
+        sites = list(Site.objects.all())
+        with self._lock:
+            self._by_host = {site.domain.lower(): site for site in sites}
+            self._by_id = {site.pk: site for site in sites}
+            self._loaded = True
+            self._last_load = time.monotonic()
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self.load()
+
+    def _reload_on_miss(self) -> bool:
+        interval = getattr(settings, 'SITE_REGISTRY_RELOAD_INTERVAL', 60)
+        if time.monotonic() - self._last_load < interval:
+            return False
+        self.load()
+        return True
+
+    def get_by_id(self, site_id) -> Site:
+        self._ensure_loaded()
+        site = self._by_id.get(site_id)
+        if site is None and self._reload_on_miss():
+            site = self._by_id.get(site_id)
+        if site is None:
+            raise Site.DoesNotExist(f'No site with id {site_id!r}')
+        return site
+
+    def get_by_host(self, host: str) -> Site:
+        """ Resolves a host (optionally including a port) the same way `SiteManager.get_current` does:
+        an exact match first, then the host without its port.
+        """
+        self._ensure_loaded()
+        site = self._match_host(host)
+        if site is None and self._reload_on_miss():
+            site = self._match_host(host)
+        if site is None:
+            raise Site.DoesNotExist(f'No site matches host {host!r}')
+        return site
+
+    get_by_domain = get_by_host
+
+    def _match_host(self, host: str):
+        host = host.lower()
+        site = self._by_host.get(host)
+        if site is None:
+            domain, port = split_domain_port(host)
+            site = self._by_host.get(domain)
+        return site
+
+    def get_current(self, request=None) -> Site:
+        """ Drop-in replacement for `Site.objects.get_current(request)`.
+        """
+        site_id = getattr(settings, 'SITE_ID', None)
+        if site_id:
+            return self.get_by_id(site_id)
+        if request is not None:
+            return self.get_by_host(request.get_host())
+        raise Site.DoesNotExist(
+            'You\'re using the Django "sites framework" without having set the SITE_ID setting. '
+            'Create a site in your database and set the SITE_ID setting or pass a request to '
+            'SiteRegistry.get_current() to fix this error.'
+        )
+
+    def site_saved(self, site: Site) -> None:
+        with self._lock:
+            previous = self._by_id.get(site.pk)
+            if previous is not None:
+                self._by_host.pop(previous.domain.lower(), None)
+            self._by_id[site.pk] = site
+            self._by_host[site.domain.lower()] = site
+
+    def site_deleted(self, site: Site) -> None:
+        with self._lock:
+            previous = self._by_id.pop(site.pk, site)
+            self._by_host.pop(previous.domain.lower(), None)
+
+
+site_registry = SiteRegistry()
+
+
+def get_request_site(request):
+    """ Returns the current site for a request, resolving it at most once per request.
+
+    Works with both django `HttpRequest` and DRF `Request` objects.
+    """
+    site = getattr(request, 'site', None)
+    if site is not None:
+        return site
+
+    site = site_registry.get_current(request)
+    setattr(getattr(request, '_request', request), 'site', site)
+    return site
+
+
+def _site_saved(sender, instance, **kwargs):
+    site_registry.site_saved(instance)
+
+
+def _site_deleted(sender, instance, **kwargs):
+    site_registry.site_deleted(instance)
+
+
+def connect_signals() -> None:
+    """ Connects the signals keeping `site_registry` current, called by `GramediaDjangoConfig.ready()`.
+    """
+    post_save.connect(_site_saved, sender=Site, dispatch_uid='gramedia_site_registry_saved')
+    post_delete.connect(_site_deleted, sender=Site, dispatch_uid='gramedia_site_registry_deleted')
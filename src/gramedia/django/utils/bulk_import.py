@@ -0,0 +1,203 @@
+"""
+Bulk Import
+===========
+
+Loads large numbers of rows for `BaseModel`-style models (timestamps, `modified_by`, unique slug) without
+paying for a `save()` per row.
+
+.. code-block:: python
+
+    from gramedia.django.utils.bulk_import import BulkImporter
+
+    importer = BulkImporter(Book, batch_size=2000, modified_by='catalogue-import', on_conflict='update')
+    result = importer.run(row for row in csv.DictReader(fp))
+    print(result.created, result.updated, result.skipped)
+
+Timestamps, `modified_by` and unique slugs are filled in memory, then each batch is written with a single
+`bulk_create` (and `bulk_update` for rows whose slug already exists, when `on_conflict='update'`).
+"""
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import islice
+from typing import Iterable, Type
+
+from django.db import models, router, transaction
+from django.utils import timezone
+
+from gramedia.common.cli import ProgressReporter
+from gramedia.django.utils.models import assign_unique_slugs
+
+ON_CONFLICT_CHOICES = ('skip', 'update', 'error', )
+
+_bulk_state = threading.local()
+
+
+class SlugConflict(Exception):
+    """ Raised when an imported row has a slug that already exists, and `on_conflict='error'`.
+    """
+    pass
+
+
+class BulkImportResult:
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.skipped = 0
+
+    @property
+    def processed(self) -> int:
+        return self.created + self.updated + self.skipped
+
+    def __repr__(self) -> str:
+        return f'<BulkImportResult created={self.created} updated={self.updated} skipped={self.skipped}>'
+
+
+def _preassigned_pre_save(field):
+    """ Wraps a slug field's `pre_save` so that, while a bulk import in the current thread has the field
+    marked, the slug already assigned in memory is used as-is (`AutoSlugField` would otherwise run its
+    own uniqueness query for every row).  Other threads are not affected.
+    """
+    if getattr(field, '_gramedia_bulk_wrapped', False):
+        return
+    original = field.pre_save
+
+    def pre_save(model_instance, add):
+        if field in getattr(_bulk_state, 'fields', ()):
+            return getattr(model_instance, field.attname)
+        return original(model_instance, add)
+
+    field.pre_save = pre_save
+    field._gramedia_bulk_wrapped = True
+
+
+@contextmanager
+def _use_preassigned_slugs(field):
+    _preassigned_pre_save(field)
+    fields = getattr(_bulk_state, 'fields', set())
+    _bulk_state.fields = fields | {field}
+    try:
+        yield
+    finally:
+        _bulk_state.fields = fields
+
+
+class BulkImporter:
+    """ Imports an iterable of dicts (field name -> value) into `model_class` in batches.
+
+    :param model_class: The model to import into.
+    :param batch_size: Rows per `bulk_create`/`bulk_update` (and per transaction).
+    :param modified_by: Stored in `modified_by`, for rows that don't set it themselves.
+    :param on_conflict: What to do with rows whose slug already exists: 'skip' them, 'update' the existing
+        rows with their values, or raise `SlugConflict` ('error').  Rows without a slug always get a new,
+        unique one.
+    :param update_fields: Fields written when updating existing rows, defaults to the fields in the row.
+    :param slug_field: Name of the model's slug field.
+    :param show_progress: Report progress with a `ProgressReporter`.
+    """
+
+    def __init__(self,
+                 model_class: Type[models.Model],
+                 batch_size: int = 1000,
+                 modified_by: str = '',
+                 on_conflict: str = 'skip',
+                 update_fields: Iterable[str] = None,
+                 slug_field: str = 'slug',
+                 show_progress: bool = False,
+                 using: str = None):
+        if on_conflict not in ON_CONFLICT_CHOICES:
+            raise ValueError(f'on_conflict must be one of {ON_CONFLICT_CHOICES}')
+
+        self.model_class = model_class
+        self.batch_size = batch_size
+        self.modified_by = modified_by
+        self.on_conflict = on_conflict
+        self.update_fields = list(update_fields) if update_fields is not None else None
+        self.slug_field = model_class._meta.get_field(slug_field)
+        self.show_progress = show_progress
+        self.using = using or router.db_for_write(model_class)
+
+        field_names = {field.name for field in model_class._meta.concrete_fields}
+        self._timestamp_fields = [name for name in ('created', 'modified') if name in field_names]
+        self._has_modified_by = 'modified_by' in field_names
+
+    def run(self, rows: Iterable[dict], total: int = None) -> BulkImportResult:
+        if total is None and hasattr(rows, '__len__'):
+            total = len(rows)
+
+        result = BulkImportResult()
+        rows = iter(rows)
+        progress = ProgressReporter(total=total, label=self.model_class._meta.label) if self.show_progress else None
+
+        try:
+            with _use_preassigned_slugs(self.slug_field):
+                while True:
+                    batch = list(islice(rows, self.batch_size))
+                    if not batch:
+                        break
+                    self.import_batch(batch, result)
+                    if progress:
+                        progress.update(len(batch))
+        finally:
+            if progress:
+                progress.close()
+        return result
+
+    def prepare(self, row: dict, now: datetime = None) -> models.Model:
+        """ Builds an (unsaved) instance from a row, filling in timestamps and `modified_by`.
+        """
+        instance = self.model_class(**row)
+        now = now or timezone.now()
+        for name in self._timestamp_fields:
+            if name == 'modified' or not row.get(name):
+                setattr(instance, name, now)
+        if self._has_modified_by and 'modified_by' not in row:
+            instance.modified_by = self.modified_by
+        return instance
+
+    def import_batch(self, batch: list, result: BulkImportResult) -> None:
+        slug_attname = self.slug_field.attname
+        now = timezone.now()
+        instances = [(row, self.prepare(row, now)) for row in batch]
+
+        explicit_slugs = [getattr(instance, slug_attname) for row, instance in instances
+                          if getattr(instance, slug_attname)]
+        existing = dict(
+            self.model_class._base_manager.using(self.using)
+            .filter(**{f'{slug_attname}__in': explicit_slugs})
+            .values_list(slug_attname, 'pk')
+        ) if explicit_slugs else {}
+
+        to_create, to_update, update_fields, seen = [], [], set(), set()
+        for row, instance in instances:
+            slug = getattr(instance, slug_attname)
+            if slug and (slug in existing or slug in seen):
+                if self.on_conflict == 'error':
+                    raise SlugConflict(f'{self.model_class._meta.label} with slug {slug!r} already exists.')
+                if self.on_conflict == 'update' and slug in existing and slug not in seen:
+                    instance.pk = existing[slug]
+                    to_update.append(instance)
+                    update_fields.update(self.update_fields or row.keys())
+                else:
+                    result.skipped += 1
+            else:
+                to_create.append(instance)
+            if slug:
+                seen.add(slug)
+
+        assign_unique_slugs(to_create, slug_field=self.slug_field.name)
+
+        with transaction.atomic(using=self.using):
+            if to_create:
+                self.model_class._base_manager.using(self.using).bulk_create(to_create, batch_size=self.batch_size)
+            if to_update:
+                if 'modified' in self._timestamp_fields:
+                    update_fields.add('modified')
+                if self._has_modified_by:
+                    update_fields.add('modified_by')
+                update_fields -= {'created', 'pk', slug_attname, self.model_class._meta.pk.name}
+                self.model_class._base_manager.using(self.using).bulk_update(
+                    to_update, fields=sorted(update_fields), batch_size=self.batch_size)
+
+        result.created += len(to_create)
+        result.updated += len(to_update)
@@ -1,14 +1,189 @@
+"""
+Database Routing
+================
+
+`ReadWriteRouter` sends writes to 'default' and spreads reads over one or more replicas.
+
+.. code-block:: python
+
+    DATABASE_ROUTERS = ['gramedia.django.utils.db.ReadWriteRouter']
+
+    # aliases with their relative weight (a plain list of aliases gives them equal weight).
+    DATABASE_REPLICAS = {'replica': 2, 'replica2': 1}
+
+    # optional: also take replicas lagging more than this many seconds out of rotation.
+    DATABASE_REPLICA_MAX_LAG = 5
+    # how often each replica is checked, in seconds.  Unreachable replicas are always taken out of rotation.
+    DATABASE_REPLICA_CHECK_INTERVAL = 10
+
+    # optional: after a write, keep reading from 'default' in the same thread for this many seconds.
+    DATABASE_READ_YOUR_WRITES_WINDOW = 2
+
+To pin reads to 'default' for the rest of a request once it has written anything, also add
+`gramedia.django.middleware.ReadWriteRouterMiddleware`.
+"""
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+logger = logging.getLogger('gramedia')
+
+_state = threading.local()
+
+
+def request_started() -> None:
+    _state.in_request = True
+    _state.request_wrote = False
+
+
+def request_finished() -> None:
+    _state.in_request = False
+    _state.request_wrote = False
+
+
+def record_write(window: float = 0) -> None:
+    """ Pins reads in the current thread to 'default', for the rest of the request (if inside one)
+    and for `window` seconds.
+    """
+    if getattr(_state, 'in_request', False):
+        _state.request_wrote = True
+    if window:
+        _state.pinned_until = time.monotonic() + window
+
+
+def reads_pinned_to_primary() -> bool:
+    if getattr(_state, 'request_wrote', False):
+        return True
+    return getattr(_state, 'pinned_until', 0) > time.monotonic()
+
+
+def replica_lag(alias: str):
+    """ Returns how many seconds a replica is behind its primary (0 if unknown for the backend).
+    """
+    connection = connections[alias]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT CASE WHEN NOT pg_is_in_recovery() '
+                'OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+                'ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END')
+            lag = cursor.fetchone()[0]
+            return float(lag) if lag is not None else 0
+        if connection.vendor == 'mysql':
+            cursor.execute('SHOW SLAVE STATUS')
+            row = cursor.fetchone()
+            if row is None:
+                return 0
+            columns = [column[0] for column in cursor.description]
+            lag = dict(zip(columns, row)).get('Seconds_Behind_Master')
+            return float(lag) if lag is not None else None
+        cursor.execute('SELECT 1')
+        return 0
+
+
+def probe_connection(alias: str) -> None:
+    """ Makes sure the current thread can reach a database, reconnecting if its connection was lost.
+    Raises `OperationalError` if it can't.
+    """
+    connection = connections[alias]
+    if connection.connection is not None and not connection.is_usable():
+        connection.close()
+    connection.ensure_connection()
+
+
+class ReplicaHealth:
+    """ Tracks which replicas are usable.  Each replica is re-checked at most once every `check_interval`
+    seconds, by a single thread; other threads keep using the last known state meanwhile.
+
+    A check makes sure the replica can be reached and, when `max_lag` is given, that it isn't lagging
+    more than `max_lag` seconds behind.
+    """
+
+    def __init__(self, max_lag: float = None, check_interval: float = 10):
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._healthy = {}
+        self._checked_at = {}
+        self._down_until = {}
+        self._lock = threading.Lock()
+
+    def is_healthy(self, alias: str) -> bool:
+        now = time.monotonic()
+        if self._down_until.get(alias, 0) > now:
+            return False
+        if now - self._checked_at.get(alias, -self.check_interval) >= self.check_interval:
+            if self._lock.acquire(blocking=False):
+                try:
+                    self._checked_at[alias] = now
+                    self._healthy[alias] = self.check(alias)
+                finally:
+                    self._lock.release()
+        return self._healthy.get(alias, True)
+
+    def check(self, alias: str) -> bool:
+        try:
+            probe_connection(alias)
+            if self.max_lag is None:
+                return True
+            lag = replica_lag(alias)
+        except DatabaseError:
+            logger.warning(f'Replica {alias} failed its health check, taking it out of rotation.', exc_info=True)
+            self.mark_unhealthy(alias)
+            return False
+        if lag is None or lag > self.max_lag:
+            logger.warning(f'Replica {alias} is lagging ({lag}s), taking it out of rotation.')
+            return False
+        return True
+
+    def mark_unhealthy(self, alias: str, seconds: float = None) -> None:
+        """ Takes a replica out of rotation, for `seconds` (defaults to the check interval).  Failed checks
+        call this; applications can too, e.g. when a query on a replica fails with an `OperationalError`.
+        """
+        self._down_until[alias] = time.monotonic() + (seconds if seconds is not None else self.check_interval)
+
+
 class ReadWriteRouter:
+    def __init__(self):
+        replicas = getattr(settings, 'DATABASE_REPLICAS', ['replica'])
+        if not isinstance(replicas, dict):
+            replicas = {alias: 1 for alias in replicas}
+        self.replicas = list(replicas)
+        self.weights = [replicas[alias] for alias in self.replicas]
+        self.read_your_writes_window = getattr(settings, 'DATABASE_READ_YOUR_WRITES_WINDOW', 0)
+        self.health = ReplicaHealth(
+            max_lag=getattr(settings, 'DATABASE_REPLICA_MAX_LAG', None),
+            check_interval=getattr(settings, 'DATABASE_REPLICA_CHECK_INTERVAL', 10),
+        )
+
     def db_for_read(self, model, **hints):
         """
-        Reads go to a randomly-chosen replica.
+        Reads go to a replica, chosen at random by weight among the healthy ones.  Reads go to the
+        primary if this thread has recently written, or if no replica is healthy.
         """
-        return 'replica'
+        if reads_pinned_to_primary():
+            return 'default'
+
+        candidates = [
+            (alias, weight) for alias, weight in zip(self.replicas, self.weights)
+            if self.health.is_healthy(alias)
+        ]
+        if not candidates:
+            return 'default'
+        if len(candidates) == 1:
+            return candidates[0][0]
+
+        aliases, weights = zip(*candidates)
+        return random.choices(aliases, weights=weights)[0]
 
     def db_for_write(self, model, **hints):
         """
         Writes always go to primary.
         """
+        record_write(self.read_your_writes_window)
         return 'default'
 
     def allow_relation(self, obj1, obj2, **hints):
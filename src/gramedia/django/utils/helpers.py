@@ -1,13 +1,27 @@
 import io
+import logging
 import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import timedelta
+from functools import lru_cache
 from http import HTTPStatus
-from urllib.parse import quote_plus
+from typing import Callable, Dict, Iterable
 
 import requests
+from django.conf import settings
+from django.utils.module_loading import import_string
 from PIL import Image
+from requests.adapters import HTTPAdapter
 from rest_framework_simplejwt.tokens import Token
 
+logger = logging.getLogger('gramedia')
+
+# number of distinct user agent strings whose parsed result is kept, per process.
+USER_AGENT_CACHE_SIZE = 1024
+
 
 def snake_to_camel_case(value: str) -> str:
     splited_words = value.split('_')
@@ -42,14 +56,129 @@ def gen_test_user_token(for_user, is_reseller=False, site='example.com', is_pos=
     return test_token
 
 
-def is_valid_youtube_url(video_url: str) -> bool:
-    try:
-        request = requests.head(f'https://www.youtube.com/oembed?format=json&url={quote_plus(video_url)}', timeout=0.5)
-        if request.status_code != HTTPStatus.OK:
+YOUTUBE_OEMBED_URL = 'https://www.youtube.com/oembed'
+
+
+class RequestsTransport:
+    """ Sends HEAD requests over a pooled `requests` session, reusing connections between calls.
+
+    Transports are callables taking `(url, params, timeout)` and returning the response's status code.
+    """
+    def __init__(self, pool_size: int = 10):
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+
+    def __call__(self, url: str, params: dict, timeout: float) -> int:
+        return self.session.head(url, params=params, timeout=timeout).status_code
+
+
+class YoutubeUrlValidator:
+    """ Checks whether URLs are playable YouTube videos, with YouTube's oembed endpoint.
+
+    Answers are cached for `ttl` seconds (`invalid_ttl` for invalid URLs), keeping at most `max_size` URLs.
+    Failed checks (timeouts, connection errors, server errors) count as invalid, but are not cached.
+
+    :param transport: Callable doing the HTTP request, see `RequestsTransport` (the default).  Tests and offline
+        environments can give a stub, e.g. `lambda url, params, timeout: 200`.
+    :param timeout: Timeout of a single request, in seconds.
+    :param max_workers: Number of URLs checked at the same time by `validate_many`.
+    """
+    def __init__(self,
+                 transport: Callable[[str, dict, float], int] = None,
+                 timeout: float = 0.5,
+                 ttl: float = 3600,
+                 invalid_ttl: float = 300,
+                 max_size: int = 10000,
+                 max_workers: int = 8):
+        self.transport = transport if transport is not None else RequestsTransport(pool_size=max_workers)
+        self.timeout = timeout
+        self.ttl = ttl
+        self.invalid_ttl = invalid_ttl
+        self.max_size = max_size
+        self.max_workers = max_workers
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def cached(self, video_url: str):
+        """ Returns the cached answer for a URL, or None if there isn't one.
+        """
+        entry = self._cache.get(video_url)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def check(self, video_url: str) -> bool:
+        """ Asks YouTube about a URL, ignoring the cache.
+        """
+        try:
+            status = self.transport(YOUTUBE_OEMBED_URL, {'format': 'json', 'url': video_url}, self.timeout)
+        except Exception as exc:
+            logger.warning(f'Could not validate YouTube URL {video_url}: {exc}')
+            return False
+
+        if status >= HTTPStatus.INTERNAL_SERVER_ERROR:
+            logger.warning(f'Could not validate YouTube URL {video_url}: oembed returned {status}')
             return False
-    except:
-        return False
-    return True
+
+        valid = status == HTTPStatus.OK
+        with self._lock:
+            self._cache[video_url] = (time.monotonic() + (self.ttl if valid else self.invalid_ttl), valid)
+            self._cache.move_to_end(video_url)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return valid
+
+    def is_valid(self, video_url: str) -> bool:
+        valid = self.cached(video_url)
+        return valid if valid is not None else self.check(video_url)
+
+    def validate_many(self, video_urls: Iterable[str], deadline: float = 2) -> Dict[str, bool]:
+        """ Checks several URLs concurrently, returning a dict of url -> whether it is valid.
+
+        URLs that couldn't be checked within `deadline` seconds count as invalid; their checks carry on in the
+        background, so their answers are cached for next time.
+        """
+        # one entry per distinct URL, in the order they were given.
+        results = dict.fromkeys(video_urls)
+        pending = []
+        for video_url in results:
+            results[video_url] = self.cached(video_url)
+            if results[video_url] is None:
+                pending.append(video_url)
+
+        if pending:
+            if self._executor is None:
+                with self._lock:
+                    if self._executor is None:
+                        self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='youtube-validator')
+            futures = {self._executor.submit(self.check, video_url): video_url for video_url in pending}
+            done, not_done = wait(futures, timeout=deadline)
+            for future in done:
+                results[futures[future]] = future.result()
+            for future in not_done:
+                logger.warning(f'Validating YouTube URL {futures[future]} took longer than {deadline}s')
+                results[futures[future]] = False
+
+        return results
+
+
+_youtube_validator = None
+
+
+def get_youtube_validator() -> YoutubeUrlValidator:
+    """ Shared `YoutubeUrlValidator`.  Set `settings.YOUTUBE_VALIDATION_TRANSPORT` to the dotted path of a
+    transport to replace the HTTP requests (e.g. with a stub in tests or offline environments).
+    """
+    global _youtube_validator
+    if _youtube_validator is None:
+        transport = getattr(settings, 'YOUTUBE_VALIDATION_TRANSPORT', None)
+        _youtube_validator = YoutubeUrlValidator(transport=import_string(transport) if transport else None)
+    return _youtube_validator
+
+
+def is_valid_youtube_url(video_url: str) -> bool:
+    return get_youtube_validator().is_valid(video_url)
 
 
 def get_device_info(user_agent):
@@ -79,18 +208,24 @@ class NusantaraUserAgent(object):
         self.device_name, self.device_version = get_device_info(user_agent_string)
 
 
+@lru_cache(maxsize=USER_AGENT_CACHE_SIZE)
 def parse_ua(user_agent_string):
+    """ Parses a user agent string.  Results are cached, so they are shared and must not be modified.
+    """
     return NusantaraUserAgent(user_agent_string)
 
 
 def get_user_agent(request):
+    """ Returns the parsed user agent of a request, parsing it at most once per request.
+    """
     if not hasattr(request, 'META'):
         return ''
 
-    ua_string = request.META.get('HTTP_USER_AGENT', '')
-
-    user_agent = parse_ua(ua_string)
-
+    # stored on django's request, so it's shared with any DRF request wrapping it.
+    request = getattr(request, '_request', request)
+    user_agent = getattr(request, '_gramedia_user_agent', None)
+    if user_agent is None:
+        user_agent = request._gramedia_user_agent = parse_ua(request.META.get('HTTP_USER_AGENT', ''))
     return user_agent
 
 
@@ -1,24 +1,139 @@
-from django.db import models
-from django.db.models import SlugField, Model
+import re
+from typing import Iterable, List
+
+from django.db import models, router, transaction, IntegrityError
+from django.db.models import Model, Q, SlugField
 from django.utils.text import slugify
 
+_SLUG_SUFFIX = re.compile(r'-[0-9]+')
+
+# how many slug bases are looked up per query in assign_unique_slugs.
+SLUG_LOOKUP_CHUNK_SIZE = 100
+
+
+def _taken_slugs(model_class, bases: Iterable[str], slug_field: str = 'slug') -> set:
+    """ Fetches, in a single query, every existing slug that is one of `bases` or one of `bases` followed by
+    a numeric suffix.
+
+    The query only uses exact and prefix matches (`= 'base' OR LIKE 'base-%'`), which the slug's index can
+    serve; slugs that merely start with a base and a dash (`harry-potter-and-...`) are filtered out here.
+    """
+    bases = set(bases)
+    if not bases:
+        return set()
+
+    prefixes = Q()
+    for base in sorted(bases):
+        prefixes |= Q(**{slug_field: base}) | Q(**{f'{slug_field}__startswith': f'{base}-'})
+
+    taken = set()
+    for slug in model_class._base_manager.filter(prefixes).values_list(slug_field, flat=True).iterator():
+        base, separator, suffix = slug.rpartition('-')
+        if slug in bases or (base in bases and _SLUG_SUFFIX.fullmatch(separator + suffix)):
+            taken.add(slug)
+    return taken
+
+
+def _next_free_slug(base: str, taken: set, start: int = 0) -> str:
+    """ Returns `base` if it is free (and `start` is 0), otherwise `base` with the lowest free numeric suffix,
+    starting at `start` (or 1).  The chosen slug is recorded in `taken`.
+    """
+    slug = base
+    if start or base in taken:
+        index = max(start, 1)
+        while f'{base}-{index}' in taken:
+            index += 1
+        slug = f'{base}-{index}'
+
+    taken.add(slug)
+    return slug
 
-def generate_slug(model_class: Model, base_text: str, tries=0) -> str:
+
+def generate_slug(model_class: Model, base_text: str, tries=0, slug_field: str = 'slug') -> str:
     """ Create a unique slug for the given model_class.
 
+    All of the existing slugs sharing the same base are fetched with a single query, and the lowest
+    free numeric suffix is used (`harry-potter`, `harry-potter-1`, `harry-potter-2`, ...).
+
     .. warning::
 
-        Makes the slightly naive assumption that your slug field will be called 'slug'
+        This can still race with a concurrent insert of the same slug, see `save_with_unique_slug`.
 
     :param model_class: A django model class (NOT the instance)
     :param base_text: Some text to use as a base for the slug, such as the 'name'
-    :param tries: Previous attempts to geenrate the slug
+    :param tries: Smallest numeric suffix to use, 0 allows the slug without any suffix.
+    :param slug_field: Name of the model's slug field.
     :return: A unique slug for an item from the database.
     """
-    candidate_slug = f'{slugify(base_text)}-{tries}' if tries else slugify(base_text)
-    if model_class.objects.filter(slug=candidate_slug).exists():
-        return generate_slug(model_class, base_text, tries + 1)
-    return candidate_slug
+    base = slugify(base_text)
+    return _next_free_slug(base, _taken_slugs(model_class, [base], slug_field), start=tries)
+
+
+def save_with_unique_slug(instance: Model, slug_field: str = 'slug', attempts: int = 3, **save_kwargs) -> Model:
+    """ Saves a model instance whose slug is generated on save, generating a new slug and retrying if another
+    process inserted the same slug between generating it and saving.
+
+    :param instance: The model instance to save.
+    :param slug_field: Name of the instance's slug field.
+    :param attempts: How many times to try saving before giving up.
+    :return: The saved instance.
+    """
+    attname = instance._meta.get_field(slug_field).attname
+    using = save_kwargs.get('using') or router.db_for_write(type(instance), instance=instance)
+
+    for attempt in range(1, attempts + 1):
+        generated = not getattr(instance, attname)
+        try:
+            with transaction.atomic(using=using):
+                instance.save(**save_kwargs)
+            return instance
+        except IntegrityError:
+            slug = getattr(instance, attname)
+            if (not generated or attempt == attempts or
+                    not type(instance)._base_manager.using(using).filter(**{attname: slug}).exists()):
+                raise
+            setattr(instance, attname, '')
+
+
+def assign_unique_slugs(instances: List[Model], slug_field: str = 'slug', source_field: str = None) -> List[Model]:
+    """ Assigns unique slugs, in memory, to a batch of unsaved model instances (e.g. before `bulk_create`).
+
+    Slugs are made unique against both the database and the rest of the batch.  Instances that already have
+    a slug keep it.  The existing slugs are fetched with one query per `SLUG_LOOKUP_CHUNK_SIZE` distinct names.
+
+    :param instances: Model instances, all of the same model.
+    :param slug_field: Name of the slug field to fill in.
+    :param source_field: Attribute to build slugs from.  Defaults to the field's `from_field`
+        (`MonoLangSlugField`) or `populate_from` (`AutoSlugField`), or 'name'.
+    :return: The same instances.
+    """
+    instances = list(instances)
+    if not instances:
+        return instances
+
+    model_class = type(instances[0])
+    field = model_class._meta.get_field(slug_field)
+    source = source_field or getattr(field, 'from_field', None) or getattr(field, 'populate_from', None) or 'name'
+    make_slug = getattr(field, 'slugify', slugify)
+
+    pending = []
+    taken = set()
+    for instance in instances:
+        slug = getattr(instance, field.attname)
+        if slug:
+            taken.add(slug)
+            continue
+        text = source(instance) if callable(source) else getattr(instance, source)
+        pending.append((instance, make_slug(text)))
+
+    bases = sorted({base for instance, base in pending})
+    for start in range(0, len(bases), SLUG_LOOKUP_CHUNK_SIZE):
+        taken |= _taken_slugs(model_class, bases[start:start + SLUG_LOOKUP_CHUNK_SIZE], slug_field)
+
+    for instance, base in pending:
+        setattr(instance, field.attname, _next_free_slug(base, taken))
+
+    return instances
 
 
 class MonoLangSlugField(SlugField):
@@ -39,7 +154,7 @@ class MonoLangSlugField(SlugField):
             setattr(
                 model_instance,
                 self.attname,
-                generate_slug(model_instance.__class__, source)
+                generate_slug(model_instance.__class__, source, slug_field=self.attname)
             )
         return super(MonoLangSlugField, self).pre_save(model_instance, add)
 
@@ -0,0 +1,63 @@
+"""
+Pytest Plugin
+=============
+
+Performance budgets for pytest, see `gramedia.django.utils.test_helper.PerformanceBudget`.  Enable it in a
+service's `conftest.py` (it isn't registered automatically, as it needs django to be configured):
+
+.. code-block:: python
+
+    pytest_plugins = ['gramedia.django.utils.pytest_plugin']
+
+Then lock in an endpoint's cost with a marker, which applies to the whole test (but not its fixtures):
+
+.. code-block:: python
+
+    @pytest.mark.performance_budget(max_queries=4, max_publishes=1, max_seconds=0.5)
+    def test_list_books(api_client, user):
+        api_client.get('/books/')
+
+or the `performance_budget` fixture, to only measure part of a test:
+
+.. code-block:: python
+
+    def test_list_books(api_client, performance_budget):
+        create_books()
+        with performance_budget(max_queries=4):
+            api_client.get('/books/')
+"""
+import pytest
+
+from gramedia.django.utils.test_helper import BudgetExceeded, PerformanceBudget
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers',
+        'performance_budget(max_queries=None, max_publishes=None, max_rpc_calls=None, max_seconds=None): '
+        'fail the test if it runs more SQL queries, broker publishes or RPC calls, or takes longer, than allowed.')
+
+
+@pytest.fixture
+def performance_budget():
+    return PerformanceBudget
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    marker = item.get_closest_marker('performance_budget')
+    if marker is None:
+        yield
+        return
+
+    # only the test itself is measured, not its fixtures.
+    budget = PerformanceBudget(*marker.args, **marker.kwargs)
+    budget.__enter__()
+    outcome = yield
+    try:
+        budget.__exit__(*(outcome.excinfo or (None, None, None)))
+    except BudgetExceeded as exc:
+        # pluggy >= 1.1 wants the error set on the outcome, older versions expect it to be raised.
+        if not hasattr(outcome, 'force_exception'):
+            raise
+        outcome.force_exception(exc)
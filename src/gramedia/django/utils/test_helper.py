@@ -1,12 +1,24 @@
 import base64
+import inspect
 import io
 import os
+import re
+import time
+import traceback
+from collections import Counter, defaultdict
+from contextlib import ExitStack
 from datetime import timedelta
+from unittest import mock
 
+from django.db import connections
+from kombu import Producer
 from PIL import Image
 
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import Token
 
+from gramedia.django.signalling import BasicRpcClient
+
 
 class MyToken(Token):
     token_type = 'access'
@@ -40,3 +52,156 @@ def generate_base64_image(size: tuple):
     image = generate_image_file(size, os.urandom(x * y))
 
     return base64.b64encode(image.read()).decode()
+
+
+# frames from these packages are left out of the stacks reported for duplicated queries.
+_LIBRARY_PATHS = re.compile(
+    r'[/\\](django|rest_framework|kombu|pytest|_pytest|pluggy|unittest)[/\\]|test_helper\.py$|^<frozen ')
+
+
+def _caller_stack(limit: int = 6) -> tuple:
+    frames = [frame for frame in traceback.extract_stack()[:-2] if not _LIBRARY_PATHS.search(frame.filename)]
+    return tuple(f'{frame.filename}:{frame.lineno} in {frame.name}' for frame in frames[-limit:])
+
+
+class BudgetExceeded(AssertionError):
+    pass
+
+
+class PerformanceBudget:
+    """ Context manager failing a test when the code inside it runs more SQL queries, broker publishes or RPC
+    calls, or takes longer, than allowed.  Limits left as None aren't checked, but are still counted.
+
+    When a budget is exceeded, queries that ran more than once are reported, grouped by the stack that ran them.
+
+    .. code-block:: python
+
+        with PerformanceBudget(max_queries=3, max_publishes=1, max_seconds=0.5) as budget:
+            client.get('/books/')
+        print(budget.queries, budget.publishes, budget.elapsed)
+
+    :param max_rpc_calls: Limit on `BasicRpcClient.call`s.  Their request messages are not counted as publishes.
+    :param using: Database aliases whose queries are counted, defaults to all of them.
+    """
+
+    def __init__(self, max_queries: int = None, max_publishes: int = None, max_rpc_calls: int = None,
+                 max_seconds: float = None, using=None):
+        self.max_queries = max_queries
+        self.max_publishes = max_publishes
+        self.max_rpc_calls = max_rpc_calls
+        self.max_seconds = max_seconds
+        self.using = [using] if isinstance(using, str) else using
+        self.captured_queries = []
+        self.published = []
+        self.rpc_calls = []
+        self.elapsed = None
+        self._stack = None
+        self._rpc_depth = 0
+
+    @property
+    def queries(self) -> int:
+        return len(self.captured_queries)
+
+    @property
+    def publishes(self) -> int:
+        return len(self.published)
+
+    def _record_query(self, execute, sql, params, many, context):
+        self.captured_queries.append((sql, _caller_stack()))
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        budget = self
+        publish, call = Producer.publish, BasicRpcClient.call
+        call_signature = inspect.signature(call)
+
+        def counting_publish(producer, body, routing_key=None, *args, **kwargs):
+            if not budget._rpc_depth:
+                budget.published.append((kwargs.get('exchange'), routing_key))
+            return publish(producer, body, routing_key, *args, **kwargs)
+
+        def counting_call(*args, **kwargs):
+            # the client is always bound first, the rest may come in by keyword.
+            arguments = call_signature.bind_partial(*args, **kwargs).arguments
+            budget.rpc_calls.append((args[0].routing_key, arguments.get('event_type'), arguments.get('entity_type')))
+            budget._rpc_depth += 1
+            try:
+                return call(*args, **kwargs)
+            finally:
+                budget._rpc_depth -= 1
+
+        self._stack = ExitStack()
+        for alias in (self.using if self.using is not None else connections):
+            self._stack.enter_context(connections[alias].execute_wrapper(self._record_query))
+        self._stack.enter_context(mock.patch.object(Producer, 'publish', counting_publish))
+        self._stack.enter_context(mock.patch.object(BasicRpcClient, 'call', counting_call))
+        self._started = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.elapsed = time.monotonic() - self._started
+        self._stack.close()
+        if exc_type is None:
+            self.check()
+
+    def problems(self) -> list:
+        problems = []
+        if self.max_queries is not None and self.queries > self.max_queries:
+            problems.append(f'{self.queries} SQL queries, the budget is {self.max_queries}.')
+        if self.max_publishes is not None and self.publishes > self.max_publishes:
+            problems.append(f'{self.publishes} broker publishes, the budget is {self.max_publishes}: {self.published}')
+        if self.max_rpc_calls is not None and len(self.rpc_calls) > self.max_rpc_calls:
+            problems.append(f'{len(self.rpc_calls)} RPC calls, the budget is {self.max_rpc_calls}: {self.rpc_calls}')
+        if self.max_seconds is not None and self.elapsed > self.max_seconds:
+            problems.append(f'took {self.elapsed:.3f}s, the budget is {self.max_seconds}s.')
+        return problems
+
+    def duplicated_queries(self) -> dict:
+        """ Returns {sql: Counter(stack -> number of times)} for the queries that ran more than once.
+        """
+        by_sql = defaultdict(Counter)
+        for sql, stack in self.captured_queries:
+            by_sql[sql][stack] += 1
+        return {sql: stacks for sql, stacks in by_sql.items() if sum(stacks.values()) > 1}
+
+    def report(self) -> str:
+        lines = self.problems()
+        duplicated = sorted(self.duplicated_queries().items(), key=lambda item: -sum(item[1].values()))
+        if duplicated:
+            lines.append('')
+            lines.append('Duplicated queries:')
+        for sql, stacks in duplicated:
+            lines.append(f'  {sum(stacks.values())}x {sql}')
+            for stack, count in stacks.most_common():
+                lines.append(f'    {count}x from:')
+                lines.extend(f'      {frame}' for frame in stack)
+        return '\n'.join(lines)
+
+    def check(self) -> None:
+        if self.problems():
+            raise BudgetExceeded(self.report())
+
+
+def authorize_client(client, user, **token_kwargs):
+    """ Authenticates an API test client's requests as `user`, with a token from `gen_test_user_token`.
+    """
+    token = gen_test_user_token(user, **token_kwargs)
+    client.credentials(HTTP_AUTHORIZATION=f'{api_settings.AUTH_HEADER_TYPES[0]} {token}')
+    return client
+
+
+def assert_api_budget(client, method: str, path: str, user=None, token_kwargs: dict = None,
+                      max_queries: int = None, max_publishes: int = None, max_rpc_calls: int = None,
+                      max_seconds: float = None, **request_kwargs):
+    """ Calls an API endpoint with a test client (as `user`, if given), failing if the call goes over its budget.
+
+    .. code-block:: python
+
+        response = assert_api_budget(APIClient(), 'get', '/books/', user=user, max_queries=4, max_seconds=0.3)
+
+    :return: The response.
+    """
+    if user is not None:
+        authorize_client(client, user, **(token_kwargs or {}))
+    with PerformanceBudget(max_queries, max_publishes, max_rpc_calls, max_seconds):
+        return getattr(client, method.lower())(path, **request_kwargs)
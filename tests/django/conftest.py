@@ -0,0 +1,18 @@
+import os
+
+try:
+    import django
+except ImportError:  # the drf extra isn't installed.
+    django = None
+    collect_ignore_glob = ['*']
+
+
+def pytest_configure(config):
+    if django is None:
+        return
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.django.settings')
+    django.setup()
+
+    from django.test.utils import setup_databases, setup_test_environment
+    setup_test_environment()
+    setup_databases(verbosity=0, interactive=False)
@@ -0,0 +1,23 @@
+SECRET_KEY = 'gramedia-common-tests-secret-key-for-signing-tokens'
+INSTALLED_APPS = [
+    'django.contrib.contenttypes',
+    'django.contrib.auth',
+    'django.contrib.sites',
+    'rest_framework',
+    'gramedia.django',
+    'tests.django.testapp',
+]
+DATABASES = {
+    'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'},
+    'replica': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:', 'TEST': {'MIRROR': 'default'}},
+    'replica2': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:', 'TEST': {'MIRROR': 'default'}},
+}
+DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
+USE_TZ = True
+ALLOWED_HOSTS = ['*']
+ROOT_URLCONF = 'tests.django.urls'
+LANGUAGES = [('en', 'English'), ('id', 'Indonesian')]
+LANGUAGE_CODE = 'en'
+CLUSTER_PREFIX = 'test_'
+BROKER_URL = 'memory://'
+SIMPLE_JWT = {'USER_ID_FIELD': 'username', 'SIGNING_KEY': SECRET_KEY}
@@ -0,0 +1,67 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from tests.django.testapp.models import Box, Item
+
+
+class BatchedDeleteTests(TestCase):
+
+    def setUp(self):
+        self.box = Box.objects.create(name='box')
+        Item.objects.bulk_create([
+            Item(box=self.box, name='keep' if index % 5 == 0 else 'drop') for index in range(30)
+        ])
+
+    def test_delete_in_batches(self):
+        progress = []
+        deleted = Item.objects.filter(name='drop').delete_in_batches(
+            batch_size=10, progress=lambda done, total: progress.append((done, total)), deleted_by='tester')
+
+        self.assertEqual(deleted, 24)
+        self.assertEqual(progress, [(10, 24), (20, 24), (24, 24)])
+        self.assertEqual(Item.objects.count(), 6)
+        self.assertFalse(Item.objects.exclude(name='keep').exists())
+        self.assertEqual(set(Item.all_objects.dead().values_list('deleted_by', flat=True)), {'tester'})
+
+    def test_batch_boundaries(self):
+        with self.assertNumQueries(3 * 2 + 1):
+            # one query for the keys and one update per batch, plus the final empty key lookup.
+            Item.objects.filter(name='drop').delete_in_batches(batch_size=10)
+
+    def test_sleep_between_full_batches(self):
+        with patch('gramedia.django.abstract_models.time.sleep') as sleep:
+            Item.objects.filter(name='drop').delete_in_batches(batch_size=10, sleep=0.5)
+        self.assertEqual(sleep.call_count, 2)
+        sleep.assert_called_with(0.5)
+
+    def test_hard_delete_fast_path(self):
+        with self.assertLogs('HARDDELETE') as logs:
+            deleted = Item.all_objects.filter(name='drop').hard_delete_in_batches(batch_size=7)
+        self.assertEqual(deleted, 24)
+        self.assertIn('(raw delete)', logs.output[0])
+        self.assertEqual(Item.all_objects.count(), 6)
+
+    def test_hard_delete_cascades(self):
+        other = Box.objects.create(name='other')
+        with self.assertLogs('HARDDELETE') as logs:
+            deleted = Box.all_objects.filter(pk=self.box.pk).hard_delete_in_batches(batch_size=1)
+        self.assertEqual(deleted, 1)
+        self.assertIn('(collector delete)', logs.output[0])
+        self.assertFalse(Item.all_objects.exists())
+        self.assertListEqual(list(Box.all_objects.all()), [other])
+
+    def test_sliced_queryset(self):
+        with self.assertRaises(TypeError):
+            Item.objects.all()[:5].delete_in_batches()
+
+
+class ManagerDeleteTests(TestCase):
+
+    def test_managers_have_no_deletes(self):
+        # deleting needs an explicit queryset, e.g. `Item.objects.all().delete()`.
+        for manager in (Item.objects, Item.all_objects):
+            for name in ('delete', 'hard_delete', 'delete_in_batches', 'hard_delete_in_batches'):
+                with self.subTest(manager=manager.name, method=name):
+                    self.assertFalse(hasattr(manager, name))
+                    self.assertTrue(hasattr(manager.all(), name))
@@ -0,0 +1,76 @@
+import threading
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from gramedia.django.utils.bulk_import import BulkImporter, SlugConflict, _bulk_state, _use_preassigned_slugs
+from tests.django.testapp.models import Author
+
+
+class BulkImporterTests(TestCase):
+
+    def setUp(self):
+        self.existing = Author.objects.create(name='Existing', bio='old')
+
+    def test_create(self):
+        result = BulkImporter(Author, batch_size=10, modified_by='import').run(
+            [{'name': f'Author {index % 3}'} for index in range(25)])
+
+        self.assertEqual((result.created, result.updated, result.skipped), (25, 0, 0))
+        authors = Author.objects.exclude(pk=self.existing.pk)
+        self.assertEqual(len(set(authors.values_list('slug', flat=True))), 25)
+        self.assertTrue(all(author.created and author.modified for author in authors))
+        self.assertEqual(set(authors.values_list('modified_by', flat=True)), {'import'})
+
+    def test_queries_per_batch(self):
+        with self.assertNumQueries(2 * 4):
+            # per batch: the slug lookup, and the insert inside its own savepoint, without any per-row
+            # AutoSlugField query.
+            BulkImporter(Author, batch_size=10).run([{'name': f'Author {index}'} for index in range(20)])
+
+    def test_skip_conflicts(self):
+        result = BulkImporter(Author).run([
+            {'name': 'Existing', 'slug': 'existing', 'bio': 'new'},
+            {'name': 'New', 'slug': 'new'},
+            {'name': 'New again', 'slug': 'new'},
+        ])
+        self.assertEqual((result.created, result.updated, result.skipped), (1, 0, 2))
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.bio, 'old')
+
+    def test_update_conflicts(self):
+        result = BulkImporter(Author, on_conflict='update', modified_by='import').run([
+            {'name': 'Existing', 'slug': 'existing', 'bio': 'new'},
+            {'name': 'Other'},
+        ])
+        self.assertEqual((result.created, result.updated, result.skipped), (1, 1, 0))
+        self.existing.refresh_from_db()
+        self.assertEqual((self.existing.bio, self.existing.modified_by), ('new', 'import'))
+
+    def test_error_on_conflict(self):
+        with self.assertRaises(SlugConflict):
+            BulkImporter(Author, on_conflict='error').run([{'name': 'Existing', 'slug': 'existing'}])
+
+    def test_progress_is_closed_on_errors(self):
+        with patch('gramedia.django.utils.bulk_import.ProgressReporter') as reporter, \
+                self.assertRaises(SlugConflict):
+            BulkImporter(Author, on_conflict='error', show_progress=True).run([{'name': 'x', 'slug': 'existing'}])
+        reporter.return_value.close.assert_called_once()
+
+    def test_ordinary_saves_are_unaffected(self):
+        BulkImporter(Author).run([{'name': 'Existing'}])
+        author = Author.objects.create(name='Existing')
+        self.assertNotIn(author.slug, ('', 'existing', 'existing-1'))
+
+    def test_other_threads_are_unaffected(self):
+        field = Author._meta.get_field('slug')
+        other_threads = []
+        with _use_preassigned_slugs(field):
+            # inside the import, this thread's saves keep the slug they were given (here: none)...
+            self.assertEqual(field.pre_save(Author(name='Existing'), True), '')
+            # ...while other threads still get AutoSlugField's own unique slug.
+            thread = threading.Thread(target=lambda: other_threads.append(getattr(_bulk_state, 'fields', set())))
+            thread.start()
+            thread.join()
+        self.assertEqual(other_threads, [set()])
+        self.assertNotIn(field.pre_save(Author(name='Existing'), True), ('', 'existing'))
@@ -0,0 +1,112 @@
+from django.test import TestCase
+from django.utils.http import http_date
+from rest_framework import generics, serializers
+from rest_framework.test import APIRequestFactory
+
+from gramedia.django.conditional import ConditionalListMixin, ConditionalRetrieveMixin
+from gramedia.django.sites import site_registry
+from tests.django.testapp.models import Author, Book
+
+
+class BookSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Book
+        fields = ['id', 'title']
+
+
+class BookListView(ConditionalListMixin, generics.ListAPIView):
+    authentication_classes = []
+    permission_classes = []
+    queryset = Book.objects.order_by('pk')
+    serializer_class = BookSerializer
+
+
+class BookDetailView(ConditionalRetrieveMixin, generics.RetrieveAPIView):
+    authentication_classes = []
+    permission_classes = []
+    queryset = Book.objects.all()
+    serializer_class = BookSerializer
+
+
+class ConditionalTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = Author.objects.create(name='Author')
+        cls.books = [Book.objects.create(author=author, title=f'Book {index}') for index in range(3)]
+
+    def setUp(self):
+        site_registry.load()
+        self.factory = APIRequestFactory()
+
+    def get(self, view, url='/books/', **headers):
+        request = self.factory.get(url, HTTP_HOST='example.com', **headers)
+        response = view.as_view()(request, **({'pk': self.books[0].pk} if view is BookDetailView else {}))
+        return response.render() if hasattr(response, 'render') else response
+
+
+class ConditionalListTests(ConditionalTestCase):
+
+    def test_etag_only(self):
+        response = self.get(BookListView)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+
+    def test_not_modified(self):
+        etag = self.get(BookListView)['ETag']
+        with self.assertNumQueries(1):
+            response = self.get(BookListView, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    def test_deleting_an_older_row(self):
+        etag = self.get(BookListView)['ETag']
+        self.books[0].delete()
+        response = self.get(BookListView, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 2)
+
+    def test_if_modified_since_is_ignored(self):
+        # the newest row is unchanged, so a Last-Modified based answer would be a stale 304.
+        self.books[0].delete()
+        response = self.get(BookListView, HTTP_IF_MODIFIED_SINCE=http_date())
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_depends_on_the_request(self):
+        etag = self.get(BookListView)['ETag']
+        self.assertNotEqual(self.get(BookListView, '/books/?page=2')['ETag'], etag)
+        self.assertNotEqual(self.get(BookListView, HTTP_ACCEPT_LANGUAGE='id')['ETag'], etag)
+        self.assertNotEqual(self.get(BookListView, HTTP_ACCEPT='application/json; indent=2')['ETag'], etag)
+
+
+class ConditionalRetrieveTests(ConditionalTestCase):
+
+    def test_validators(self):
+        response = self.get(BookDetailView)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['title'], 'Book 0')
+        self.assertIn('ETag', response)
+        self.assertEqual(response['Last-Modified'], http_date(self.books[0].modified.timestamp()))
+
+    def test_not_modified(self):
+        response = self.get(BookDetailView)
+        self.assertEqual(self.get(BookDetailView, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertEqual(self.get(BookDetailView, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
+
+    def test_modified(self):
+        response = self.get(BookDetailView)
+        book = self.books[0]
+        book.title = 'Renamed'
+        book.save()
+        Book.objects.filter(pk=book.pk).update(modified=book.modified.replace(year=book.modified.year + 1))
+
+        response = self.get(BookDetailView, HTTP_IF_NONE_MATCH=response['ETag'],
+                            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['title'], 'Renamed')
+
+    def test_missing_object(self):
+        self.books[0].delete()
+        self.assertEqual(self.get(BookDetailView).status_code, 404)
@@ -0,0 +1,182 @@
+import threading
+import time
+from itertools import count
+from unittest import TestCase
+from unittest.mock import patch
+
+from kombu import Connection, Exchange, Queue
+from kombu.message import Message
+
+from gramedia.django.queue import runtime as runtime_module
+from gramedia.django.queue.runtime import ConsumerRuntime
+
+EXCHANGE = Exchange('test-runtime', type='topic')
+_queue_names = count()
+
+
+def wait_for(condition, timeout: float = 5) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError('timed out')
+        time.sleep(0.01)
+
+
+class ConsumerRuntimeTests(TestCase):
+
+    def setUp(self):
+        self.connection = Connection('memory://')
+        self.addCleanup(self.connection.release)
+        self.queue = Queue(f'test-runtime-{next(_queue_names)}', EXCHANGE, routing_key='book.#')
+        self.handled = []
+        self._lock = threading.Lock()
+
+        self.acked, self.rejected = [], []
+        ack, reject = Message.ack, Message.reject
+
+        def record_ack(message, *args, **kwargs):
+            self.acked.append(message.decode())
+            return ack(message, *args, **kwargs)
+
+        def record_reject(message, requeue=False):
+            self.rejected.append((message.decode(), requeue))
+            return reject(message, requeue=requeue)
+
+        for patcher in (patch.object(Message, 'ack', record_ack), patch.object(Message, 'reject', record_reject)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def record(self, body):
+        with self._lock:
+            self.handled.append(body)
+
+    def publish(self, *bodies, routing_key='book.updated'):
+        with self.connection.Producer() as producer:
+            for body in bodies:
+                producer.publish(body, exchange=EXCHANGE, routing_key=routing_key, declare=[self.queue],
+                                 serializer='json')
+
+    def start(self, handlers, **kwargs):
+        runtime = ConsumerRuntime(self.connection.clone(), [self.queue], handlers, ack_interval=0.01, **kwargs)
+        thread = threading.Thread(target=runtime.run, daemon=True)
+        thread.start()
+
+        def stop():
+            runtime.stop()
+            thread.join(5)
+            runtime.shutdown()
+            runtime.connection.release()
+        self.addCleanup(stop)
+        return runtime
+
+    def identities_on_lanes(self, runtime, lanes):
+        """ Returns an identity for each of `lanes`.
+        """
+        identities = {}
+        for identity in range(1000):
+            identities.setdefault(runtime.get_lane({'identity': identity}), identity)
+        return [identities[lane] for lane in lanes]
+
+    def test_order_per_identity(self):
+        def handler(body):
+            # later messages are quicker, to catch them overtaking earlier ones.
+            time.sleep(0.02 / (body['seq'] + 1))
+            self.record(body)
+
+        self.publish(*({'identity': identity, 'seq': seq} for seq in range(5) for identity in ('a', 'b', 'c')))
+        self.start({'book.updated': handler}, lanes=3)
+        wait_for(lambda: len(self.acked) == 15)
+
+        for identity in ('a', 'b', 'c'):
+            self.assertListEqual([body['seq'] for body in self.handled if body['identity'] == identity],
+                                 list(range(5)))
+
+    def test_lanes_run_in_parallel(self):
+        # both handlers must be running at the same time to get past the barrier.
+        barrier = threading.Barrier(2, timeout=2)
+        runtime = self.start({'book.*': lambda body: barrier.wait()}, lanes=2)
+        first, second = self.identities_on_lanes(runtime, [0, 1])
+        self.publish({'identity': first}, {'identity': second})
+
+        wait_for(lambda: len(self.acked) == 2)
+        self.assertListEqual(self.rejected, [])
+
+    def test_reject_on_failure(self):
+        def handler(body):
+            if body.get('fail'):
+                raise ValueError('bad message')
+
+        self.publish({'id': 1, 'fail': True}, {'id': 2})
+        with self.assertLogs('LOG', 'ERROR'):
+            self.start({'book.updated': handler})
+            wait_for(lambda: self.acked and self.rejected)
+
+        self.assertListEqual(self.acked, [{'id': 2}])
+        self.assertListEqual(self.rejected, [({'id': 1, 'fail': True}, False)])
+
+    def test_requeue_on_failure(self):
+        attempts = []
+
+        def handler(body):
+            attempts.append(body)
+            if len(attempts) == 1:
+                raise ValueError('try again')
+
+        self.publish({'id': 1})
+        with self.assertLogs('LOG', 'ERROR'):
+            self.start({'book.updated': handler}, requeue_on_error=True)
+            wait_for(lambda: self.acked)
+
+        self.assertListEqual(attempts, [{'id': 1}, {'id': 1}])
+        self.assertListEqual(self.rejected, [({'id': 1}, True)])
+
+    def test_unknown_routing_key(self):
+        self.publish({'id': 1}, routing_key='book.deleted.forever')
+        with self.assertLogs('LOG', 'ERROR'):
+            self.start({'book.updated': self.record})
+            wait_for(lambda: self.rejected)
+        self.assertListEqual(self.rejected, [({'id': 1}, False)])
+
+    def test_prefetch_bound(self):
+        release = threading.Event()
+
+        def handler(body):
+            release.wait(5)
+            self.record(body)
+
+        self.publish(*({'seq': seq} for seq in range(10)))
+        runtime = self.start({'book.updated': handler}, lanes=1, prefetch_count=3)
+        wait_for(lambda: runtime._in_flight == 3)
+        time.sleep(0.1)
+        self.assertEqual(runtime._in_flight, 3)
+        self.assertListEqual(self.handled, [])
+
+        release.set()
+        wait_for(lambda: len(self.acked) == 10)
+        self.assertListEqual([body['seq'] for body in self.handled], list(range(10)))
+
+
+class GetHandlerTests(TestCase):
+
+    def setUp(self):
+        self.runtime = ConsumerRuntime(Connection('memory://'), [], {
+            'book.updated': 'exact', 'book.*': 'one word', 'author.#': 'any words'})
+
+    def test_routing(self):
+        self.assertEqual(self.runtime.get_handler('book.updated'), 'exact')
+        self.assertEqual(self.runtime.get_handler('book.deleted'), 'one word')
+        self.assertEqual(self.runtime.get_handler('author'), 'any words')
+        self.assertEqual(self.runtime.get_handler('author.bio.updated'), 'any words')
+        self.assertIsNone(self.runtime.get_handler('book.deleted.forever'))
+
+    def test_misses_are_not_remembered(self):
+        for index in range(10):
+            self.assertIsNone(self.runtime.get_handler(f'series.{index}'))
+        self.assertDictEqual(self.runtime._routes, {})
+        self.assertEqual(len(self.runtime.handlers), 3)
+
+    def test_matches_are_bounded(self):
+        with patch.object(runtime_module, 'ROUTE_CACHE_SIZE', 2):
+            for index in range(5):
+                self.assertEqual(self.runtime.get_handler(f'author.{index}'), 'any words')
+        self.assertEqual(len(self.runtime._routes), 2)
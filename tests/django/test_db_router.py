@@ -0,0 +1,93 @@
+import random
+import threading
+from collections import Counter
+from unittest import mock
+
+from django.db import OperationalError, connections
+from django.test import SimpleTestCase, override_settings
+
+from gramedia.django.utils import db
+from gramedia.django.utils.db import ReadWriteRouter
+
+
+@override_settings(DATABASE_REPLICAS={'replica': 3, 'replica2': 1})
+class ReadWriteRouterTests(SimpleTestCase):
+    databases = {'default', 'replica', 'replica2'}
+
+    def setUp(self):
+        db._state.__dict__.clear()
+        self.addCleanup(db._state.__dict__.clear)
+        random.seed(1)
+
+    def reads(self, router, count=1000):
+        return Counter(router.db_for_read(None) for _ in range(count))
+
+    def test_weights(self):
+        reads = self.reads(ReadWriteRouter(), 4000)
+        self.assertEqual(set(reads), {'replica', 'replica2'})
+        self.assertAlmostEqual(reads['replica'] / 4000, 0.75, delta=0.05)
+
+    @override_settings(DATABASE_REPLICAS=['replica', 'replica2'])
+    def test_equal_weights(self):
+        reads = self.reads(ReadWriteRouter(), 4000)
+        self.assertAlmostEqual(reads['replica'] / 4000, 0.5, delta=0.05)
+
+    def test_writes_go_to_primary(self):
+        self.assertEqual(ReadWriteRouter().db_for_write(None), 'default')
+
+    def test_writes_pin_the_request(self):
+        router = ReadWriteRouter()
+        db.request_started()
+        self.assertNotEqual(router.db_for_read(None), 'default')
+        router.db_for_write(None)
+        self.assertEqual(set(self.reads(router, 50)), {'default'})
+
+        # other threads are unaffected.
+        other = []
+        thread = threading.Thread(target=lambda: other.append(router.db_for_read(None)))
+        thread.start()
+        thread.join()
+        self.assertNotEqual(other, ['default'])
+
+        db.request_finished()
+        self.assertNotEqual(router.db_for_read(None), 'default')
+
+    @override_settings(DATABASE_READ_YOUR_WRITES_WINDOW=2)
+    def test_read_your_writes_window(self):
+        router = ReadWriteRouter()
+        with mock.patch('gramedia.django.utils.db.time.monotonic', return_value=1000):
+            router.db_for_write(None)
+            self.assertEqual(router.db_for_read(None), 'default')
+        with mock.patch('gramedia.django.utils.db.time.monotonic', return_value=1003):
+            self.assertNotEqual(router.db_for_read(None), 'default')
+
+    def test_unreachable_replica_fails_over(self):
+        router = ReadWriteRouter()
+        with mock.patch.object(connections['replica'], 'ensure_connection', side_effect=OperationalError('down')), \
+                self.assertLogs('gramedia', 'WARNING'):
+            self.assertEqual(set(self.reads(router, 50)), {'replica2'})
+
+        # it stays out of rotation until it's checked again.
+        self.assertEqual(set(self.reads(router, 50)), {'replica2'})
+        router.health._down_until.clear()
+        router.health._checked_at.clear()
+        self.assertIn('replica', self.reads(router, 50))
+
+    def test_no_reachable_replica(self):
+        router = ReadWriteRouter()
+        with mock.patch('gramedia.django.utils.db.probe_connection', side_effect=OperationalError('down')), \
+                self.assertLogs('gramedia', 'WARNING'):
+            self.assertEqual(router.db_for_read(None), 'default')
+
+    @override_settings(DATABASE_REPLICA_MAX_LAG=5)
+    def test_lagging_replica(self):
+        router = ReadWriteRouter()
+        lags = {'replica': 30, 'replica2': 0}
+        with mock.patch('gramedia.django.utils.db.replica_lag', side_effect=lags.get), \
+                self.assertLogs('gramedia', 'WARNING'):
+            self.assertEqual(set(self.reads(router, 50)), {'replica2'})
+
+    def test_mark_unhealthy(self):
+        router = ReadWriteRouter()
+        router.health.mark_unhealthy('replica2', seconds=60)
+        self.assertEqual(set(self.reads(router, 50)), {'replica'})
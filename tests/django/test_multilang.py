@@ -0,0 +1,101 @@
+from django.test import TestCase
+from rest_framework import generics, serializers
+from rest_framework.test import APIRequestFactory
+
+from gramedia.django.drf import FullCamelCaseRenderer, SummaryCamelCaseRenderer
+from gramedia.django.multilang import (
+    MultilangProjectionMixin, MultilangProjectionSerializerMixin, project_language)
+from tests.django.testapp.models import Series
+
+
+class SeriesSerializer(MultilangProjectionSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Series
+        fields = ['id', 'name', 'description', 'code']
+
+
+class SeriesListView(MultilangProjectionMixin, generics.ListCreateAPIView):
+    authentication_classes = []
+    permission_classes = []
+    queryset = Series.objects.order_by('pk')
+    serializer_class = SeriesSerializer
+    multilang_fields = ('name', 'description', )
+    renderer_classes = (SummaryCamelCaseRenderer, FullCamelCaseRenderer, )
+
+
+class MultilangTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.translated = Series.objects.create(
+            name={'en': 'Harry Potter', 'id': 'Harry Potter (ID)'},
+            description={'en': 'Wizards', 'id': 'Penyihir'}, code='hp')
+        cls.english_only = Series.objects.create(
+            name={'en': 'Discworld'}, description={'en': 'Turtles'}, code='dw')
+
+
+class ProjectLanguageTests(MultilangTestCase):
+
+    def project(self, language):
+        return list(project_language(Series.objects.order_by('pk'), ('name', 'description'), language))
+
+    def test_chosen_language(self):
+        series = self.project('id')[0]
+        self.assertEqual(series.name_translated, 'Harry Potter (ID)')
+        self.assertEqual(series.description_translated, 'Penyihir')
+
+    def test_fallback_to_default_language(self):
+        series = self.project('id-ID')[1]
+        self.assertEqual(series.name_translated, 'Discworld')
+        self.assertEqual(series.description_translated, 'Turtles')
+
+    def test_default_language(self):
+        self.assertListEqual([series.name_translated for series in self.project('en')],
+                             ['Harry Potter', 'Discworld'])
+
+    def test_fields_are_deferred(self):
+        series = self.project('id')[0]
+        self.assertSetEqual(series.get_deferred_fields(), {'name', 'description'})
+        with self.assertNumQueries(0):
+            self.assertEqual(series.code, 'hp')
+
+
+class MultilangProjectionMixinTests(MultilangTestCase):
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def call(self, request):
+        response = SeriesListView.as_view()(request)
+        response.render()
+        return response
+
+    def test_summary_is_projected(self):
+        response = self.call(self.factory.get('/series/', HTTP_ACCEPT_LANGUAGE='id'))
+        self.assertDictEqual(dict(response.data[0]), {
+            'id': self.translated.pk, 'name': 'Harry Potter (ID)', 'description': 'Penyihir', 'code': 'hp'})
+        self.assertEqual(response.data[1]['name'], 'Discworld')
+
+    def test_full_renderer_is_not_projected(self):
+        response = self.call(self.factory.get('/series/?format=json%2Bfull', HTTP_ACCEPT_LANGUAGE='id'))
+        self.assertDictEqual(response.data[0]['name'], self.translated.name)
+
+    def test_writes_are_not_projected(self):
+        response = self.call(self.factory.post(
+            '/series/', {'name': {'en': 'Dune'}, 'description': {'en': 'Sand'}, 'code': 'du'}, format='json'))
+        self.assertEqual(response.status_code, 201)
+        self.assertDictEqual(response.data['name'], {'en': 'Dune'})
+
+
+class MultilangProjectionSerializerMixinTests(MultilangTestCase):
+
+    def test_projected_fields(self):
+        series = project_language(Series.objects.filter(pk=self.translated.pk), ('name', ), 'id').get()
+        serializer = SeriesSerializer(series, context={'projected_multilang_fields': ('name', 'missing')})
+        self.assertIsInstance(serializer.fields['name'], serializers.CharField)
+        self.assertEqual(serializer.data['name'], 'Harry Potter (ID)')
+        self.assertDictEqual(serializer.data['description'], self.translated.description)
+
+    def test_without_projection(self):
+        serializer = SeriesSerializer(self.translated)
+        self.assertDictEqual(serializer.data['name'], self.translated.name)
@@ -0,0 +1,66 @@
+from types import SimpleNamespace
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.test import TestCase
+
+from gramedia.django.drf import IsObjectOwner, IsOwner, OwnerFilterBackend
+from tests.django.testapp.models import Note
+
+
+class OwnershipTests(TestCase):
+
+    def setUp(self):
+        self.alice = User.objects.create(username='alice')
+        self.bob = User.objects.create(username='bob')
+        self.alice_note = Note.objects.create(owner=self.alice, text='a')
+        self.bob_note = Note.objects.create(owner=self.bob, text='b')
+        self.orphan = Note.objects.create(owner=None, text='orphan')
+
+    def request(self, user):
+        return SimpleNamespace(user=user)
+
+    def view(self, queryset=None):
+        return SimpleNamespace(queryset=queryset, owner_field='owner')
+
+    def is_owner(self, user, queryset):
+        return IsOwner().has_permission(self.request(user), self.view(queryset))
+
+    def is_object_owner(self, user, obj):
+        permission = IsObjectOwner()
+        request, view = self.request(user), self.view()
+        return permission.has_permission(request, view) and permission.has_object_permission(request, view, obj)
+
+    def test_owner(self):
+        self.assertTrue(self.is_owner(self.alice, Note.objects.filter(pk=self.alice_note.pk)))
+        self.assertTrue(self.is_object_owner(self.alice, self.alice_note))
+
+    def test_other_user(self):
+        self.assertFalse(self.is_owner(self.bob, Note.objects.filter(pk=self.alice_note.pk)))
+        self.assertFalse(self.is_object_owner(self.bob, self.alice_note))
+
+    def test_anonymous_user_and_null_owner(self):
+        self.assertFalse(self.is_owner(AnonymousUser(), Note.objects.filter(pk=self.orphan.pk)))
+        self.assertFalse(IsObjectOwner().has_object_permission(
+            self.request(AnonymousUser()), self.view(), self.orphan))
+        self.assertFalse(self.is_object_owner(AnonymousUser(), self.orphan))
+
+    def test_null_owner(self):
+        self.assertFalse(self.is_owner(self.alice, Note.objects.filter(pk=self.orphan.pk)))
+        self.assertFalse(self.is_object_owner(self.alice, self.orphan))
+
+    def test_multiple_rows(self):
+        Note.objects.create(owner=self.alice, text='another')
+        self.assertFalse(self.is_owner(self.alice, Note.objects.filter(owner=self.alice)))
+        self.assertFalse(self.is_owner(self.alice, Note.objects.exclude(owner=None)))
+
+    def test_only_the_owner_id_is_fetched(self):
+        with self.assertNumQueries(1) as queries:
+            self.is_owner(self.alice, Note.objects.filter(pk=self.alice_note.pk))
+        self.assertNotIn('text', queries.captured_queries[0]['sql'])
+
+    def test_filter_backend(self):
+        backend = OwnerFilterBackend()
+        queryset = Note.objects.all()
+        self.assertListEqual(
+            list(backend.filter_queryset(self.request(self.alice), queryset, self.view())), [self.alice_note])
+        self.assertFalse(backend.filter_queryset(self.request(AnonymousUser()), queryset, self.view()).exists())
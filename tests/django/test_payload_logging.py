@@ -0,0 +1,71 @@
+from unittest import mock
+
+from django.contrib.auth.models import Group, User
+from django.contrib.sites.models import Site
+from django.test import TestCase, override_settings
+from kombu import Connection
+
+from gramedia.django.queue.security.access_group_user import process_security_auth_group_message
+from gramedia.django.signalling import BasicPublisher, EventType, get_payload_logger
+from gramedia.django.sites import site_registry
+
+
+class PayloadLoggingTestCase(TestCase):
+
+    def setUp(self):
+        # the payload logger reads its settings once.
+        get_payload_logger.cache_clear()
+        self.addCleanup(get_payload_logger.cache_clear)
+
+
+class GetPayloadLoggerTests(PayloadLoggingTestCase):
+
+    def test_cached(self):
+        self.assertIs(get_payload_logger(), get_payload_logger())
+
+
+@override_settings(LOG_PAYLOAD_MAX_LENGTH=20)
+class PublishTests(PayloadLoggingTestCase):
+
+    def test_payload_is_truncated(self):
+        connection = Connection('memory://')
+        self.addCleanup(connection.release)
+        # the memory transport's channels can't declare exchanges.
+        publisher = BasicPublisher('books', Site(domain='example.com'), connection, mock.Mock())
+
+        with self.assertLogs('LOG', 'INFO') as logs:
+            publisher.publish({'href': 'https://example.com/books/1/', 'summary': 'x' * 100}, None,
+                              EventType.changed, 'book')
+        self.assertEqual(len(logs.records), 1)
+        message = logs.records[0].getMessage()
+        self.assertTrue(message.startswith('QUEUE Publish example.com-book:changed - {'), message)
+        self.assertIn('characters)', message)
+        self.assertNotIn('x' * 100, message)
+
+
+@override_settings(LOG_PAYLOAD_SAMPLE_RATES={'access-group-user': 0})
+class AccessGroupUserTests(PayloadLoggingTestCase):
+
+    def setUp(self):
+        super().setUp()
+        site_registry.load()
+        self.user = User.objects.create(username='reader')
+        self.group = Group.objects.create(name='readers')
+
+    def test_payload_is_sampled(self):
+        message = {
+            'event_type': EventType.assigned.value,
+            'entity_type': 'access-group-user',
+            'identity': 'https://example.com/api/iam/user/reader/',
+            'data': {'access_group': self.group.pk},
+        }
+        with self.assertNoLogs('LOG', 'INFO'):
+            process_security_auth_group_message(message)
+        self.assertListEqual(list(self.user.groups.all()), [self.group])
+
+        with override_settings(LOG_PAYLOAD_SAMPLE_RATES={}), self.assertLogs('LOG', 'INFO') as logs:
+            get_payload_logger.cache_clear()
+            process_security_auth_group_message({**message, 'event_type': EventType.revoked.value})
+        self.assertIn("SECAGUSER Receive business access-group-user:revoked - {'access_group'",
+                      logs.records[0].getMessage())
+        self.assertListEqual(list(self.user.groups.all()), [])
@@ -0,0 +1,185 @@
+import time
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import path
+from kombu import Connection, Producer
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+
+from gramedia.django.signalling import BasicRpcClient
+from gramedia.django.utils.test_helper import BudgetExceeded, PerformanceBudget, assert_api_budget
+from tests.django.testapp.models import Tag
+
+pytest_plugins = ['pytester']
+
+
+class TagsView(APIView):
+    authentication_classes = []
+    permission_classes = []
+
+    def get(self, request):
+        # one query per tag, on purpose.
+        names = [Tag.objects.get(pk=pk).name for pk in Tag.objects.values_list('pk', flat=True)]
+        if 'sleep' in request.query_params:
+            time.sleep(float(request.query_params['sleep']))
+        return Response(names)
+
+
+urlpatterns = [path('tags/', TagsView.as_view())]
+
+
+def fake_rpc_call(client, message, event_type, entity_type, site):
+    Producer(client.connection).publish(message, routing_key=client.routing_key)
+    return {'ok': True}
+
+
+class PerformanceBudgetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Tag.objects.bulk_create([Tag(name=f'tag {index}') for index in range(3)])
+
+    def publish(self):
+        with Connection('memory://') as connection:
+            Producer(connection).publish({'id': 1}, exchange='books', routing_key='book.updated')
+
+    def test_within_budget(self):
+        with PerformanceBudget(max_queries=2, max_publishes=1, max_seconds=5) as budget:
+            list(Tag.objects.all())
+            list(Tag.objects.all())
+            self.publish()
+        self.assertEqual((budget.queries, budget.publishes), (2, 1))
+        self.assertListEqual(budget.published, [('books', 'book.updated')])
+        self.assertLess(budget.elapsed, 5)
+
+    def test_too_many_queries(self):
+        with self.assertRaises(BudgetExceeded) as raised, PerformanceBudget(max_queries=2):
+            for pk in Tag.objects.values_list('pk', flat=True):
+                Tag.objects.get(pk=pk)
+        message = str(raised.exception)
+        self.assertIn('4 SQL queries, the budget is 2.', message)
+        self.assertIn('Duplicated queries:', message)
+        self.assertIn('3x SELECT', message)
+        self.assertIn('3x from:', message)
+
+    def test_too_slow(self):
+        with self.assertRaisesRegex(BudgetExceeded, r'took 0\.\d+s, the budget is 0\.01s'), \
+                PerformanceBudget(max_seconds=0.01):
+            time.sleep(0.05)
+
+    def test_too_many_publishes(self):
+        with self.assertRaisesRegex(BudgetExceeded, '2 broker publishes, the budget is 1'), \
+                PerformanceBudget(max_publishes=1):
+            self.publish()
+            self.publish()
+
+    def test_rpc_calls(self):
+        client = BasicRpcClient.__new__(BasicRpcClient)
+        client.connection, client.routing_key = Connection('memory://'), 'rpc.books'
+        with mock.patch.object(BasicRpcClient, 'call', fake_rpc_call), \
+                self.assertRaisesRegex(BudgetExceeded, '2 RPC calls, the budget is 1'), \
+                PerformanceBudget(max_rpc_calls=1, max_publishes=0) as budget:
+            client.call({}, 'get', 'book', None)
+            client.call({}, event_type='get', entity_type='book', site=None)
+        # the calls' request messages aren't counted as publishes.
+        self.assertEqual(budget.publishes, 0)
+        self.assertListEqual(budget.rpc_calls, [('rpc.books', 'get', 'book')] * 2)
+
+    def test_errors_are_not_hidden(self):
+        with self.assertRaises(KeyError), PerformanceBudget(max_queries=0):
+            list(Tag.objects.all())
+            raise KeyError('original')
+
+    def test_using(self):
+        with PerformanceBudget(max_queries=0, using='replica') as budget:
+            list(Tag.objects.using('default'))
+        self.assertEqual(budget.queries, 0)
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AssertApiBudgetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Tag.objects.bulk_create([Tag(name=f'tag {index}') for index in range(3)])
+
+    def test_within_budget(self):
+        response = assert_api_budget(APIClient(), 'GET', '/tags/', max_queries=4, max_seconds=5)
+        self.assertEqual(len(response.data), 3)
+
+    def test_over_query_budget(self):
+        with self.assertRaisesRegex(BudgetExceeded, '4 SQL queries, the budget is 1'):
+            assert_api_budget(APIClient(), 'get', '/tags/', max_queries=1)
+
+    def test_over_time_budget(self):
+        with self.assertRaisesRegex(BudgetExceeded, 'the budget is 0.01s'):
+            assert_api_budget(APIClient(), 'get', '/tags/', max_seconds=0.01, data={'sleep': '0.05'})
+
+    def test_user(self):
+        client = APIClient()
+        assert_api_budget(client, 'get', '/tags/', user=User.objects.create(username='reader'))
+        self.assertTrue(client._credentials['HTTP_AUTHORIZATION'].startswith('Bearer '))
+
+
+PLUGIN_TESTS = """
+import time
+
+import pytest
+from django.db import connection
+
+
+def run_queries(count):
+    with connection.cursor() as cursor:
+        for _ in range(count):
+            cursor.execute('SELECT 1')
+
+
+@pytest.fixture
+def warmed_up():
+    # fixtures aren't measured.
+    run_queries(5)
+
+
+@pytest.mark.performance_budget(max_queries=2)
+def test_within_budget(warmed_up):
+    run_queries(2)
+
+
+@pytest.mark.performance_budget(max_queries=2)
+def test_too_many_queries():
+    run_queries(3)
+
+
+@pytest.mark.performance_budget(max_seconds=0.01)
+def test_too_slow():
+    time.sleep(0.05)
+
+
+@pytest.mark.performance_budget(max_queries=0)
+def test_failure_is_kept():
+    run_queries(1)
+    assert False, 'the original failure'
+
+
+def test_fixture(performance_budget):
+    run_queries(3)
+    with pytest.raises(AssertionError, match='2 SQL queries, the budget is 1'):
+        with performance_budget(max_queries=1):
+            run_queries(2)
+"""
+
+
+def test_pytest_plugin(pytester):
+    pytester.makepyfile(test_budgets=PLUGIN_TESTS)
+    result = pytester.runpytest_inprocess('-p', 'gramedia.django.utils.pytest_plugin')
+
+    result.assert_outcomes(passed=2, failed=3)
+    result.stdout.fnmatch_lines([
+        '*BudgetExceeded: 3 SQL queries, the budget is 2.*',
+        '*BudgetExceeded: took *s, the budget is 0.01s.*',
+        '*AssertionError: the original failure*',
+    ])
+    result.stdout.no_fnmatch_line('*1 SQL queries, the budget is 0.*')
@@ -0,0 +1,69 @@
+import time
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.exceptions import PermissionDenied
+
+from gramedia.django.drf import JWTNusantaraAuthentication
+from gramedia.django.utils.test_helper import gen_test_user_token
+
+IAM_ALLOWED = {'data': {'is_staff': True, 'can_use_pos': True, 'warehouses': ['WH1']}}
+
+
+@override_settings(JWT_POS_AUTHORIZATION='claims')
+class PosAuthorizationTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username='cashier', is_staff=True)
+
+    def authenticate(self, token):
+        request = RequestFactory().get(
+            '/', HTTP_HOST='example.com', HTTP_AUTHORIZATION=f'Bearer {token}',
+            HTTP_USER_AGENT='Bhisma POS-v1.0.0', HTTP_WAREHOUSE='WH1')
+        return JWTNusantaraAuthentication().authenticate(request)
+
+    def token(self, issued_ago=0, **kwargs):
+        token = gen_test_user_token(self.user, **kwargs)
+        token['iat'] = int(time.time() - issued_ago)
+        return token
+
+    @patch('gramedia.django.drf.BasicRpcClient')
+    def test_fresh_claims(self, rpc_client):
+        user, _ = self.authenticate(self.token(is_pos=True, warehouses=['WH1']))
+        self.assertEqual(user, self.user)
+        rpc_client.assert_not_called()
+
+    @patch('gramedia.django.drf.BasicRpcClient')
+    def test_fresh_claims_denying_access(self, rpc_client):
+        with self.assertRaises(PermissionDenied):
+            self.authenticate(self.token(is_pos=True, warehouses=['WH2']))
+        rpc_client.assert_not_called()
+
+    @patch('gramedia.django.drf.BasicRpcClient')
+    def test_stale_claims(self, rpc_client):
+        rpc_client.return_value.call.return_value = IAM_ALLOWED
+        # the claims deny access, but are older than the default maximum age: IAM is asked instead.
+        user, _ = self.authenticate(self.token(issued_ago=3600, is_pos=False))
+        self.assertEqual(user, self.user)
+        rpc_client.return_value.call.assert_called_once()
+
+    @override_settings(JWT_POS_CLAIMS_MAX_AGE=None)
+    @patch('gramedia.django.drf.BasicRpcClient')
+    def test_max_age_disabled(self, rpc_client):
+        self.authenticate(self.token(issued_ago=3600, is_pos=True, warehouses=['WH1']))
+        rpc_client.assert_not_called()
+
+    @patch('gramedia.django.drf.BasicRpcClient')
+    def test_failed_iam_lookup(self, rpc_client):
+        rpc_client.return_value.call.return_value = {}
+        with self.assertRaises(PermissionDenied):
+            self.authenticate(self.token(issued_ago=3600, is_pos=True, warehouses=['WH1']))
+
+    @override_settings(JWT_POS_AUTHORIZATION='rpc')
+    @patch('gramedia.django.drf.BasicRpcClient')
+    def test_rpc_mode_ignores_claims(self, rpc_client):
+        rpc_client.return_value.call.return_value = {'data': None}
+        with self.assertRaises(PermissionDenied):
+            self.authenticate(self.token(is_pos=True, warehouses=['WH1']))
+        rpc_client.return_value.call.assert_called_once()
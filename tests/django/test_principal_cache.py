@@ -0,0 +1,141 @@
+import time
+from unittest import TestCase as SimpleTestCase
+from unittest.mock import patch
+
+from django.contrib.auth.models import Group, Permission, User
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+from gramedia.django.drf import JWTNusantaraAuthentication
+from gramedia.django.principal_cache import PrincipalCache, principal_cache
+from gramedia.django.sites import site_registry
+from gramedia.django.utils.test_helper import gen_test_user_token
+
+
+class FakeSite:
+    pk = 1
+
+
+def fake_user(pk, is_active=True):
+    return User(pk=pk, username=f'user{pk}', is_active=is_active)
+
+
+class PrincipalCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        self.cache = PrincipalCache(max_entries=2)
+
+    def test_hit(self):
+        self.cache.set('token', {'exp': time.time() + 60}, fake_user(1), FakeSite())
+        principal = self.cache.get('token')
+        self.assertEqual((principal.user_pk, principal.is_active, principal.site_id), (1, True, 1))
+        self.assertFalse(hasattr(principal, 'user'))
+
+    def test_make_user(self):
+        self.cache.set('token', {'exp': time.time() + 60}, fake_user(1), FakeSite())
+        principal = self.cache.get('token')
+        user = principal.make_user()
+        self.assertEqual((user.pk, user.username, user.is_active), (1, 'user1', True))
+        self.assertIsNot(principal.make_user(), user)
+
+    def test_expired(self):
+        self.cache.set('token', {'exp': time.time() - 1}, fake_user(1), FakeSite())
+        self.assertIsNone(self.cache.get('token'))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_token_without_expiry_is_not_cached(self):
+        self.cache.set('token', {}, fake_user(1), FakeSite())
+        self.assertIsNone(self.cache.get('token'))
+
+    def test_eviction(self):
+        for index in range(3):
+            self.cache.set(f'token{index}', {'exp': time.time() + 60}, fake_user(index), FakeSite())
+        self.assertEqual(len(self.cache), 2)
+        self.assertIsNone(self.cache.get('token0'))
+        self.assertIsNotNone(self.cache.get('token2'))
+
+    def test_invalidate_user(self):
+        self.cache.set('a', {'exp': time.time() + 60}, fake_user(1), FakeSite())
+        self.cache.set('b', {'exp': time.time() + 60}, fake_user(2), FakeSite())
+        self.cache.invalidate_user(1)
+        self.assertIsNone(self.cache.get('a'))
+        self.assertIsNotNone(self.cache.get('b'))
+
+
+class PrincipalCacheInvalidationTests(TestCase):
+
+    def setUp(self):
+        principal_cache.clear()
+        self.user = User.objects.create(username='reader')
+        self.group = Group.objects.create(name='editors')
+        principal_cache.set('token', {'exp': time.time() + 60}, self.user, FakeSite())
+
+    def test_user_saved(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(principal_cache.get('token'))
+
+    def test_user_deleted(self):
+        self.user.delete()
+        self.assertIsNone(principal_cache.get('token'))
+
+    def test_groups_changed(self):
+        self.user.groups.add(self.group)
+        self.assertIsNone(principal_cache.get('token'))
+
+    def test_groups_changed_from_the_group(self):
+        self.group.user_set.add(self.user)
+        self.assertIsNone(principal_cache.get('token'))
+
+    def test_permissions_changed(self):
+        self.user.user_permissions.add(Permission.objects.first())
+        self.assertIsNone(principal_cache.get('token'))
+
+    def test_other_users_are_kept(self):
+        User.objects.create(username='other').groups.add(self.group)
+        self.assertIsNotNone(principal_cache.get('token'))
+
+
+@override_settings(JWT_PRINCIPAL_CACHE=True)
+class CachedAuthenticationTests(TestCase):
+
+    def setUp(self):
+        site_registry.load()
+        principal_cache.clear()
+        self.user = User.objects.create(username='reader')
+        self.header = f'Bearer {gen_test_user_token(self.user)}'
+
+    def authenticate(self):
+        request = RequestFactory().get('/', HTTP_HOST='example.com', HTTP_AUTHORIZATION=self.header)
+        return JWTNusantaraAuthentication().authenticate(request)
+
+    def test_repeat_requests_skip_token_validation(self):
+        first, _ = self.authenticate()
+        with patch.object(JWTNusantaraAuthentication, 'get_validated_token') as validate:
+            second, _ = self.authenticate()
+        validate.assert_not_called()
+        self.assertEqual(first, second)
+        # a fresh instance, not one shared between requests.
+        self.assertIsNot(first, second)
+
+    def test_repeat_requests_skip_queries(self):
+        self.authenticate()
+        with self.assertNumQueries(0):
+            user, _ = self.authenticate()
+        self.assertEqual((user.pk, user.username, user.is_active), (self.user.pk, 'reader', True))
+        self.assertEqual(user._state.db, 'default')
+        self.assertFalse(user._state.adding)
+
+    def test_deactivated_user(self):
+        self.authenticate()
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_deleted_user(self):
+        self.authenticate()
+        User.objects.filter(pk=self.user.pk).delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+        self.assertEqual(len(principal_cache), 0)
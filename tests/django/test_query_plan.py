@@ -0,0 +1,157 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework import generics, serializers
+from rest_framework.test import APIRequestFactory
+
+from gramedia.django.query_plan import QueryPlanMixin, log_repeated_queries, plan_serializer
+from gramedia.django.serializers import EntityHrefField
+from tests.django.testapp.models import Author, Book, Note, Tag
+
+
+class AuthorSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Author
+        fields = ['name', 'slug']
+
+
+class BookSerializer(serializers.ModelSerializer):
+    author = AuthorSerializer(read_only=True)
+    tags = serializers.SlugRelatedField(many=True, read_only=True, slug_field='name')
+
+    class Meta:
+        model = Book
+        fields = ['id', 'title', 'author', 'tags']
+
+
+class AuthorBooksSerializer(serializers.ModelSerializer):
+    books = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+
+    class Meta:
+        model = Author
+        fields = ['name', 'books']
+
+
+class ShoutedBookSerializer(serializers.ModelSerializer):
+    shouted = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Book
+        fields = ['title', 'author', 'shouted']
+
+    def get_shouted(self, book):
+        return book.title.upper()
+
+
+class NoteSerializer(serializers.ModelSerializer):
+    # auth.User has no `name` field for EntityHrefField's title.
+    owner = EntityHrefField(view_name='user-detail', lookup_field='username', read_only=True)
+
+    class Meta:
+        model = Note
+        fields = ['text', 'owner']
+
+
+class BookListView(QueryPlanMixin, generics.ListCreateAPIView):
+    queryset = Book.objects.all()
+    serializer_class = BookSerializer
+
+
+class PlanSerializerTests(TestCase):
+
+    def test_nested_serializer(self):
+        select_related, prefetch_related, only = plan_serializer(BookSerializer).lookups()
+        self.assertListEqual(select_related, ['author'])
+        self.assertListEqual(only, ['author', 'id', 'title', 'author__name', 'author__slug'])
+
+    def test_many_to_many(self):
+        _, prefetch_related, _ = plan_serializer(BookSerializer).lookups()
+        self.assertListEqual([prefetch.prefetch_through for prefetch in prefetch_related], ['tags'])
+        self.assertEqual(prefetch_related[0].queryset.query.deferred_loading, ({'name'}, False))
+
+    def test_reverse_foreign_key(self):
+        select_related, prefetch_related, only = plan_serializer(AuthorBooksSerializer).lookups()
+        self.assertListEqual(select_related, [])
+        self.assertListEqual(only, ['name'])
+        # the prefetched books need their foreign key, to be matched back to their author.
+        self.assertEqual(prefetch_related[0].queryset.query.deferred_loading, ({'author'}, False))
+
+    def test_lookup_fields_that_are_not_model_fields(self):
+        plan = plan_serializer(NoteSerializer)
+        select_related, prefetch_related, only = plan.lookups()
+        self.assertListEqual(select_related, ['owner'])
+        self.assertIsNone(only)
+
+        Note.objects.create(owner=User.objects.create(username='reader'), text='hello')
+        with self.assertNumQueries(1):
+            note = plan.apply(Note.objects.all()).get()
+            self.assertEqual(note.owner.username, 'reader')
+
+    def test_method_fields_load_the_whole_row(self):
+        select_related, prefetch_related, only = plan_serializer(ShoutedBookSerializer).lookups()
+        self.assertListEqual(select_related, [])
+        self.assertListEqual(prefetch_related, [])
+        self.assertIsNone(only)
+
+
+class QueryPlanMixinTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        tags = [Tag.objects.create(name=name) for name in ('fantasy', 'classic')]
+        for index in range(3):
+            author = Author.objects.create(name=f'Author {index}')
+            book = Book.objects.create(author=author, title=f'Book {index}')
+            book.tags.set(tags)
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def get_queryset(self, request):
+        view = BookListView()
+        view.setup(request)
+        view.request = view.initialize_request(request)
+        view.format_kwarg = None
+        return view.get_queryset()
+
+    def test_list_is_planned(self):
+        with self.assertNumQueries(2):
+            response = BookListView.as_view()(self.factory.get('/books/'))
+        self.assertEqual(len(response.data), 3)
+        self.assertListEqual(response.data[0]['tags'], ['fantasy', 'classic'])
+        self.assertEqual(response.data[0]['author']['name'], 'Author 0')
+
+        queryset = self.get_queryset(self.factory.get('/books/'))
+        self.assertEqual(queryset.query.deferred_loading[1], False)
+
+    def test_writes_are_not_planned(self):
+        for method in ('post', 'put', 'patch', 'delete'):
+            with self.subTest(method):
+                queryset = self.get_queryset(getattr(self.factory, method)('/books/'))
+                self.assertEqual(queryset.query.deferred_loading, (frozenset(), True))
+                self.assertFalse(queryset.query.select_related)
+                self.assertListEqual(list(queryset._prefetch_related_lookups), [])
+
+
+class LogRepeatedQueriesTests(TestCase):
+    databases = {'default', 'replica'}
+
+    def test_repeated_queries(self):
+        with self.assertLogs('DRFCommon', 'WARNING') as logs, log_repeated_queries('books') as counts:
+            for pk in (1, 2, 3):
+                list(Book.objects.filter(pk=pk))
+            Author.objects.count()
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn('ran 3 times', logs.records[0].getMessage())
+        self.assertEqual(sum(counts.values()), 4)
+
+    def test_all_databases(self):
+        with self.assertLogs('DRFCommon', 'WARNING') as logs, log_repeated_queries('books'):
+            for pk in (1, 2):
+                list(Book.objects.using('replica').filter(pk=pk))
+        self.assertEqual(len(logs.records), 1)
+
+    def test_one_database(self):
+        with log_repeated_queries('books', using='default') as counts:
+            for pk in (1, 2):
+                list(Book.objects.using('replica').filter(pk=pk))
+        self.assertEqual(len(counts), 0)
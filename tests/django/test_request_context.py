@@ -0,0 +1,109 @@
+from unittest.mock import patch
+
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from rest_framework.request import Request
+
+from gramedia.django.middleware import RequestContextMiddleware
+from gramedia.django.request_context import get_request_language, get_request_site, get_request_user_agent
+from gramedia.django.sites import site_registry
+from gramedia.django.utils.helpers import parse_ua
+
+POS_USER_AGENT = 'Bhisma POS-v1.0.0'
+
+
+class RequestContextTests(TestCase):
+
+    def setUp(self):
+        site_registry.load()
+        parse_ua.cache_clear()
+        self.factory = RequestFactory()
+
+    def make_request(self, language='id'):
+        return self.factory.get('/', HTTP_HOST='example.com', HTTP_USER_AGENT=POS_USER_AGENT,
+                                HTTP_ACCEPT_LANGUAGE=language)
+
+    def test_computed_once_per_request(self):
+        request = self.make_request()
+        with patch('gramedia.django.request_context.get_language_from_request',
+                   return_value='id') as get_language, \
+                patch.object(site_registry, 'get_current', wraps=site_registry.get_current) as get_current, \
+                patch('gramedia.django.utils.helpers.NusantaraUserAgent') as user_agent_class:
+            for _ in range(3):
+                get_request_language(request)
+                get_request_site(request)
+                get_request_user_agent(request)
+
+        self.assertEqual(get_language.call_count, 1)
+        self.assertEqual(get_current.call_count, 1)
+        self.assertEqual(user_agent_class.call_count, 1)
+
+    def test_shared_with_drf_requests(self):
+        request = self.make_request()
+        drf_request = Request(request)
+        self.assertIs(get_request_user_agent(drf_request), get_request_user_agent(request))
+        self.assertIs(get_request_site(drf_request), get_request_site(request))
+        self.assertEqual(get_request_language(drf_request), 'id')
+        self.assertEqual(request._gramedia_language, 'id')
+
+    def test_reset_between_requests(self):
+        self.assertEqual(get_request_language(self.make_request('id')), 'id')
+        self.assertEqual(get_request_language(self.make_request('en')), 'en')
+
+        first, second = self.make_request(), self.make_request()
+        get_request_site(first)
+        self.assertNotIn('site', vars(second))
+        with patch.object(site_registry, 'get_current', wraps=site_registry.get_current) as get_current:
+            self.assertEqual(get_request_site(second).domain, 'example.com')
+        get_current.assert_called_once()
+
+    def test_user_agents_are_parsed_once(self):
+        get_request_user_agent(self.make_request())
+        get_request_user_agent(self.make_request())
+        info = parse_ua.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 1))
+
+        # a new request still gets the cached parse, but nothing is carried over on the request itself.
+        request = self.make_request()
+        self.assertFalse(hasattr(request, '_gramedia_user_agent'))
+        self.assertIs(get_request_user_agent(request), parse_ua(POS_USER_AGENT))
+
+
+class RequestContextMiddlewareTests(TestCase):
+
+    def setUp(self):
+        parse_ua.cache_clear()
+        self.factory = RequestFactory()
+        self.seen = []
+
+    def view(self, request):
+        self.seen.append((request.language, request.user_agent))
+        return HttpResponse()
+
+    def test_lazy_values(self):
+        middleware = RequestContextMiddleware(self.view)
+        request = self.factory.get('/', HTTP_USER_AGENT=POS_USER_AGENT, HTTP_ACCEPT_LANGUAGE='id')
+        with patch('gramedia.django.request_context.get_language_from_request',
+                   return_value='id') as get_language, \
+                patch('gramedia.django.utils.helpers.NusantaraUserAgent') as user_agent_class:
+            middleware(request)
+            get_language.assert_not_called()
+            user_agent_class.assert_not_called()
+
+            self.assertEqual(str(request.language), 'id')
+            self.assertEqual(str(request.language), 'id')
+            request.user_agent.device_name
+            request.user_agent.device_name
+
+        self.assertEqual(get_language.call_count, 1)
+        self.assertEqual(user_agent_class.call_count, 1)
+
+    def test_each_request_gets_its_own_values(self):
+        middleware = RequestContextMiddleware(self.view)
+        middleware(self.factory.get('/', HTTP_USER_AGENT=POS_USER_AGENT, HTTP_ACCEPT_LANGUAGE='id'))
+        middleware(self.factory.get('/', HTTP_USER_AGENT='Mozilla/5.0', HTTP_ACCEPT_LANGUAGE='en'))
+
+        (first_language, first_agent), (second_language, second_agent) = self.seen
+        self.assertEqual((str(first_language), str(second_language)), ('id', 'en'))
+        self.assertEqual(first_agent.ua_string, POS_USER_AGENT)
+        self.assertEqual(second_agent.ua_string, 'Mozilla/5.0')
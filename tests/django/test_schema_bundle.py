@@ -0,0 +1,136 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+from jsonschema import RefResolutionError
+
+from gramedia.common.jsonschema import DEFAULT_BASE_URL
+from gramedia.django import jsonschema as django_jsonschema
+from gramedia.django.jsonschema import (
+    DjangoDraft4Validator, DjangoSchemaResolver, SchemaBundle, SchemaBundleError, build_schema_bundle,
+    schema_registry,
+)
+
+SCHEMAS = {
+    'address.json': {
+        'type': 'object',
+        'properties': {'city': {'type': 'string'}, 'zip': {'$ref': 'common.json#/definitions/zip'}},
+        'required': ['city'],
+    },
+    'common.json': {
+        'definitions': {'zip': {'type': 'string', 'pattern': '^[0-9]{5}$'}},
+    },
+    'person.json': {
+        'type': 'object',
+        'properties': {
+            'name': {'$ref': '#/definitions/name'},
+            'address': {'$ref': 'address.json'},
+        },
+        'required': ['name'],
+        'definitions': {'name': {'type': 'string', 'minLength': 1}},
+    },
+    'tree.json': {
+        'type': 'object',
+        'properties': {
+            'value': {'type': 'integer'},
+            'children': {'type': 'array', 'items': {'$ref': '#'}},
+        },
+    },
+}
+
+DOCUMENTS = {
+    'person.json': [
+        {'name': 'Ana'},
+        {'name': 'Ana', 'address': {'city': 'Jakarta', 'zip': '12345'}},
+        {'name': ''},
+        {'name': 'Ana', 'address': {'zip': 'abc'}},
+        {'address': {'city': 1}},
+    ],
+    'tree.json': [
+        {'value': 1, 'children': [{'value': 2, 'children': [{'value': 3}]}]},
+        {'value': 1, 'children': [{'value': 2, 'children': [{'value': 'three'}]}]},
+    ],
+}
+
+
+class SchemaBundleTests(SimpleTestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.base_dir = tmp.name
+        self.bundle_path = os.path.join(self.base_dir, 'schemas.bundle.json')
+        self.write_schemas(SCHEMAS)
+
+        settings = self.settings(BASE_DIR=self.base_dir)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        schema_registry.clear()
+        self.addCleanup(schema_registry.clear)
+        self.addCleanup(setattr, django_jsonschema, '_bundle', None)
+
+    def write_schemas(self, schemas):
+        schema_dir = os.path.join(self.base_dir, 'tests', 'django', 'testapp', 'static', 'schemas')
+        os.makedirs(schema_dir, exist_ok=True)
+        for name, schema in schemas.items():
+            with open(os.path.join(schema_dir, name), 'w') as fp:
+                json.dump(schema, fp)
+
+    def errors(self, validator, document):
+        return sorted((error.message, list(error.absolute_path)) for error in validator.iter_errors(document))
+
+    def test_nested_refs_are_inlined(self):
+        bundle = build_schema_bundle(version='v1')
+        person = bundle['schemas']['person.json']
+        self.assertNotIn('$ref', json.dumps(person))
+        self.assertEqual(person['properties']['name'], {'type': 'string', 'minLength': 1})
+        self.assertEqual(person['properties']['address']['properties']['zip']['pattern'], '^[0-9]{5}$')
+        self.assertEqual(bundle['documents']['person.json'], SCHEMAS['person.json'])
+        self.assertEqual((bundle['version'], bundle['base_url']), ('v1', DEFAULT_BASE_URL))
+
+    def test_recursive_refs_are_kept(self):
+        tree = build_schema_bundle()['schemas']['tree.json']
+        self.assertEqual(tree['properties']['children']['items'], {'$ref': f'{DEFAULT_BASE_URL}tree.json#'})
+
+    def test_missing_ref(self):
+        self.write_schemas({'broken.json': {'properties': {'x': {'$ref': 'missing.json'}}}})
+        with self.assertRaisesRegex(SchemaBundleError, 'broken.json'):
+            build_schema_bundle()
+        with self.assertRaises(CommandError):
+            call_command('build_schema_bundle', output=self.bundle_path, stdout=StringIO())
+        self.assertFalse(os.path.exists(self.bundle_path))
+
+    def test_same_results_with_and_without_the_bundle(self):
+        bundle = SchemaBundle(build_schema_bundle())
+        for name, documents in DOCUMENTS.items():
+            schema = schema_registry.get(name)
+            from_files = DjangoDraft4Validator(schema, DjangoSchemaResolver(f'{DEFAULT_BASE_URL}{name}', schema))
+            for document in documents:
+                with self.subTest(schema=name, document=document):
+                    self.assertEqual(self.errors(bundle.validator(name), document), self.errors(from_files, document))
+        self.assertTrue(any(self.errors(bundle.validator('tree.json'), document)
+                            for document in DOCUMENTS['tree.json']))
+
+    def test_bundle_never_reads_other_urls(self):
+        bundle = SchemaBundle(build_schema_bundle())
+        with self.assertRaises(RefResolutionError):
+            bundle.resolver('person.json').resolve('https://example.com/schemas/other.json')
+
+    def test_command_and_resolver_fallback(self):
+        call_command('build_schema_bundle', output=self.bundle_path, bundle_version='v2', stdout=StringIO())
+        self.assertFalse(os.path.exists(f'{self.bundle_path}.tmp'))
+        self.assertEqual(SchemaBundle.load(self.bundle_path).version, 'v2')
+
+        schema = SCHEMAS['person.json']
+        with self.settings(JSONSCHEMA_BUNDLE=self.bundle_path, BASE_DIR=tempfile.gettempdir()):
+            # the schema files are gone: references are resolved from the bundle only.
+            schema_registry.clear()
+            validator = DjangoDraft4Validator(schema, DjangoSchemaResolver(f'{DEFAULT_BASE_URL}person.json', schema))
+            self.assertEqual(len(self.errors(validator, {'name': 'Ana', 'address': {'zip': 'abc'}})), 2)
+
+    def test_unsupported_format(self):
+        with self.assertRaises(SchemaBundleError):
+            SchemaBundle({'format': 0})
@@ -0,0 +1,114 @@
+import json
+import os
+import tempfile
+
+from django.test import SimpleTestCase, override_settings
+
+from gramedia.common import jsonschema as common_jsonschema
+from gramedia.common.jsonschema import DEFAULT_BASE_URL, CorJsonResolver
+from gramedia.django.jsonschema import SchemaRegistry
+
+
+class SchemaRegistryTests(SimpleTestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.base_dir = tmp.name
+        self.mtime = 1000
+
+        settings = self.settings(BASE_DIR=self.base_dir, DEBUG=False)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.registry = SchemaRegistry()
+
+    def write(self, app: str, name: str, schema: dict):
+        schema_dir = os.path.join(self.base_dir, *app.split('.'), 'static', 'schemas')
+        os.makedirs(schema_dir, exist_ok=True)
+        path = os.path.join(schema_dir, name)
+        with open(path, 'w') as fp:
+            json.dump(schema, fp)
+        # a new modification time for every write, however quick.
+        self.mtime += 1
+        os.utime(path, (self.mtime, self.mtime))
+        return path
+
+    def test_scan(self):
+        gramedia_path = self.write('gramedia.django', 'book.json', {'title': 'gramedia'})
+        self.write('tests.django.testapp', 'book.json', {'title': 'testapp'})
+        self.write('tests.django.testapp', 'author.json', {'title': 'author'})
+        os.makedirs(os.path.join(self.base_dir, 'tests', 'django', 'testapp', 'static', 'schemas', 'nested'))
+
+        self.assertListEqual(self.registry.names(), ['author.json', 'book.json'])
+        # the app listed first in INSTALLED_APPS wins.
+        self.assertEqual(self.registry.find('book.json'), gramedia_path)
+        self.assertEqual(self.registry.get('book.json'), {'title': 'gramedia'})
+        self.assertIsNone(self.registry.find('missing.json'))
+        self.assertIsNone(self.registry.get('missing.json'))
+
+    def test_parsed_once(self):
+        self.write('gramedia.django', 'book.json', {'title': 'first'})
+        first = self.registry.get('book.json')
+        self.write('gramedia.django', 'book.json', {'title': 'second'})
+        self.assertIs(self.registry.get('book.json'), first)
+
+    def test_no_rescan_without_debug(self):
+        self.registry.names()
+        self.write('gramedia.django', 'new.json', {})
+        self.assertIsNone(self.registry.find('new.json'))
+
+    def test_debug_rescan(self):
+        self.registry.names()
+        self.write('gramedia.django', 'new.json', {'title': 'new'})
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.registry.get('new.json'), {'title': 'new'})
+
+    def test_debug_reloads_changed_files(self):
+        self.write('gramedia.django', 'book.json', {'title': 'first'})
+        self.assertEqual(self.registry.get('book.json'), {'title': 'first'})
+        self.write('gramedia.django', 'book.json', {'title': 'second'})
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.registry.get('book.json'), {'title': 'second'})
+
+    def test_clear(self):
+        self.registry.names()
+        self.write('gramedia.django', 'new.json', {})
+        self.registry.clear()
+        self.assertListEqual(self.registry.names(), ['new.json'])
+
+
+class CorJsonResolverReloadTests(SimpleTestCase):
+    """ Schemas read by `CorJsonResolver` go through the module's global `SchemaFileCache`.
+    """
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'thing.json')
+        self.write({'title': 'first'}, mtime=1000)
+        self.addCleanup(common_jsonschema._schema_files.clear)
+
+    def write(self, schema: dict, mtime: int):
+        with open(self.path, 'w') as fp:
+            json.dump(schema, fp)
+        os.utime(self.path, (mtime, mtime))
+
+    def test_no_reload_without_debug(self):
+        with override_settings(DEBUG=False):
+            first = common_jsonschema._schema_files.load(self.path)
+            self.write({'title': 'second'}, mtime=2000)
+            self.assertIs(common_jsonschema._schema_files.load(self.path), first)
+
+    def test_debug_reloads_changed_files(self):
+        with override_settings(DEBUG=True):
+            self.assertEqual(common_jsonschema._schema_files.load(self.path), {'title': 'first'})
+            self.write({'title': 'second'}, mtime=2000)
+            self.assertEqual(common_jsonschema._schema_files.load(self.path), {'title': 'second'})
+
+    def test_resolver_uses_the_global_cache(self):
+        resolver = CorJsonResolver(DEFAULT_BASE_URL, {})
+        schemas_dir = os.path.join(os.path.dirname(common_jsonschema.__file__), os.pardir, 'common', 'static',
+                                   'schemas')
+        path = os.path.join(schemas_dir, 'thing.json')
+        common_jsonschema._schema_files._schemas[path] = (None, {'title': 'cached'})
+        self.assertEqual(resolver.resolve_remote(f'{DEFAULT_BASE_URL}common/thing.json'), {'title': 'cached'})
@@ -0,0 +1,88 @@
+from django.contrib.sites.models import Site
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from gramedia.django.middleware import CurrentSiteMiddleware
+from gramedia.django.sites import get_request_site, site_registry
+
+
+class SiteRegistryTests(TestCase):
+
+    def setUp(self):
+        site_registry.load()
+
+    def test_host_with_port(self):
+        self.assertEqual(site_registry.get_by_host('example.com:8000').domain, 'example.com')
+
+    def test_host_case(self):
+        self.assertEqual(site_registry.get_by_host('EXAMPLE.com').domain, 'example.com')
+
+    def test_exact_match_with_port_first(self):
+        site = Site.objects.create(domain='example.com:8000', name='dev')
+        self.assertEqual(site_registry.get_by_host('example.com:8000'), site)
+
+    def test_unknown_host(self):
+        with self.assertRaises(Site.DoesNotExist):
+            site_registry.get_by_host('unknown.example.org')
+
+    def test_no_queries_once_loaded(self):
+        with self.assertNumQueries(0):
+            site_registry.get_by_host('example.com')
+            site_registry.get_by_id(1)
+
+    @override_settings(SITE_REGISTRY_RELOAD_INTERVAL=0)
+    def test_reload_on_miss(self):
+        # created by another process: no signal reaches this registry.
+        Site.objects.bulk_create([Site(domain='new.example.org', name='new')])
+        self.assertEqual(site_registry.get_by_host('new.example.org').name, 'new')
+
+    @override_settings(SITE_REGISTRY_RELOAD_INTERVAL=3600)
+    def test_reloads_are_rate_limited(self):
+        Site.objects.bulk_create([Site(domain='new.example.org', name='new')])
+        with self.assertNumQueries(0), self.assertRaises(Site.DoesNotExist):
+            site_registry.get_by_host('new.example.org')
+
+    def test_saved_site(self):
+        site = Site.objects.get(domain='example.com')
+        site.domain = 'renamed.example.com'
+        site.save()
+        self.assertEqual(site_registry.get_by_host('renamed.example.com'), site)
+        with self.assertRaises(Site.DoesNotExist):
+            site_registry.get_by_host('example.com')
+
+    def test_deleted_site(self):
+        site = Site.objects.create(domain='gone.example.org', name='gone')
+        site_id = site.pk
+        site.delete()
+        with self.assertRaises(Site.DoesNotExist):
+            site_registry.get_by_host('gone.example.org')
+        with self.assertRaises(Site.DoesNotExist):
+            site_registry.get_by_id(site_id)
+
+    @override_settings(SITE_ID=1)
+    def test_site_id_setting(self):
+        self.assertEqual(site_registry.get_current().pk, 1)
+
+
+class RequestSiteTests(TestCase):
+
+    def setUp(self):
+        site_registry.load()
+        self.middleware = CurrentSiteMiddleware(lambda request: HttpResponse())
+
+    def test_resolved_once_per_request(self):
+        request = RequestFactory().get('/', HTTP_HOST='example.com')
+        site = get_request_site(request)
+        with self.assertNumQueries(0):
+            self.assertIs(get_request_site(request), site)
+        self.assertIs(request.site, site)
+
+    def test_middleware(self):
+        request = RequestFactory().get('/', HTTP_HOST='example.com:8000')
+        self.middleware(request)
+        self.assertEqual(request.site.domain, 'example.com')
+
+    def test_middleware_unknown_host(self):
+        request = RequestFactory().get('/', HTTP_HOST='unknown.example.org')
+        self.assertEqual(self.middleware(request).status_code, 200)
+        self.assertFalse(hasattr(request, 'site'))
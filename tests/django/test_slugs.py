@@ -0,0 +1,80 @@
+from django.test import TestCase
+
+from gramedia.django.utils.models import _taken_slugs, assign_unique_slugs, generate_slug
+from tests.django.testapp.models import Product
+
+
+class SlugTests(TestCase):
+
+    def create(self, *slugs):
+        Product.objects.bulk_create([Product(name=slug, slug=slug) for slug in slugs])
+
+    def test_free_slug(self):
+        self.assertEqual(generate_slug(Product, 'Harry Potter'), 'harry-potter')
+
+    def test_lowest_free_suffix(self):
+        self.create('harry-potter', 'harry-potter-1', 'harry-potter-3')
+        self.assertEqual(generate_slug(Product, 'Harry Potter'), 'harry-potter-2')
+
+    def test_numeric_titles(self):
+        # "iPhone 15" isn't the 15th "iPhone".
+        self.create('iphone', 'iphone-15')
+        self.assertEqual(generate_slug(Product, 'iPhone'), 'iphone-1')
+        self.assertEqual(generate_slug(Product, 'iPhone 15'), 'iphone-15-1')
+        self.assertEqual(generate_slug(Product, '2024'), '2024')
+
+    def test_tries(self):
+        self.create('book', 'book-2')
+        self.assertEqual(generate_slug(Product, 'Book', tries=2), 'book-3')
+
+    def test_longer_slugs_sharing_the_prefix(self):
+        self.create('harry-potter-and-the-goblet-of-fire', 'harry-potter-x2', 'harry-potter')
+        self.assertSetEqual(_taken_slugs(Product, ['harry-potter']), {'harry-potter'})
+
+    def test_like_and_regex_metacharacters(self):
+        self.create('a.b', 'axb', 'a.b-1', '100%', '1000', 'a_c', 'abc')
+        self.assertSetEqual(_taken_slugs(Product, ['a.b']), {'a.b', 'a.b-1'})
+        self.assertSetEqual(_taken_slugs(Product, ['100%']), {'100%'})
+        self.assertSetEqual(_taken_slugs(Product, ['a_c']), {'a_c'})
+
+    def test_single_prefix_query(self):
+        with self.assertNumQueries(1) as queries:
+            generate_slug(Product, 'Harry Potter')
+        sql = queries.captured_queries[0]['sql']
+        self.assertIn('LIKE', sql)
+        self.assertNotIn('REGEXP', sql)
+
+    def test_unrelated_prefixes_are_not_read(self):
+        self.create('the', 'the-1', 'theatre', 'theory')
+        with self.assertNumQueries(1) as queries:
+            self.assertEqual(generate_slug(Product, 'The'), 'the-2')
+        sql = queries.captured_queries[0]['sql']
+        self.assertIn("= 'the'", sql)
+        self.assertIn("LIKE 'the-%'", sql)
+
+    def test_save(self):
+        self.create('book')
+        self.assertEqual(Product.objects.create(name='Book').slug, 'book-1')
+
+
+class AssignUniqueSlugsTests(TestCase):
+
+    def test_batch_collisions(self):
+        Product.objects.bulk_create([Product(name='x', slug=slug) for slug in ('book', 'book-2', 'iphone-15')])
+        products = assign_unique_slugs([
+            Product(name='Book'), Product(name='Book'), Product(name='Book'),
+            Product(name='iPhone'), Product(name='iPhone 15'), Product(name='Fresh'), Product(name='Fresh'),
+        ])
+        self.assertListEqual(
+            [product.slug for product in products],
+            ['book-1', 'book-3', 'book-4', 'iphone', 'iphone-15-1', 'fresh', 'fresh-1'])
+
+    def test_existing_slugs_in_the_batch(self):
+        products = assign_unique_slugs([Product(name='Book', slug='book'), Product(name='Book')])
+        self.assertListEqual([product.slug for product in products], ['book', 'book-1'])
+
+    def test_one_query_per_chunk(self):
+        with self.assertNumQueries(1):
+            assign_unique_slugs([Product(name=f'Product {index}') for index in range(50)])
+        Product.objects.bulk_create(assign_unique_slugs([Product(name='Book') for _ in range(3)]))
+        self.assertEqual(Product.objects.filter(slug__startswith='book').count(), 3)
@@ -0,0 +1,54 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db.migrations.state import ModelState
+from django.db.models import Q
+from django.test import SimpleTestCase
+
+from tests.django.testapp.models import Item, Shelf
+
+
+class SoftDeleteIndexTests(SimpleTestCase):
+
+    def partial_indexes(self, model):
+        return [index for index in ModelState.from_model(model).options.get('indexes', []) if index.condition]
+
+    def test_indexes_are_in_the_migration_state(self):
+        indexes = self.partial_indexes(Shelf)
+        self.assertEqual([index.fields for index in indexes], [['name'], ['code', 'name']])
+        self.assertTrue(all(index.condition == Q(is_active=True) for index in indexes))
+        self.assertTrue(all(index.name.endswith('_act') for index in indexes))
+
+    def test_mark_deleted_condition(self):
+        [index] = self.partial_indexes(Item)
+        self.assertEqual(index.fields, ['box'])
+        self.assertEqual(index.condition, Q(deleted=None))
+
+    def test_stable_names(self):
+        names = [index.name for index in self.partial_indexes(Shelf)]
+        self.assertEqual(names, [index.name for index in self.partial_indexes(Shelf)])
+        self.assertEqual(len(set(names)), 2)
+        self.assertTrue(all(len(name) <= 30 for name in names))
+
+
+class CheckSoftDeleteIndexesTests(SimpleTestCase):
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command('check_soft_delete_indexes', *args, stdout=out)
+        return out.getvalue()
+
+    def test_reports_problems(self):
+        output = self.run_command('testapp')
+        self.assertIn("testapp.Box: no partial index on rows filtered by 'deleted'", output)
+        # the test app has no migrations, so its partial indexes aren't in any.
+        self.assertIn('testapp.Item: index', output)
+        self.assertIn('is not in any migration', output)
+        self.assertEqual(output.count('testapp.Shelf: index'), 2)
+
+    def test_other_apps(self):
+        self.assertIn('All soft-delete models have partial indexes.', self.run_command('auth'))
+
+    def test_fail(self):
+        with self.assertRaises(CommandError):
+            self.run_command('testapp', '--fail')
@@ -0,0 +1,114 @@
+from django.test import TestCase
+from rest_framework import generics, serializers
+from rest_framework.test import APIRequestFactory
+
+from gramedia.django.drf import SparseFieldsMixin, create_sparse_serializer
+from tests.django.testapp.models import Author, Book, Tag
+
+
+class BookSerializer(serializers.ModelSerializer):
+    tags = serializers.SlugRelatedField(many=True, read_only=True, slug_field='name')
+    author_name = serializers.CharField(source='author.name', read_only=True)
+
+    class Meta:
+        model = Book
+        fields = ['id', 'title', 'summary', 'author_name', 'tags']
+        sparse_fields = ['title', 'summary', 'author_name', 'tags']
+
+
+class PlainBookSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Book
+        fields = ['id', 'title']
+
+
+class BookListView(SparseFieldsMixin, generics.ListCreateAPIView):
+    authentication_classes = []
+    permission_classes = []
+    queryset = Book.objects.order_by('pk')
+    serializer_class = BookSerializer
+
+
+class CreateSparseSerializerTests(TestCase):
+
+    def test_fields(self):
+        serializer_cls = create_sparse_serializer(BookSerializer, ('id', 'tags'))
+        self.assertListEqual(list(serializer_cls().fields), ['id', 'tags'])
+        self.assertListEqual(list(serializer_cls._declared_fields), ['tags'])
+        self.assertEqual(serializer_cls.__name__, 'SparseBookSerializer')
+        # the original serializer is left alone.
+        self.assertListEqual(list(BookSerializer().fields), ['id', 'title', 'summary', 'author_name', 'tags'])
+
+    def test_classes_are_cached(self):
+        first = create_sparse_serializer(BookSerializer, ('id', 'title'))
+        self.assertIs(create_sparse_serializer(BookSerializer, ('id', 'title')), first)
+        self.assertIsNot(create_sparse_serializer(BookSerializer, ('id', 'summary')), first)
+        self.assertIsNot(create_sparse_serializer(PlainBookSerializer, ('id', 'title')), first)
+
+
+class SparseFieldsMixinTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = Author.objects.create(name='Author')
+        book = Book.objects.create(author=author, title='Book', summary='About a book')
+        book.tags.add(Tag.objects.create(name='fantasy'))
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def get(self, query: str = '', view=BookListView):
+        return view.as_view()(self.factory.get(f'/books/{query}'))
+
+    def test_all_fields(self):
+        self.assertListEqual(list(self.get().data[0]), ['id', 'title', 'summary', 'author_name', 'tags'])
+
+    def test_fields(self):
+        response = self.get('?fields=title,authorName')
+        # id isn't in Meta.sparse_fields, so it is always included.
+        self.assertListEqual(list(response.data[0]), ['id', 'title', 'author_name'])
+        self.assertEqual(response.data[0]['author_name'], 'Author')
+
+    def test_exclude(self):
+        response = self.get('?exclude=summary,tags')
+        self.assertListEqual(list(response.data[0]), ['id', 'title', 'author_name'])
+
+    def test_fields_and_exclude(self):
+        response = self.get('?fields=title,summary&exclude=summary')
+        self.assertListEqual(list(response.data[0]), ['id', 'title'])
+
+    def test_unknown_fields(self):
+        response = self.get('?fields=title,price&exclude=id')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Unknown field(s): price.', response.data['fields'][0])
+        self.assertIn('Unknown field(s): id.', response.data['exclude'][0])
+
+    def test_queryset_is_trimmed(self):
+        with self.assertNumQueries(1) as queries:
+            self.get('?fields=title')
+        self.assertNotIn('summary', queries.captured_queries[0]['sql'])
+
+        # the relations of the fields asked for are still loaded up front.
+        with self.assertNumQueries(2):
+            self.get('?fields=authorName,tags')
+
+    def test_serializer_classes_are_reused(self):
+        view = BookListView()
+        view.request = view.initialize_request(self.factory.get('/books/?fields=title'))
+        first = view.get_serializer_class()
+        view.request = view.initialize_request(self.factory.get('/books/?fields=title'))
+        self.assertIs(view.get_serializer_class(), first)
+
+    def test_writes_use_all_fields(self):
+        view = BookListView()
+        view.request = view.initialize_request(self.factory.post('/books/?fields=title'))
+        self.assertIs(view.get_serializer_class(), BookSerializer)
+
+    def test_serializers_without_sparse_fields(self):
+        plain_view = type('PlainBookListView', (SparseFieldsMixin, generics.ListAPIView), {
+            'authentication_classes': [], 'permission_classes': [],
+            'queryset': Book.objects.all(), 'serializer_class': PlainBookSerializer,
+        })
+        response = self.get('?fields=nope', view=plain_view)
+        self.assertEqual(response.status_code, 200)
+        self.assertListEqual(list(response.data[0]), ['id', 'title'])
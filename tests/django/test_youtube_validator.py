@@ -0,0 +1,124 @@
+import threading
+from unittest import TestCase
+from unittest.mock import patch
+
+import requests
+
+from gramedia.django.utils.helpers import YOUTUBE_OEMBED_URL, YoutubeUrlValidator
+
+VALID = 'https://www.youtube.com/watch?v=valid'
+MISSING = 'https://www.youtube.com/watch?v=missing'
+SLOW = 'https://www.youtube.com/watch?v=slow'
+BROKEN = 'https://www.youtube.com/watch?v=broken'
+
+
+class FakeTransport:
+    """ Answers oembed requests from `statuses`, recording the URLs asked about.
+
+    URLs in `errors` raise that exception, and URLs in `slow` wait for `release` to be set.
+    """
+    def __init__(self, statuses: dict = None, errors: dict = None, slow: tuple = ()):
+        self.statuses = statuses or {VALID: 200, MISSING: 404, SLOW: 200}
+        self.errors = errors or {}
+        self.slow = slow
+        self.release = threading.Event()
+        self.requested = []
+        self._lock = threading.Lock()
+
+    def __call__(self, url: str, params: dict, timeout: float) -> int:
+        assert url == YOUTUBE_OEMBED_URL
+        video_url = params['url']
+        with self._lock:
+            self.requested.append(video_url)
+        if video_url in self.slow:
+            self.release.wait(5)
+        if video_url in self.errors:
+            raise self.errors[video_url]
+        return self.statuses[video_url]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class YoutubeUrlValidatorCacheTests(TestCase):
+
+    def setUp(self):
+        self.transport = FakeTransport()
+        self.validator = YoutubeUrlValidator(transport=self.transport, ttl=60, invalid_ttl=10)
+        self.clock = FakeClock()
+        patcher = patch('gramedia.django.utils.helpers.time.monotonic', new=self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_cache_hits(self):
+        self.assertTrue(self.validator.is_valid(VALID))
+        self.assertFalse(self.validator.is_valid(MISSING))
+        self.assertTrue(self.validator.is_valid(VALID))
+        self.assertFalse(self.validator.is_valid(MISSING))
+        self.assertListEqual(self.transport.requested, [VALID, MISSING])
+
+    def test_expiry(self):
+        self.validator.is_valid(VALID)
+        self.validator.is_valid(MISSING)
+
+        self.clock.now += 30
+        self.assertIsNone(self.validator.cached(MISSING))
+        self.assertTrue(self.validator.cached(VALID))
+
+        self.clock.now += 31
+        self.assertIsNone(self.validator.cached(VALID))
+        self.validator.is_valid(VALID)
+        self.assertListEqual(self.transport.requested, [VALID, MISSING, VALID])
+
+    def test_max_size(self):
+        validator = YoutubeUrlValidator(transport=self.transport, max_size=1)
+        validator.is_valid(VALID)
+        validator.is_valid(MISSING)
+        self.assertIsNone(validator.cached(VALID))
+        self.assertFalse(validator.cached(MISSING))
+
+    def test_transport_errors(self):
+        transport = FakeTransport(statuses={BROKEN: 503, MISSING: 404},
+                                  errors={VALID: requests.ConnectionError('refused')})
+        validator = YoutubeUrlValidator(transport=transport)
+        with self.assertLogs('gramedia', 'WARNING') as logs:
+            self.assertFalse(validator.is_valid(VALID))
+            self.assertFalse(validator.is_valid(BROKEN))
+        self.assertEqual(len(logs.records), 2)
+
+        # failed checks aren't cached, so they are retried.
+        self.assertIsNone(validator.cached(VALID))
+        self.assertIsNone(validator.cached(BROKEN))
+        transport.errors.clear()
+        transport.statuses[VALID] = 200
+        self.assertTrue(validator.is_valid(VALID))
+
+
+class YoutubeUrlValidatorManyTests(TestCase):
+
+    def test_validate_many(self):
+        transport = FakeTransport()
+        validator = YoutubeUrlValidator(transport=transport)
+        validator.is_valid(VALID)
+
+        results = validator.validate_many([MISSING, VALID, MISSING, SLOW])
+        self.assertListEqual(list(results.items()), [(MISSING, False), (VALID, True), (SLOW, True)])
+        self.assertCountEqual(transport.requested, [VALID, MISSING, SLOW])
+
+    def test_deadline(self):
+        transport = FakeTransport(slow=(SLOW,))
+        validator = YoutubeUrlValidator(transport=transport)
+        with self.assertLogs('gramedia', 'WARNING'):
+            results = validator.validate_many([VALID, SLOW], deadline=0.05)
+        self.assertDictEqual(results, {VALID: True, SLOW: False})
+        self.assertIsNone(validator.cached(SLOW))
+
+        # the late check carries on in the background, and its answer is cached for next time.
+        transport.release.set()
+        validator._executor.shutdown(wait=True)
+        self.assertTrue(validator.cached(SLOW))
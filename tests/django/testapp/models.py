@@ -0,0 +1,54 @@
+from django.db import models
+
+from gramedia.django.abstract_models import BaseModel, MarkDeletedModel, SoftDeletableModel
+from gramedia.django.utils.models import MonoLangSlugField
+
+
+class Shelf(SoftDeletableModel):
+    name = models.CharField(max_length=100)
+    code = models.CharField(max_length=20, blank=True)
+
+    soft_delete_index_fields = ('name', ('code', 'name'), )
+
+
+class Box(MarkDeletedModel):
+    name = models.CharField(max_length=100)
+
+
+class Item(MarkDeletedModel):
+    box = models.ForeignKey(Box, on_delete=models.CASCADE, related_name='items')
+    name = models.CharField(max_length=100)
+
+    soft_delete_index_fields = ('box', )
+
+
+class Note(models.Model):
+    owner = models.ForeignKey('auth.User', null=True, on_delete=models.CASCADE, related_name='notes')
+    text = models.CharField(max_length=100)
+
+
+class Product(models.Model):
+    name = models.CharField(max_length=100)
+    slug = MonoLangSlugField()
+
+
+class Author(BaseModel):
+    bio = models.TextField(blank=True)
+
+
+class Tag(models.Model):
+    name = models.CharField(max_length=50)
+
+
+class Book(models.Model):
+    author = models.ForeignKey(Author, on_delete=models.CASCADE, related_name='books')
+    title = models.CharField(max_length=100)
+    summary = models.TextField(blank=True)
+    tags = models.ManyToManyField(Tag, related_name='books')
+    modified = models.DateTimeField(auto_now=True)
+
+
+class Series(models.Model):
+    name = models.JSONField(default=dict)
+    description = models.JSONField(default=dict)
+    code = models.CharField(max_length=20, blank=True)
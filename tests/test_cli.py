@@ -0,0 +1,72 @@
+import io
+import logging
+from datetime import datetime
+from unittest import TestCase
+from unittest.mock import patch
+
+from gramedia.common.cli import ProgressReporter, print_progress_bar
+
+
+class FakeTTY(io.StringIO):
+    def isatty(self):
+        return True
+
+
+class PrintProgressBarTests(TestCase):
+
+    def test_without_starting_time(self):
+        with patch('builtins.print') as mock_print:
+            print_progress_bar(5, 10)
+        self.assertIn('5 |', mock_print.call_args_list[0][0][0])
+
+    def test_with_starting_time(self):
+        with patch('builtins.print') as mock_print:
+            print_progress_bar(10, 10, starting_time=datetime.now())
+        self.assertIn('100.0%', mock_print.call_args_list[0][0][0])
+
+
+class ProgressReporterTests(TestCase):
+
+    def test_wraps_iterable(self):
+        stream = FakeTTY()
+        items = list(ProgressReporter(range(100), stream=stream))
+        self.assertEqual(items, list(range(100)))
+        self.assertIn('100 |', stream.getvalue())
+        self.assertTrue(stream.getvalue().endswith('\n'))
+
+    def test_wraps_generator_with_unknown_total(self):
+        stream = FakeTTY()
+        reporter = ProgressReporter((i for i in range(42)), stream=stream)
+        self.assertEqual(sum(1 for _ in reporter), 42)
+        self.assertIsNone(reporter.total)
+        self.assertEqual(reporter.count, 42)
+        self.assertNotIn('|', stream.getvalue())
+
+    def test_throttles_redraws(self):
+        stream = FakeTTY()
+        reporter = ProgressReporter(total=100000, stream=stream, max_refresh_per_second=1)
+        with patch.object(reporter, 'refresh', wraps=reporter.refresh) as refresh:
+            for _ in range(100000):
+                reporter.update()
+        self.assertLess(refresh.call_count, 5)
+        self.assertEqual(reporter.count, 100000)
+
+    def test_logs_when_not_a_tty(self):
+        stream = io.StringIO()
+        with self.assertLogs('gramedia', level=logging.INFO) as logs:
+            with ProgressReporter(total=10, label='Importing', stream=stream) as reporter:
+                reporter.update(10)
+        self.assertEqual(stream.getvalue(), '')
+        self.assertIn('Importing 10/10 (100.0%)', logs.output[-1])
+
+    def test_rate_is_smoothed(self):
+        reporter = ProgressReporter(total=1000, stream=io.StringIO(), smoothing=0.5)
+        reporter._last_refresh = 0
+        reporter.count = 100
+        with self.assertLogs('gramedia'):
+            reporter.refresh(now=1)
+            self.assertEqual(reporter.rate, 100)
+            reporter.count = 400
+            reporter.refresh(now=2)
+        self.assertEqual(reporter.rate, 200)
+        self.assertEqual(reporter.eta, 3)
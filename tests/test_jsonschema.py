@@ -0,0 +1,84 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from jsonschema import ValidationError
+
+from gramedia.common.jsonschema import SchemaFileCache, get_validator, validate_gramedia_jsonschema, validate_many
+
+
+class SchemaFileCacheTests(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'thing.json')
+        self.write({'type': 'object'})
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, schema: dict, mtime: int = 1000):
+        with open(self.path, 'w') as fp:
+            json.dump(schema, fp)
+        os.utime(self.path, (mtime, mtime))
+
+    def test_parses_once(self):
+        cache = SchemaFileCache()
+        first = cache.load(self.path)
+        self.write({'type': 'string'}, mtime=2000)
+        self.assertIs(cache.load(self.path), first)
+        self.assertEqual(first, {'type': 'object'})
+
+    def test_reloads_changed_files_when_checking_mtime(self):
+        cache = SchemaFileCache(check_mtime=True)
+        self.assertEqual(cache.load(self.path), {'type': 'object'})
+        self.write({'type': 'string'}, mtime=2000)
+        self.assertEqual(cache.load(self.path), {'type': 'string'})
+
+    def test_check_mtime_callable(self):
+        checking = [False]
+        cache = SchemaFileCache(check_mtime=lambda: checking[0])
+        first = cache.load(self.path)
+        self.write({'type': 'string'}, mtime=2000)
+        self.assertIs(cache.load(self.path), first)
+        checking[0] = True
+        self.assertEqual(cache.load(self.path), {'type': 'string'})
+
+    def test_missing_file(self):
+        cache = SchemaFileCache()
+        self.assertIsNone(cache.load(os.path.join(self.tmp_dir.name, 'nope.json')))
+
+
+class ValidatorCacheTests(TestCase):
+
+    def test_reuses_validator_for_same_schema(self):
+        schema = {'type': 'object'}
+        self.assertIs(get_validator(schema), get_validator(schema))
+        self.assertIsNot(get_validator(schema), get_validator({'type': 'object'}))
+
+    def test_validate_gramedia_jsonschema(self):
+        schema = {'type': 'object', 'required': ['name']}
+        validate_gramedia_jsonschema({'name': 'x'}, schema)
+        with self.assertRaises(ValidationError):
+            validate_gramedia_jsonschema({}, schema)
+
+
+class ValidateManyTests(TestCase):
+    schema = {
+        'type': 'object',
+        'properties': {'name': {'type': 'string'}},
+        'required': ['name'],
+    }
+
+    def test_collects_errors_per_index(self):
+        errors = validate_many([{'name': 'a'}, {}, {'name': 1}, {'name': 'b'}], self.schema)
+        self.assertEqual(sorted(errors), [1, 2])
+        self.assertEqual(errors[1][0].message, "'name' is a required property")
+        self.assertEqual(list(errors[2][0].path), ['name'])
+
+    def test_process_pool(self):
+        docs = [{'name': 'a'} if i % 3 else {} for i in range(30)]
+        errors = validate_many(docs, self.schema, processes=2, chunk_size=7)
+        self.assertEqual(sorted(errors), list(range(0, 30, 3)))
+        self.assertEqual(errors[3][0].message, "'name' is a required property")
@@ -0,0 +1,130 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from jsonschema import Draft4Validator, FormatChecker, RefResolver, ValidationError
+
+from gramedia.common.jsonschema import get_validator
+from gramedia.common.jsonschema_compiler import CompiledDraft4Validator
+
+# (schema, instances) pairs; every instance is checked against both the compiled and interpreted validators.
+CONFORMANCE_CASES = [
+    ({'type': 'integer'}, [1, 1.0, 1.5, True, '1', None]),
+    ({'type': 'number'}, [1, 1.5, True, '1']),
+    ({'type': ['string', 'null']}, ['a', None, 1, []]),
+    ({'type': 'boolean'}, [True, False, 0, 1]),
+    ({'type': 'object'}, [{}, [], 'x']),
+    ({'type': 'array'}, [[], {}, 'x']),
+    ({'enum': [1, 'a', None, [1]]}, [1, True, 'a', None, [1], 2, False]),
+    ({'enum': [True, 0]}, [True, 1, 0, False, 0.0]),
+    ({'minimum': 1, 'maximum': 3}, [1, 3, 0, 4, 2.5, 'x']),
+    ({'minimum': 1, 'exclusiveMinimum': True, 'maximum': 3, 'exclusiveMaximum': True}, [1, 2, 3]),
+    ({'multipleOf': 3}, [9, 10, 'x']),
+    ({'multipleOf': 0.1}, [0.3, 0.35, 1]),
+    ({'minLength': 2, 'maxLength': 3}, ['a', 'ab', 'abcd', 5]),
+    ({'pattern': '^a.c$'}, ['abc', 'xabc', 1]),
+    ({'minItems': 1, 'maxItems': 2, 'uniqueItems': True}, [[], [1], [1, 2], [1, 1], [1, 2, 3], [1, True]]),
+    ({'items': {'type': 'string'}}, [['a', 'b'], ['a', 1], 'x']),
+    ({'items': [{'type': 'string'}, {'type': 'integer'}]}, [['a', 1], ['a', 'b'], ['a', 1, None], []]),
+    ({'items': [{'type': 'string'}], 'additionalItems': False}, [['a'], ['a', 'b'], []]),
+    ({'items': [{'type': 'string'}], 'additionalItems': {'type': 'integer'}}, [['a', 1, 2], ['a', 1, 'b']]),
+    ({'items': {'type': 'string'}, 'additionalItems': False}, [['a', 'b']]),
+    ({'minProperties': 1, 'maxProperties': 2}, [{}, {'a': 1}, {'a': 1, 'b': 2, 'c': 3}, []]),
+    ({'required': ['a', 'b']}, [{'a': 1, 'b': 2}, {'a': 1}, {}, 'x']),
+    ({'properties': {'a': {'type': 'integer'}, 'b': {'type': 'string'}}},
+     [{'a': 1, 'b': 'x'}, {'a': 'x'}, {'b': 1}, {'c': None}]),
+    ({'patternProperties': {'^x-': {'type': 'string'}, 'num$': {'type': 'number'}}},
+     [{'x-a': 'a', 'anum': 1}, {'x-a': 1}, {'x-num': 'a'}]),
+    ({'properties': {'a': {}}, 'additionalProperties': False}, [{'a': 1}, {'a': 1, 'b': 2}, {'b': 1, 'c': 2}]),
+    ({'properties': {'a': {}}, 'patternProperties': {'^x': {}}, 'additionalProperties': False},
+     [{'a': 1, 'xy': 2}, {'a': 1, 'b': 2}]),
+    ({'properties': {'a': {}}, 'additionalProperties': {'type': 'integer'}}, [{'a': 'x', 'b': 1}, {'b': 'x'}]),
+    ({'dependencies': {'a': ['b', 'c'], 'd': {'required': ['e']}}},
+     [{'a': 1, 'b': 1, 'c': 1}, {'a': 1, 'b': 1}, {'d': 1}, {'d': 1, 'e': 1}, {}]),
+    ({'allOf': [{'type': 'integer'}, {'minimum': 2}]}, [2, 1, 'x']),
+    ({'anyOf': [{'type': 'integer'}, {'minLength': 2}]}, [1, 'ab', 'a', 1.5]),
+    ({'oneOf': [{'type': 'integer'}, {'minimum': 2}]}, [1, 3, 2.5, 1.5]),
+    ({'not': {'type': 'string'}}, [1, 'a']),
+    ({'properties': {'nested': {'type': 'object', 'properties': {'list': {'type': 'array', 'items': {
+        'type': 'object', 'required': ['id'], 'properties': {'id': {'type': 'integer', 'minimum': 1}}}}}}}},
+     [{'nested': {'list': [{'id': 1}, {'id': 2}]}}, {'nested': {'list': [{'id': 1}, {'id': 0}, {}]}}]),
+    ({'definitions': {'positive': {'type': 'integer', 'minimum': 1}},
+      'properties': {'a': {'$ref': '#/definitions/positive'}, 'b': {'$ref': '#/definitions/positive'}}},
+     [{'a': 1, 'b': 2}, {'a': 0}, {'b': 'x'}]),
+    ({'definitions': {'node': {'type': 'object', 'properties': {
+        'value': {'type': 'integer'}, 'children': {'type': 'array', 'items': {'$ref': '#/definitions/node'}}}}},
+      '$ref': '#/definitions/node'},
+     [{'value': 1, 'children': [{'value': 2, 'children': []}]}, {'value': 1, 'children': [{'value': 'x'}]}]),
+    ({'id': 'http://example.com/root.json', 'properties': {'a': {'$ref': '#/definitions/a'}},
+      'definitions': {'a': {'type': 'string'}}},
+     [{'a': 'x'}, {'a': 1}]),
+]
+
+
+def _errors(validator, instance) -> list:
+    return sorted(
+        (error.message, list(error.path), list(error.schema_path))
+        for error in validator.iter_errors(instance)
+    )
+
+
+class CompiledDraft4ValidatorConformanceTests(TestCase):
+
+    def test_conformance(self):
+        for schema, instances in CONFORMANCE_CASES:
+            compiled = CompiledDraft4Validator(schema)
+            interpreted = Draft4Validator(schema)
+            self.assertTrue(compiled.compiled, schema)
+            for instance in instances:
+                with self.subTest(schema=schema, instance=instance):
+                    self.assertEqual(compiled.is_valid(instance), interpreted.is_valid(instance))
+                    self.assertEqual(_errors(compiled, instance), _errors(interpreted, instance))
+
+    def test_validate_raises_same_error(self):
+        schema = {'properties': {'a': {'items': {'type': 'integer'}}}}
+        with self.assertRaises(ValidationError) as compiled_error:
+            CompiledDraft4Validator(schema).validate({'a': [1, 'x']})
+        with self.assertRaises(ValidationError) as interpreted_error:
+            Draft4Validator(schema).validate({'a': [1, 'x']})
+
+        self.assertEqual(compiled_error.exception.message, interpreted_error.exception.message)
+        self.assertEqual(compiled_error.exception.path, interpreted_error.exception.path)
+        self.assertEqual(compiled_error.exception.schema_path, interpreted_error.exception.schema_path)
+
+    def test_format_checker(self):
+        schema = {'format': 'email'}
+        compiled = CompiledDraft4Validator(schema, format_checker=FormatChecker())
+        self.assertTrue(compiled.is_valid('someone@example.com'))
+        self.assertFalse(compiled.is_valid('not an email'))
+        self.assertEqual(_errors(compiled, 'not an email'),
+                         _errors(Draft4Validator(schema, format_checker=FormatChecker()), 'not an email'))
+
+        # without a checker, formats are ignored, like the interpreted validator.
+        self.assertTrue(CompiledDraft4Validator(schema).is_valid('not an email'))
+
+    def test_falls_back_for_unsupported_schemas(self):
+        schema = {'type': 'custom'}
+        with self.assertLogs('gramedia', 'WARNING'):
+            compiled = CompiledDraft4Validator(schema)
+        self.assertFalse(compiled.compiled)
+
+    def test_remote_refs_are_resolved_at_compile_time(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with open(os.path.join(tmp_dir, 'child.json'), 'w') as fp:
+                json.dump({'type': 'object', 'required': ['id']}, fp)
+            base_uri = f'file://{tmp_dir}/'
+            schema = {'type': 'array', 'items': {'$ref': 'child.json'}}
+            compiled = CompiledDraft4Validator(schema, RefResolver(base_uri, schema))
+
+        # the file is gone, but the compiled code doesn't need it anymore.
+        self.assertTrue(compiled.is_valid([{'id': 1}]))
+        self.assertFalse(compiled.is_valid([{'id': 1}, {}]))
+
+    def test_usable_with_get_validator(self):
+        schema = {'type': 'object', 'required': ['name']}
+        validator = get_validator(schema, validator_class=CompiledDraft4Validator)
+        self.assertIsInstance(validator, CompiledDraft4Validator)
+        self.assertIs(get_validator(schema, validator_class=CompiledDraft4Validator), validator)
+        with self.assertRaises(ValidationError):
+            validator.validate({})
@@ -0,0 +1,91 @@
+import threading
+import time
+from unittest import TestCase
+from urllib.parse import parse_qsl, urlsplit
+
+from gramedia.common.http import LinkHeaderField, LinkHeaderPageIterator, LinkHeaderRel, PageResponse
+
+BASE_URL = 'https://api.example.com/books/'
+
+
+class FakeApi:
+    """ Paginates `count` items like `LinkHeaderPagination`, recording the pages requested.
+    """
+    def __init__(self, count: int, per_page: int = 10, total_header: bool = True, delay: float = 0):
+        self.items = list(range(count))
+        self.per_page = per_page
+        self.total_header = total_header
+        self.delay = delay
+        self.requested = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, url: str, timeout: float) -> PageResponse:
+        query = dict(parse_qsl(urlsplit(url).query))
+        number = int(query.get('page', 1))
+        with self._lock:
+            self.requested.append(number)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        # later pages answer faster, to check they're still yielded in order.
+        time.sleep(self.delay / number)
+        with self._lock:
+            self.in_flight -= 1
+
+        pages = max(1, -(-len(self.items) // self.per_page))
+        links = []
+        if number < pages:
+            links.append(LinkHeaderField(f'{BASE_URL}?page={number + 1}&per_page={self.per_page}',
+                                         LinkHeaderRel.next, str(number + 1)))
+            links.append(LinkHeaderField(f'{BASE_URL}?page={pages}&per_page={self.per_page}',
+                                         LinkHeaderRel.last, str(pages)))
+        headers = {'Link': ', '.join(str(link) for link in links)} if links else {}
+        if self.total_header:
+            headers['X-Total-Results'] = str(len(self.items))
+        start = (number - 1) * self.per_page
+        return PageResponse(self.items[start:start + self.per_page], headers)
+
+
+class LinkHeaderPageIteratorTests(TestCase):
+
+    def test_single_page(self):
+        api = FakeApi(5)
+        iterator = LinkHeaderPageIterator(f'{BASE_URL}?per_page=10', transport=api)
+        self.assertListEqual(list(iterator), list(range(5)))
+        self.assertEqual(iterator.total_results, 5)
+
+    def test_follows_next_links(self):
+        api = FakeApi(35, total_header=False)
+        items = list(LinkHeaderPageIterator(f'{BASE_URL}?per_page=10', transport=api))
+        self.assertListEqual(items, list(range(35)))
+        self.assertListEqual(api.requested, [1, 2, 3, 4])
+        self.assertEqual(api.max_in_flight, 1)
+
+    def test_concurrent_pages_are_yielded_in_order(self):
+        api = FakeApi(200, delay=0.02)
+        items = list(LinkHeaderPageIterator(f'{BASE_URL}?per_page=10', transport=api, max_workers=4))
+        self.assertListEqual(items, list(range(200)))
+        self.assertListEqual(sorted(api.requested), list(range(1, 21)))
+        self.assertGreater(api.max_in_flight, 1)
+        self.assertLessEqual(api.max_in_flight, 4)
+
+    def test_stopping_early(self):
+        api = FakeApi(1000, delay=0.01)
+        iterator = iter(LinkHeaderPageIterator(f'{BASE_URL}?per_page=10', transport=api, max_workers=2))
+        self.assertListEqual([next(iterator) for _ in range(15)], list(range(15)))
+        iterator.close()
+        self.assertLess(len(api.requested), 10)
+
+
+class PageResponseTests(TestCase):
+
+    def test_headers_are_case_insensitive(self):
+        page = PageResponse([], {'x-total-results': '3', 'LINK': f'<{BASE_URL}?page=2>; rel="next"'})
+        self.assertEqual(page.total_results, 3)
+        self.assertEqual(page.links.get(LinkHeaderRel.next).url, f'{BASE_URL}?page=2')
+
+    def test_missing_headers(self):
+        page = PageResponse([], {})
+        self.assertIsNone(page.total_results)
+        self.assertIsNone(page.links)
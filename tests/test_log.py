@@ -0,0 +1,63 @@
+import logging
+from unittest import TestCase
+from unittest.mock import patch
+
+from gramedia.common.log import PayloadLogger, TruncatedPayload
+
+
+class Unformattable:
+    def __str__(self):
+        raise AssertionError('formatted')
+
+
+class TruncatedPayloadTests(TestCase):
+
+    def test_short_payload(self):
+        self.assertEqual(str(TruncatedPayload({'a': 1}, 100)), "{'a': 1}")
+
+    def test_long_payload(self):
+        self.assertEqual(str(TruncatedPayload('x' * 50, 10)), 'xxxxxxxxxx... (50 characters)')
+
+    def test_no_limit(self):
+        self.assertEqual(str(TruncatedPayload('x' * 50)), 'x' * 50)
+
+
+class PayloadLoggerTests(TestCase):
+
+    def setUp(self):
+        self.logger = logging.getLogger('test-payload-logger')
+        self.logger.setLevel(logging.INFO)
+
+    def test_payload_is_truncated(self):
+        payload_logger = PayloadLogger(self.logger, max_length=5)
+        with self.assertLogs(self.logger, logging.INFO) as logs:
+            payload_logger.info('book', 'Publish %s', 'book', payload='abcdefgh')
+        self.assertEqual(logs.records[0].getMessage(), 'Publish book - abcde... (8 characters)')
+
+    def test_disabled_level_is_not_formatted(self):
+        payload_logger = PayloadLogger(self.logger)
+        payload_logger.debug('book', 'Publish %s', Unformattable(), payload=Unformattable())
+
+    def test_sampling(self):
+        payload_logger = PayloadLogger(self.logger, sample_rates={'book': 0.5, 'author': 0})
+        with patch('gramedia.common.log.random.random', side_effect=[0.2, 0.7]), \
+                self.assertLogs(self.logger, logging.INFO) as logs:
+            payload_logger.info('book', 'first')
+            payload_logger.info('book', 'second')
+            payload_logger.info('author', 'never')
+            payload_logger.info('tag', 'always')
+        self.assertEqual([record.getMessage() for record in logs.records], ['first', 'always'])
+
+    def test_warnings_are_not_sampled(self):
+        payload_logger = PayloadLogger(self.logger, default_rate=0)
+        with self.assertLogs(self.logger, logging.INFO) as logs:
+            payload_logger.info('book', 'sampled out')
+            payload_logger.warning('book', 'kept')
+        self.assertEqual([record.getMessage() for record in logs.records], ['kept'])
+
+    def test_caller_location(self):
+        payload_logger = PayloadLogger(self.logger)
+        with self.assertLogs(self.logger, logging.INFO) as logs:
+            payload_logger.info('book', 'here')
+            payload_logger.log(logging.INFO, 'book', 'here too')
+        self.assertEqual({record.funcName for record in logs.records}, {'test_caller_location'})